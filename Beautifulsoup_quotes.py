@@ -1,26 +1,74 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import sys
+from html_parsing import ParseTarget, make_soup
+from quotes_crawler import crawl_quotes
+from http_cache import HttpCache
+from har_archive import har_session
+from rate_limit import throttle_sync
+from telemetry import traced_block, phase, text_size
+
+# Only the quote blocks are parsed
+QUOTE_TARGET = ParseTarget("div", "quote")
+
+# Version of parse_quotes' output in the HTTP cache; bump it when parse_quotes changes what it returns
+QUOTES_PARSE_KEY = "quotes:v1"
 
 # URL of the website to scrape
 url = "http://quotes.toscrape.com"
 
-# Send a GET request to fetch the webpage
-response = requests.get(url)
-
-# Check if the request was successful
-if response.status_code == 200:
-    # Parse the webpage content with BeautifulSoup
-    soup = BeautifulSoup(response.text, 'html.parser')
-    
-    # Find all quote elements
-    quotes = soup.find_all('div', class_='quote')
-    
-    # Extract and print quote text and author
-    for quote in quotes:
-        text = quote.find('span', class_='text').text
-        author = quote.find('small', class_='author').text
-        print(f"Quote: {text}")
-        print(f"Author: {author}")
-        print("-" * 50)
-else:
-    print(f"Failed to retrieve webpage. Status code: {response.status_code}")
\ No newline at end of file
+def extract_quotes(soup):
+    # Find all quote elements and keep (text, author) pairs
+    return [
+        (quote.find('span', class_='text').text, quote.find('small', class_='author').text)
+        for quote in soup.find_all('div', class_='quote')
+    ]
+
+def parse_quotes(html):
+    # Parse only the quote blocks of the webpage
+    return extract_quotes(make_soup(html, QUOTE_TARGET))
+
+def scrape_quotes(url, cache=None):
+    with traced_block("quotes", "quotes.toscrape.com"):
+        # Send a GET request to fetch the webpage; through the cache an unchanged
+        # page is revalidated (304) and comes back already parsed
+        # SCRAPER_HAR_MODE=record/replay routes the session through a HAR archive
+        session = har_session()
+        with phase("fetch") as span:
+            if cache is not None:
+                response = cache.get(url, session=session, parse=parse_quotes, parse_key=QUOTES_PARSE_KEY)
+            else:
+                throttle_sync(url)
+                response = session.get(url)
+            span.bytes = text_size(response.text)
+
+        # Check if the request was successful
+        if response.status_code == 200:
+            with phase("parse") as span:
+                quotes = response.parsed if cache is not None else parse_quotes(response.text)
+                span.items = len(quotes)
+
+            # Print quote text and author
+            with phase("export", items=len(quotes)):
+                for text, author in quotes:
+                    print(f"Quote: {text}")
+                    print(f"Author: {author}")
+                    print("-" * 50)
+        else:
+            print(f"Failed to retrieve webpage. Status code: {response.status_code}")
+
+if __name__ == "__main__":
+    # python Beautifulsoup_quotes.py crawl [base_url]  -> every page, author and tag page, concurrently
+    # python Beautifulsoup_quotes.py cached [url]      -> first page through the on-disk HTTP cache
+    if len(sys.argv) > 1 and sys.argv[1] == "cached":
+        with HttpCache() as cache:
+            scrape_quotes(sys.argv[2] if len(sys.argv) > 2 else url, cache)
+            print(cache.summary())
+    elif len(sys.argv) > 1 and sys.argv[1] == "crawl":
+        crawler = asyncio.run(crawl_quotes(sys.argv[2] if len(sys.argv) > 2 else url))
+        for quote in crawler.quotes:
+            print(f"Quote: {quote.text}")
+            print(f"Author: {quote.author}")
+            print(f"Tags: {', '.join(quote.tags)}")
+            print("-" * 50)
+    else:
+        scrape_quotes(sys.argv[1] if len(sys.argv) > 1 else url)
@@ -1,65 +1,88 @@
 import asyncio
-from playwright.async_api import async_playwright
 from bs4 import BeautifulSoup
+from browser_pool import pooled_page
+from network_policy import apply_network_policy
+from rate_limit import throttle
+from consent import dismiss_consent
+from adaptive_scroll import scroll_until_stable
+from harvester import IncrementalHarvester
+from selector_race import discover_selector, reject_selector
+from telemetry import traced_run, timed, phase, text_size
 
-async def scrape_Berkeley():
+# Per-program fields: name -> (relative selector, attribute or None for text)
+PROGRAM_FIELDS = {
+    "title": ("div.program-grid--title div a p", None),
+    "url": ("div.program-grid--title div a", "href"),
+}
+
+# Program containers, in order of preference (the one that won last run is tried first)
+PROGRAM_SELECTORS = [
+    "div.program-grid",
+    "[class*='program-grid']:has(> [class*='program-grid--title'])",
+]
+
+@traced_run("berkeley_programs", "grad.berkeley.edu")
+async def scrape_Berkeley(pool=None, max_items=None):
     url = "https://grad.berkeley.edu/admissions/choosing-your-program/list/"
     
-    async with async_playwright() as p:
-        # Launch browser
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+    # Wait for the site's request budget before holding a pooled page
+    await throttle(url)
+    
+    # Borrow a page from the shared pool (or launch a one-off browser when run standalone)
+    async with pooled_page(pool, headless=True) as page:
+        
+        # Skip images, media, fonts and ad/analytics requests; report savings when the page closes
+        await apply_network_policy(page, url)
         
         try:
             # Navigate to the URL
-            await page.goto(url, wait_until="domcontentloaded")
+            await timed("goto", page.goto(url, wait_until="domcontentloaded"))
             
-            # Wait for program grid to load
-            await page.wait_for_selector("div.program-grid", timeout=15000)
+            # Dismiss a cookie/consent overlay if one is showing
+            await timed("consent", dismiss_consent(page))
             
-            # Scroll to load more content
-            for _ in range(3):
-                await page.evaluate("window.scrollTo(0, document.documentElement.scrollHeight);")
-                await page.wait_for_timeout(2000)
+            # Wait for program grid to load
+            program_selector, _, cached = await timed(
+                "discovery", discover_selector(page, PROGRAM_SELECTORS, "program_list", timeout=15000))
+            if not program_selector:
+                print("No program grid found.")
+                return
+            print(f"Programs found with selector: {program_selector}{' (cached)' if cached else ''}")
             
-            # Get page content
-            content = await page.content()
-            soup = BeautifulSoup(content, "html.parser")
+            # Scroll until no more programs are appended, extracting new programs after every scroll
+            harvester = IncrementalHarvester(program_selector, PROGRAM_FIELDS, key="url", max_items=max_items)
+            with phase("scroll") as span:
+                await scroll_until_stable(page, item_selector=program_selector, harvester=harvester)
+                span.items = len(harvester.items)
             
-            # Find all program-grid elements
-            programs = soup.find_all("div", class_="program-grid")
+            programs = harvester.items
             print(f"Found {len(programs)} program-grid elements")
+            if harvester.empty:
+                # The selector matched but gave no programs; don't lead the next run's race with it
+                reject_selector(page, program_selector, "program_list", cached)
             
             titles = []
             for program in programs:
-                # Find the <a> tag within the nested structure
-                a_tag = program.select_one("div.program-grid--title div a")
-                if a_tag:
-                    # Extract the text from the <p> tag inside the <a> tag
-                    p_tag = a_tag.find("p")
-                    if p_tag:
-                        title = p_tag.text.strip()
-                        titles.append(title)
-                    else:
-                        print("No <p> tag found inside <a>:", a_tag)
+                if program["url"] is None:
+                    print("No <a> tag found in program")
+                elif not program["title"]:
+                    print("No <p> tag found inside <a>:", program["url"])
                 else:
-                    print("No <a> tag found in program:", program)
+                    titles.append(program["title"])
             
             # Print titles
-            for t in titles:
-                print(t)
+            with phase("export", items=len(titles)):
+                for t in titles:
+                    print(t)
             
             # If no titles found, print the soup for debugging
             if not titles:
                 print("No titles found. HTML content:")
+                soup = BeautifulSoup(await timed("content", page.content(), size=text_size), "html.parser")
                 print(soup.prettify())
                 
         except Exception as e:
             print(f"Error during scraping: {str(e)}")
-            
-        finally:
-            # Close browser
-            await browser.close()
 
 if __name__ == "__main__":
     asyncio.run(scrape_Berkeley())
\ No newline at end of file
@@ -1,95 +1,100 @@
-from playwright.async_api import async_playwright, Playwright
 from bs4 import BeautifulSoup
 import asyncio
+import sys
 from fake_useragent import UserAgent
+from browser_pool import pooled_page, STEALTH_ARGS, STEALTH_INIT_SCRIPT
+from adaptive_scroll import scroll_until_stable, wait_for_dom_quiet
+from selector_race import discover_selector, reject_selector
+from harvester import IncrementalHarvester
+from story_records import stories_from_items, print_stories
+from consent import dismiss_consent
+from network_policy import apply_network_policy
+from rate_limit import throttle, default_limiter, is_bot_check
+from telemetry import traced_run, timed, phase, text_size
+from bloomberg_feed import FeedCapture, FeedHarvester, STORY_DOM_FIELDS
 
-async def scrape_Bloomberg_Latest():
+@traced_run("bloomberg_latest", "bloomberg.com")
+async def scrape_Bloomberg_Latest(pool=None, max_items=None, max_age=None, mode="dom", feed_dir=None):
+    """Scrape Bloomberg Latest; mode="feed" decodes stories from the JSON embedded in the page and
+    the JSON responses it fetches while scrolling instead of discovering the DOM, falling back to
+    the DOM only when that JSON has no stories (feed_dir saves the responses for offline decoding)"""
     url = "https://www.bloomberg.com/latest"
     
-    async with async_playwright() as p:
-        # Launch browser with more human-like settings
-        browser = await p.chromium.launch(
-            headless=False,  # Set to True if you don't want to see the browser
-            args=[
-                '--disable-blink-features=AutomationControlled',
-                '--disable-web-security',
-                '--disable-features=VizDisplayCompositor'
-            ]
-        )
+    # Wait for the site's request budget before holding a pooled page
+    await throttle(url)
+    
+    # Borrow a page from the shared pool; standalone runs launch their own
+    # browser with more human-like settings
+    async with pooled_page(
+        pool,
+        headless=False,  # Set to True if you don't want to see the browser
+        launch_args=STEALTH_ARGS,
+        context_options={
+            'viewport': {'width': 1920, 'height': 1080},
+            'user_agent': UserAgent().chrome
+        }
+    ) as page:
         
-        # Create context with human-like settings
-        context = await browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent=UserAgent().chrome
-        )
+        # Add stealth settings
+        await page.add_init_script(STEALTH_INIT_SCRIPT)
         
-        page = await context.new_page()
+        # Skip images, media, fonts and ad/analytics requests; report savings when the page closes
+        await apply_network_policy(page, url)
         
-        # Add stealth settings
-        await page.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined,
-            });
-        """)
+        # Capture the XHR/fetch JSON the page fills itself from while it loads and scrolls
+        feed = FeedCapture(save_dir=feed_dir).attach(page) if mode == "feed" else None
         
         try:
             print("Loading Bloomberg Latest page...")
             # Use a more lenient wait condition and longer timeout
-            await page.goto(url, wait_until='domcontentloaded', timeout=60000)
+            await timed("goto", page.goto(url, wait_until='domcontentloaded', timeout=60000))
             
             # Check if we hit a bot detection page
-            page_title = await page.title()
+            page_title = await timed("bot_check", page.title())
             print(f"Page title: {page_title}")
             
-            if "robot" in page_title.lower() or "captcha" in page_title.lower():
+            if is_bot_check(page_title):
                 print("⚠️  Bot detection detected!")
                 print("Bloomberg is blocking automated access.")
+                # Slow every scraper in this process down on bloomberg.com, not just this one
+                default_limiter().penalize(url)
                 print("Waiting 30 seconds for manual intervention (solve CAPTCHA if visible)...")
                 await page.wait_for_timeout(30000)
                 
                 # Check again after waiting
                 page_title = await page.title()
-                if "robot" in page_title.lower():
+                if is_bot_check(page_title):
                     print("Still on bot detection page. Exiting...")
                     return
             
             # Handle cookie consent or terms acceptance
             print("Looking for accept/consent buttons...")
             
-            # Common selectors for accept buttons
-            accept_selectors = [
-                'button[data-testid="accept-all"]',
-                'button[id*="accept"]',
-                'button[class*="accept"]',
-                'button:has-text("Accept")',
-                'button:has-text("Accept All")',
-                'button:has-text("I Accept")',
-                'button:has-text("Continue")',
-                'button:has-text("Agree")',
-                '[data-testid="cookie-accept"]',
-                '.cookie-accept',
-                '#cookie-accept'
-            ]
-            
-            accepted = False
-            for selector in accept_selectors:
-                try:
-                    element = await page.wait_for_selector(selector, timeout=3000)
-                    if element:
-                        print(f"Found accept button with selector: {selector}")
-                        await element.click()
-                        print("Clicked accept button")
-                        await page.wait_for_timeout(2000)
-                        accepted = True
-                        break
-                except Exception:
-                    continue
-            
-            if not accepted:
+            # Check every known consent selector in one in-page query
+            accepted = await timed("consent", dismiss_consent(page))
+            if accepted:
+                print(f"Clicked accept button with selector: {accepted}")
+            else:
                 print("No accept button found, or already accepted. Continuing...")
             
-            # Wait for page to fully load after acceptance
-            await page.wait_for_timeout(5000)
+            # Wait for page to settle after acceptance
+            await timed("settle", wait_for_dom_quiet(page, quiet_ms=500, max_ms=5000))
+            
+            # In feed mode, decode stories from the JSON the page embeds, then scroll while the capture
+            # collects the responses each scroll triggers, until a scroll brings no new stories: no CSS
+            # class names are involved, so this survives markup churn
+            if feed is not None:
+                feed_harvester = FeedHarvester(feed, max_items=max_items)
+                with phase("feed") as span:
+                    await scroll_until_stable(page, harvester=feed_harvester)
+                    span.items = len(feed_harvester.items)
+                if feed_harvester.items:
+                    feed_stories = list(stories_from_items(feed_harvester.items))
+                    print(f"\n=== Found {len(feed_stories)} articles in the JSON feed ===")
+                    with phase("export") as span:
+                        span.items = print_stories(feed_stories)
+                    return
+                print("No stories in the page's JSON. Falling back to the page DOM...")
             
             print("Looking for content...")
             
@@ -105,20 +110,18 @@ async def scrape_Bloomberg_Latest():
                 "[class*='article']"
             ]
             
-            found_selector = None
-            for selector in selectors_to_try:
-                try:
-                    await page.wait_for_selector(selector, timeout=5000)
-                    found_selector = selector
-                    print(f"Found content with selector: {selector}")
-                    break
-                except Exception:
-                    continue
+            # Wait on all candidates at once instead of probing them one by one,
+            # with the selector that won on the last run leading the race
+            found_selector, match_counts, cached = await timed(
+                "discovery", discover_selector(page, selectors_to_try, "latest", timeout=5000))
+            if found_selector:
+                print(f"Found content with selector: {found_selector}{' (cached)' if cached else ''}")
+                print(f"Match counts: {match_counts}")
             
             if not found_selector:
                 print("Could not find expected selectors. Let's check what's actually on the page...")
                 # Get page content and look for any story-related elements
-                content = await page.content()
+                content = await timed("content", page.content(), size=text_size)
                 soup = BeautifulSoup(content, "html.parser")
                 
                 # Print some debug information
@@ -146,64 +149,43 @@ async def scrape_Bloomberg_Latest():
                             print(f"{i+1}. {title}")
                 return
             
-            # Scroll to load more content
+            # Scroll to load more content until no new stories appear,
+            # harvesting the new stories after every scroll
             print("Scrolling to load more content...")
-            for i in range(3):
-                await page.evaluate("window.scrollTo(0, document.documentElement.scrollHeight);")
-                await page.wait_for_timeout(2000)
-                print(f"Scroll {i+1}/3 completed")
-            
-            # Get page content and parse with BeautifulSoup
-            content = await page.content()
-            soup = BeautifulSoup(content, "html.parser")
-            
-            # Use the selector that worked
-            if found_selector == "div.Latest_storyPadding__GBJUE":
-                latest_stories = soup.find_all("div", class_="Latest_storyPadding__GBJUE")
-            else:
-                latest_stories = soup.select(found_selector)
+            harvester = IncrementalHarvester(
+                found_selector, STORY_DOM_FIELDS, key="url",
+                max_items=max_items, max_age=max_age, timestamp_field="datetime"
+            )
+            with phase("scroll") as span:
+                await scroll_until_stable(page, item_selector=found_selector, harvester=harvester)
+                span.items = len(harvester.items)
+            
+            # Stories were extracted incrementally while scrolling
+            latest_stories = harvester.items
             
             print(f"Found {len(latest_stories)} stories")
+            if harvester.empty:
+                # The selector matched but gave no stories; don't lead the next run's race with it
+                reject_selector(page, found_selector, "latest", cached)
             
             if not latest_stories:
                 print("No stories found with the expected structure.")
                 return
             
-            titles = []
-            times = []
-            
-            for story in latest_stories:
-                try:
-                    # Extract title using the correct selector
-                    title_element = story.select_one("div.Latest_itemTextContainer__YMnVV a div span")
-                    if title_element:
-                        title = title_element.get_text().strip()
-                        titles.append(title)
-                    
-                    # Extract time using the correct selector
-                    time_element = story.select_one("div.Latest_desktopTimestamp__oiCLC div.Latest_itemTimestamp__SqjF_ time")
-                    if time_element:
-                        time = time_element.get_text().strip()
-                        times.append(time)
-                except Exception as e:
-                    print(f"Error extracting data from story: {e}")
-                    continue
+            # One record per story container, so a missing timestamp cannot shift the others
+            stories = list(stories_from_items(latest_stories))
             
             # Print results
-            print(f"\n=== Found {len(titles)} articles ===")
-            for i, (title, time) in enumerate(zip(titles, times)):
-                print(f"{i+1}. Title: {title}")
-                print(f"   Time: {time}")
-                print("-" * 80)
+            print(f"\n=== Found {len(stories)} articles ===")
+            with phase("export") as span:
+                span.items = print_stories(stories)
                 
         except Exception as e:
             print(f"An error occurred: {e}")
-        finally:
-            await context.close()
-            await browser.close()
 
 if __name__ == "__main__":
-    asyncio.run(scrape_Bloomberg_Latest())
+    # python Bloomberg_Latest.py [dom|feed]
+    asyncio.run(scrape_Bloomberg_Latest(mode=sys.argv[1] if len(sys.argv) > 1 else "dom"))
         
         
         
\ No newline at end of file
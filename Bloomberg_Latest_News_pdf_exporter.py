@@ -1,162 +1,97 @@
-from playwright.async_api import async_playwright, Playwright
 from bs4 import BeautifulSoup
 import asyncio
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from datetime import datetime
+import os
+import sys
 from fake_useragent import UserAgent
+from browser_pool import pooled_page, STEALTH_ARGS, STEALTH_INIT_SCRIPT
+from adaptive_scroll import scroll_until_stable, wait_for_dom_quiet
+from selector_race import discover_selector, reject_selector
+from harvester import IncrementalHarvester
+from story_records import stories_from_items, print_stories
+from pdf_report import write_pdf_report, daily_report_path, stories_since_update
+from bloomberg_feed import STORY_DOM_FIELDS
+from consent import dismiss_consent
+from network_policy import apply_network_policy
+from rate_limit import throttle, default_limiter, is_bot_check
+from telemetry import traced_run, timed, phase, text_size
 
-def create_pdf_report(titles, times, filename="bloomberg_latest_news.pdf"):
-    """Create a PDF report with the scraped Bloomberg news"""
+def create_pdf_report(stories, filename="bloomberg_latest_news.pdf", append=False):
+    """Create (or append to) a PDF report from an iterable of Story records"""
+    if append:
+        # Only what earlier runs have not added yet
+        stories = stories_since_update(stories, filename)
+        if not stories:
+            print(f"No new stories for {filename}")
+            return
     print(f"Creating PDF report: {filename}")
     
-    # Create the PDF document
-    doc = SimpleDocTemplate(filename, pagesize=letter)
-    styles = getSampleStyleSheet()
-    story = []
-    
-    # Title style
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=30,
-        alignment=1  # Center alignment
-    )
-    
-    # Article title style
-    article_title_style = ParagraphStyle(
-        'ArticleTitle',
-        parent=styles['Heading2'],
-        fontSize=12,
-        spaceAfter=6,
-        textColor='darkblue'
-    )
-    
-    # Time style
-    time_style = ParagraphStyle(
-        'TimeStyle',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor='gray',
-        spaceAfter=12
-    )
-    
-    # Add title
-    title = Paragraph("Bloomberg Latest News Report", title_style)
-    story.append(title)
-    
-    # Add generation timestamp
-    timestamp = Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal'])
-    story.append(timestamp)
-    story.append(Spacer(1, 0.2*inch))
-    
-    # Add articles
-    for i, (title_text, time_text) in enumerate(zip(titles, times), 1):
-        # Article number and title
-        article_title = Paragraph(f"{i}. {title_text}", article_title_style)
-        story.append(article_title)
-        
-        # Article time
-        article_time = Paragraph(f"Published: {time_text}", time_style)
-        story.append(article_time)
-        
-        # Add some space between articles
-        story.append(Spacer(1, 0.1*inch))
-    
-    # Build PDF
-    doc.build(story)
-    print(f"PDF report saved as: {filename}")
+    # Stories are laid out page by page, so memory stays flat for large batches
+    with phase("export") as span:
+        count = write_pdf_report(stories, filename, append=append)
+        span.items = count
+        span.bytes = os.path.getsize(filename)
+    print(f"PDF report saved as: {filename} ({count} articles)")
 
-async def scrape_Bloomberg_Latest():
+@traced_run("bloomberg_pdf", "bloomberg.com")
+async def scrape_Bloomberg_Latest(pool=None, max_items=None, max_age=None, report=None):
     url = "https://www.bloomberg.com/latest"
     
-    async with async_playwright() as p:
-        # Launch browser with more human-like settings
-        browser = await p.chromium.launch(
-            headless=False,  # Set to True if you don't want to see the browser
-            args=[
-                '--disable-blink-features=AutomationControlled',
-                '--disable-web-security',
-                '--disable-features=VizDisplayCompositor'
-            ]
-        )
-        
-        # Create context with human-like settings
-        context = await browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent=UserAgent().chrome
-        )
-        
-        page = await context.new_page()
+    # Wait for the site's request budget before holding a pooled page
+    await throttle(url)
+    
+    # Borrow a page from the shared pool; standalone runs launch their own
+    # browser with more human-like settings
+    async with pooled_page(
+        pool,
+        headless=False,  # Set to True if you don't want to see the browser
+        launch_args=STEALTH_ARGS,
+        context_options={
+            'viewport': {'width': 1920, 'height': 1080},
+            'user_agent': UserAgent().chrome
+        }
+    ) as page:
         
         # Add stealth settings
-        await page.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined,
-            });
-        """)
+        await page.add_init_script(STEALTH_INIT_SCRIPT)
+        
+        # Skip images, media, fonts and ad/analytics requests; report savings when the page closes
+        await apply_network_policy(page, url)
         
         try:
             print("Loading Bloomberg Latest page...")
             # Use a more lenient wait condition and longer timeout
-            await page.goto(url, wait_until='domcontentloaded', timeout=60000)
+            await timed("goto", page.goto(url, wait_until='domcontentloaded', timeout=60000))
             
             # Check if we hit a bot detection page
-            page_title = await page.title()
+            page_title = await timed("bot_check", page.title())
             print(f"Page title: {page_title}")
             
-            if "robot" in page_title.lower() or "captcha" in page_title.lower():
+            if is_bot_check(page_title):
                 print("⚠️  Bot detection detected!")
                 print("Bloomberg is blocking automated access.")
+                # Slow every scraper in this process down on bloomberg.com, not just this one
+                default_limiter().penalize(url)
                 print("Waiting 30 seconds for manual intervention (solve CAPTCHA if visible)...")
                 await page.wait_for_timeout(30000)
                 
                 # Check again after waiting
                 page_title = await page.title()
-                if "robot" in page_title.lower():
+                if is_bot_check(page_title):
                     print("Still on bot detection page. Exiting...")
                     return
             
             # Handle cookie consent or terms acceptance
             print("Looking for accept/consent buttons...")
             
-            # Common selectors for accept buttons
-            accept_selectors = [
-                'button[data-testid="accept-all"]',
-                'button[id*="accept"]',
-                'button[class*="accept"]',
-                'button:has-text("Accept")',
-                'button:has-text("Accept All")',
-                'button:has-text("I Accept")',
-                'button:has-text("Continue")',
-                'button:has-text("Agree")',
-                '[data-testid="cookie-accept"]',
-                '.cookie-accept',
-                '#cookie-accept'
-            ]
-            
-            accepted = False
-            for selector in accept_selectors:
-                try:
-                    element = await page.wait_for_selector(selector, timeout=3000)
-                    if element:
-                        print(f"Found accept button with selector: {selector}")
-                        await element.click()
-                        print("Clicked accept button")
-                        await page.wait_for_timeout(2000)
-                        accepted = True
-                        break
-                except Exception:
-                    continue
-            
-            if not accepted:
+            # Check every known consent selector in one in-page query
+            accepted = await timed("consent", dismiss_consent(page))
+            if accepted:
+                print(f"Clicked accept button with selector: {accepted}")
+            else:
                 print("No accept button found, or already accepted. Continuing...")
             
-            # Wait for page to fully load after acceptance
-            await page.wait_for_timeout(5000)
+            # Wait for page to settle after acceptance
+            await timed("settle", wait_for_dom_quiet(page, quiet_ms=500, max_ms=5000))
             
             print("Looking for content...")
             
@@ -172,20 +107,18 @@ async def scrape_Bloomberg_Latest():
                 "[class*='article']"
             ]
             
-            found_selector = None
-            for selector in selectors_to_try:
-                try:
-                    await page.wait_for_selector(selector, timeout=5000)
-                    found_selector = selector
-                    print(f"Found content with selector: {selector}")
-                    break
-                except Exception:
-                    continue
+            # Wait on all candidates at once instead of probing them one by one,
+            # with the selector that won on the last run leading the race
+            found_selector, match_counts, cached = await timed(
+                "discovery", discover_selector(page, selectors_to_try, "latest", timeout=5000))
+            if found_selector:
+                print(f"Found content with selector: {found_selector}{' (cached)' if cached else ''}")
+                print(f"Match counts: {match_counts}")
             
             if not found_selector:
                 print("Could not find expected selectors. Let's check what's actually on the page...")
                 # Get page content and look for any story-related elements
-                content = await page.content()
+                content = await timed("content", page.content(), size=text_size)
                 soup = BeautifulSoup(content, "html.parser")
                 
                 # Print some debug information
@@ -213,67 +146,49 @@ async def scrape_Bloomberg_Latest():
                             print(f"{i+1}. {title}")
                 return
             
-            # Scroll to load more content
+            # Scroll to load more content until no new stories appear,
+            # harvesting the new stories after every scroll
             print("Scrolling to load more content...")
-            for i in range(3):
-                await page.evaluate("window.scrollTo(0, document.documentElement.scrollHeight);")
-                await page.wait_for_timeout(2000)
-                print(f"Scroll {i+1}/3 completed")
-            
-            # Get page content and parse with BeautifulSoup
-            content = await page.content()
-            soup = BeautifulSoup(content, "html.parser")
+            harvester = IncrementalHarvester(
+                found_selector, STORY_DOM_FIELDS, key="url",
+                max_items=max_items, max_age=max_age, timestamp_field="datetime"
+            )
+            with phase("scroll") as span:
+                await scroll_until_stable(page, item_selector=found_selector, harvester=harvester)
+                span.items = len(harvester.items)
             
-            # Use the selector that worked
-            if found_selector == "div.Latest_storyPadding__GBJUE":
-                latest_stories = soup.find_all("div", class_="Latest_storyPadding__GBJUE")
-            else:
-                latest_stories = soup.select(found_selector)
+            # Stories were extracted incrementally while scrolling
+            latest_stories = harvester.items
             
             print(f"Found {len(latest_stories)} stories")
+            if harvester.empty:
+                # The selector matched but gave no stories; don't lead the next run's race with it
+                reject_selector(page, found_selector, "latest", cached)
             
             if not latest_stories:
                 print("No stories found with the expected structure.")
                 return
             
-            titles = []
-            times = []
-            
-            for story in latest_stories:
-                try:
-                    # Extract title using the correct selector
-                    title_element = story.select_one("div.Latest_itemTextContainer__YMnVV a div span")
-                    if title_element:
-                        title = title_element.get_text().strip()
-                        titles.append(title)
-                    
-                    # Extract time using the correct selector
-                    time_element = story.select_one("div.Latest_desktopTimestamp__oiCLC div.Latest_itemTimestamp__SqjF_ time")
-                    if time_element:
-                        time = time_element.get_text().strip()
-                        times.append(time)
-                except Exception as e:
-                    print(f"Error extracting data from story: {e}")
-                    continue
+            # One record per story container, so a missing timestamp cannot shift the others
+            stories = list(stories_from_items(latest_stories))
             
             # Print results
-            print(f"\n=== Found {len(titles)} articles ===")
-            for i, (title, time) in enumerate(zip(titles, times)):
-                print(f"{i+1}. Title: {title}")
-                print(f"   Time: {time}")
-                print("-" * 80)
-            
-            # Create PDF report
-            if titles and times:
-                create_pdf_report(titles, times)
+            print(f"\n=== Found {len(stories)} articles ===")
+            # The "export" phase is the PDF written below
+            print_stories(stories)
+            
+            # Add this run's new stories to today's report, or write `report` from scratch
+            if stories:
+                if report:
+                    create_pdf_report(stories, report)
+                else:
+                    create_pdf_report(stories, daily_report_path("bloomberg_latest_news"), append=True)
             else:
                 print("No data to export to PDF")
                 
         except Exception as e:
             print(f"An error occurred: {e}")
-        finally:
-            await context.close()
-            await browser.close()
 
 if __name__ == "__main__":
-    asyncio.run(scrape_Bloomberg_Latest())
\ No newline at end of file
+    # python Bloomberg_Latest_News_pdf_exporter.py [report.pdf]  -> adds new stories to today's report, or writes report.pdf afresh
+    asyncio.run(scrape_Bloomberg_Latest(report=sys.argv[1] if len(sys.argv) > 1 else None))
\ No newline at end of file
@@ -1,51 +1,66 @@
 import asyncio
-from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
+from browser_pool import pooled_page
+from network_policy import apply_network_policy
+from rate_limit import throttle
+from consent import dismiss_consent
+from adaptive_scroll import scroll_until_stable
+from harvester import IncrementalHarvester
+from telemetry import traced_run, timed, phase
 
-async def scrape_Bloomberg_Originals():
+# Per-video fields, read from the <a id="video-title-link"> itself
+VIDEO_FIELDS = {
+    "title": ("", "title"),
+    "text": ("", None),
+    "url": ("", "href"),
+}
+
+@traced_run("bloomberg_originals", "youtube.com")
+async def scrape_Bloomberg_Originals(pool=None, max_items=None):
     url = "https://www.youtube.com/@business/videos"
     
-    async with async_playwright() as p:
-        # Launch browser (headless=False for debugging, True for production)
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+    # Wait for the site's request budget before holding a pooled page
+    await throttle(url)
+    
+    # Borrow a page from the shared pool (headless=False for debugging, True for production)
+    async with pooled_page(pool, headless=True) as page:
+        
+        # Skip images, media, fonts and ad/analytics requests; report savings when the page closes
+        await apply_network_policy(page, url)
         
         try:
             # Navigate to the URL
-            await page.goto(url, wait_until="domcontentloaded")
+            await timed("goto", page.goto(url, wait_until="domcontentloaded"))
             
-            # Wait for video titles to load
-            await page.wait_for_selector("a#video-title-link", timeout=15000)
+            # Dismiss a cookie/consent overlay if one is showing
+            await timed("consent", dismiss_consent(page))
             
-            # Scroll to load more videos (optional, adjust as needed)
-            for _ in range(3):  # Scroll 3 times to load more content
-                await page.evaluate("window.scrollTo(0, document.documentElement.scrollHeight);")
-                await page.wait_for_timeout(2000)  # Wait for content to load
+            # Wait for video titles to load
+            await timed("discovery", page.wait_for_selector("a#video-title-link", timeout=15000))
             
-            # Get page content
-            content = await page.content()
-            soup = BeautifulSoup(content, "html.parser")
+            # Scroll to load more videos until the list stops growing (optional, adjust as needed),
+            # extracting the new video titles after every scroll
+            harvester = IncrementalHarvester("a#video-title-link", VIDEO_FIELDS, key="url", max_items=max_items)
+            with phase("scroll") as span:
+                await scroll_until_stable(page, item_selector="a#video-title-link", max_time=20000, harvester=harvester)
+                span.items = len(harvester.items)
             
-            # Find video titles (using the <a> tag with id="video-title-link")
-            titles = soup.find_all("a", id="video-title-link")
+            # Video titles (from the <a> tag with id="video-title-link")
+            titles = harvester.items
             
-            if titles:
-                print(f"Found {len(titles)} video titles:")
-                for i, title in enumerate(titles, 1):
-                    title_text = title.get("title") or title.text.strip()
-                    if title_text:
-                        print(f"{i}. {title_text}")
-                    else:
-                        print(f"{i}. [Empty or inaccessible title]")
-            else:
-                print("No video titles found.")
+            with phase("export", items=len(titles)):
+                if titles:
+                    print(f"Found {len(titles)} video titles:")
+                    for i, title in enumerate(titles, 1):
+                        title_text = title["title"] or title["text"]
+                        if title_text:
+                            print(f"{i}. {title_text}")
+                        else:
+                            print(f"{i}. [Empty or inaccessible title]")
+                else:
+                    print("No video titles found.")
                 
         except Exception as e:
             print(f"Error during scraping: {str(e)}")
-            
-        finally:
-            # Close browser
-            await browser.close()
 
 if __name__ == "__main__":
     asyncio.run(scrape_Bloomberg_Originals())
\ No newline at end of file
@@ -1,34 +1,71 @@
-from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup
+import asyncio
 import csv
+import os
+import sys
+from html_parsing import make_soup
+from browser_pool import pooled_page
+from consent import dismiss_consent
+from network_policy import apply_network_policy
+from rate_limit import throttle
+from crypto_crawl import TABLE_TARGET, crawl_crypto, table_rows, to_frame
+from crypto_store import CryptoStore
+from telemetry import traced_run, timed, phase, text_size
 
-def scrape_yf():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+@traced_run("yahoo_crypto", "finance.yahoo.com")
+async def scrape_yf(pool=None, history_path=None):
+    url = "https://finance.yahoo.com/markets/crypto/all/"
+    
+    # Wait for the site's request budget before holding a pooled page
+    await throttle(url)
+    
+    async with pooled_page(pool, headless=True) as page:
         
-        url = "https://finance.yahoo.com/markets/crypto/all/"
-        page.goto(url)
-        page.wait_for_selector("table")
+        # Skip images, media, fonts and ad/analytics requests; report savings when the page closes
+        await apply_network_policy(page, url)
         
-        html = page.content()
-        soup = BeautifulSoup(html, "html.parser")
-        table = soup.find("table")
-        if table:
-            rows = table.find_all("tr")
-            data = []
-            for row in rows:
-                cols = [col.get_text(strip=True) for col in row.find_all(["td", "th"])]
-                data.append(cols)
+        await timed("goto", page.goto(url))
+        
+        # Dismiss a cookie/consent overlay if one is showing
+        await timed("consent", dismiss_consent(page))
+        await timed("discovery", page.wait_for_selector("table"))
+        
+        html = await timed("content", page.content(), size=text_size)
+        with phase("parse", bytes=text_size(html)):
+            soup = make_soup(html, TABLE_TARGET)
+        # Same table parsing as the paginated crawl, so both modes read the same columns
+        with phase("extract") as span:
+            header, rows = table_rows(soup)
+            span.items = len(rows)
+        if header or rows:
+            data = [header] + rows
             # Write to CSV
-            with open("crypto_data.csv", "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerows(data)
+            with phase("export", items=len(data)) as span:
+                with open("crypto_data.csv", "w", newline="", encoding="utf-8") as f:
+                    writer = csv.writer(f)
+                    writer.writerows(data)
+                span.bytes = os.path.getsize("crypto_data.csv")
             print("CSV file 'crypto_data.csv' has been created.")
+            # Optionally keep history: only rows that changed since the last poll are appended
+            if history_path and rows:
+                with phase("history"):
+                    with CryptoStore(history_path) as store:
+                        written, unchanged = store.write(to_frame(header, rows))
+                print(f"History '{history_path}': {written} changed, {unchanged} unchanged rows")
         else:
             print("No table found.")
-        
-        browser.close()
+
+async def scrape_yf_all(pool=None, output="crypto_data.csv", concurrency=4):
+    """Every result page (start/count offsets), fetched concurrently with typed numeric columns"""
+    return await crawl_crypto(pool, output=output, concurrency=concurrency)
 
 if __name__ == "__main__":
-    scrape_yf()
\ No newline at end of file
+    # python Crypto_yf.py all [crypto_data.parquet|crypto_history.db]  -> full paginated crawl
+    # python Crypto_yf.py history [crypto_history.db]  -> first page, plus change-only history
+    if len(sys.argv) > 1 and sys.argv[1] == "all":
+        output = sys.argv[2] if len(sys.argv) > 2 else "crypto_data.csv"
+        asyncio.run(scrape_yf_all(output=output))
+    elif len(sys.argv) > 1 and sys.argv[1] == "history":
+        history_path = sys.argv[2] if len(sys.argv) > 2 else "crypto_history.db"
+        asyncio.run(scrape_yf(history_path=history_path))
+    else:
+        asyncio.run(scrape_yf())
\ No newline at end of file
@@ -1,74 +1,78 @@
-from playwright.sync_api import sync_playwright, Playwright
-from bs4 import BeautifulSoup
+import asyncio
+import sys
+from browser_pool import pooled_page
+from html_parsing import make_soup
+from hktvmall import BASE_URL, LAYOUT_SELECTOR, PRODUCT_TARGET, product_names, search_url
+from network_policy import apply_network_policy
+from rate_limit import throttle
+from consent import dismiss_consent
+from telemetry import traced_run, timed, phase, text_size
+from hktvmall_crawl import crawl_hktvmall
 
-def scrape_hktvmall():
-    url = "https://www.hktvmall.com/hktv/en/search_a?keyword=iphone"
+async def search_products(page, keyword="iphone", base_url=BASE_URL):
+    """Product names for one keyword, loaded in `page`
+
+    Callers throttle(search_url(...)) before acquiring `page`, so no page sits idle waiting on the limit.
+    """
+    url = search_url(keyword, base_url)
+    await timed("goto", page.goto(url))
+    
+    # Dismiss a cookie/consent overlay if one is showing
+    await timed("consent", dismiss_consent(page))
+    
+    # Wait for dynamic content: cards in any known layout (product-brief-wrapper or bare info-wrapper)
+    await timed("discovery", page.wait_for_selector(LAYOUT_SELECTOR, timeout=10000))
     
-    with sync_playwright() as p:
-        # Launch browser in headless mode
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+    # Get page content, parsing only the product cards
+    html = await timed("content", page.content(), size=text_size)
+    with phase("parse", bytes=text_size(html)):
+        soup = make_soup(html, PRODUCT_TARGET)
+    
+    # One pass over the cards of whichever layout the site uses (probed on its first page only)
+    with phase("extract") as span:
+        names = product_names(soup, base_url)
+        span.items = len(names)
+    return names
+
+@traced_run("hktvmall_search", "hktvmall.com")
+async def scrape_hktvmall(pool=None, keyword="iphone", base_url=BASE_URL):
+    url = search_url(keyword, base_url)
+    
+    # Wait for the site's request budget before holding a pooled page
+    await throttle(url)
+    
+    # Borrow a page from the shared pool (or launch a headless browser when run standalone)
+    async with pooled_page(pool, headless=True) as page:
+        
+        # Skip images, media, fonts and ad/analytics requests; report savings when the page closes
+        await apply_network_policy(page, url)
         
         try:
-            # Load the page
-            page.goto(url)
-            
-            # Wait for dynamic content (try product-brief-wrapper or info-wrapper)
-            try:
-                page.wait_for_selector("span.product-brief-wrapper", timeout=10000)
-            except:
-                print("No 'product-brief-wrapper' found. Trying 'info-wrapper'...")
-                page.wait_for_selector("div.info-wrapper", timeout=10000)
-            
-            # Get page content
-            soup = BeautifulSoup(page.content(), "html.parser")
-            
-            # Try finding product-brief-wrapper as in your code
-            product_brief_wrapper = soup.find_all("span", class_="product-brief-wrapper")
-            
-            if product_brief_wrapper:
-                for product in product_brief_wrapper:
-                    info_wrapper = product.find("div", class_="info-wrapper")
-                    if not info_wrapper:
-                        print("No 'info-wrapper' found in this product-brief-wrapper.")
-                        continue
-                    upper_wrapper = info_wrapper.find("div", class_="upper-wrapper")
-                    if not upper_wrapper:
-                        print("No 'upper-wrapper' found in this info-wrapper.")
-                        continue
-                    product_name = upper_wrapper.find("div", class_="brand-product-name")
-                    if product_name:
-                        print(product_name.text.strip())
-                    else:
-                        print("No 'brand-product-name' found in this upper-wrapper.")
-            else:
-                # Fallback: try info-wrapper directly
-                print("No 'product-brief-wrapper' found. Checking 'info-wrapper' directly...")
-                info_wrapper = soup.find_all("div", class_="info-wrapper")
-                if not info_wrapper:
-                    print("No elements found with class 'info-wrapper'. Check class names or page structure.")
-                else:
-                    for info in info_wrapper:
-                        upper_wrapper = info.find("div", class_="upper-wrapper")
-                        if not upper_wrapper:
-                            # Try brand-product-name directly in info-wrapper
-                            product_name = info.find("div", class_="brand-product-name")
-                            if product_name:
-                                print(product_name.text.strip())
-                            else:
-                                print("No 'brand-product-name' or 'upper-wrapper' found in this info-wrapper.")
-                            continue
-                        product_name = upper_wrapper.find("div", class_="brand-product-name")
-                        if product_name:
-                            print(product_name.text.strip())
-                        else:
-                            print("No 'brand-product-name' found in this upper-wrapper.")
+            names = await search_products(page, keyword, base_url)
+            with phase("export", items=len(names)):
+                for name in names:
+                    print(name)
+            return names
         
         except Exception as e:
             print(f"Error during scraping: {e}")
-        finally:
-            # Close browser
-            browser.close()
+            return []
+
+def read_keywords(args):
+    """Keywords from the command line; "@file" adds one keyword per line of file"""
+    keywords = []
+    for arg in args:
+        if arg.startswith("@"):
+            with open(arg[1:], "r", encoding="utf-8") as f:
+                keywords.extend(line.strip() for line in f if line.strip())
+        else:
+            keywords.append(arg)
+    return keywords
 
 if __name__ == "__main__":
-    scrape_hktvmall()
\ No newline at end of file
+    # python Plaaywright_hktvmall.py crawl <keyword|@keywords.txt> ...  -> every result page of every keyword
+    #                                                                    into hktvmall_products.csv
+    if len(sys.argv) > 1 and sys.argv[1] == "crawl":
+        asyncio.run(crawl_hktvmall(read_keywords(sys.argv[2:]) or ["iphone"], output="hktvmall_products.csv"))
+    else:
+        asyncio.run(scrape_hktvmall())
\ No newline at end of file
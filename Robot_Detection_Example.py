@@ -1,21 +1,34 @@
-from playwright.async_api import async_playwright, Playwright
 from bs4 import BeautifulSoup
 import asyncio
+from browser_pool import pooled_page
+from network_policy import apply_network_policy
+from rate_limit import throttle
+from telemetry import traced_run, timed, phase, text_size
+from adaptive_scroll import scroll_until_stable, wait_for_dom_quiet
+from selector_race import discover_selector, reject_selector
+from harvester import IncrementalHarvester
+from story_records import stories_from_items, print_stories
+from bloomberg_feed import STORY_DOM_FIELDS
 
-async def scrape_Bloomberg_Latest():
+@traced_run("bloomberg_robot_example", "bloomberg.com")
+async def scrape_Bloomberg_Latest(pool=None, max_items=None, max_age=None):
     url = "https://www.bloomberg.com/latest?utm_source=homepage&utm_medium=web&utm_campaign=latest"
     
-    async with async_playwright() as p:
-        # Launch browser
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+    # Wait for the site's request budget before holding a pooled page
+    await throttle(url)
+    
+    # Borrow a page from the shared pool (or launch a one-off browser when run standalone)
+    async with pooled_page(pool, headless=True) as page:
+        
+        # Skip images, media, fonts and ad/analytics requests; report savings when the page closes
+        await apply_network_policy(page, url)
         
         try:
             print("Loading Bloomberg Latest page...")
-            await page.goto(url, wait_until='networkidle')
+            await timed("goto", page.goto(url, wait_until='networkidle'))
             
-            # Wait a bit for dynamic content to load
-            await page.wait_for_timeout(3000)
+            # Wait for dynamic content to stop changing
+            await timed("settle", wait_for_dom_quiet(page, quiet_ms=500, max_ms=3000))
             
             print("Page loaded, looking for content...")
             
@@ -29,20 +42,18 @@ async def scrape_Bloomberg_Latest():
                 ".story"
             ]
             
-            found_selector = None
-            for selector in selectors_to_try:
-                try:
-                    await page.wait_for_selector(selector, timeout=5000)
-                    found_selector = selector
-                    print(f"Found content with selector: {selector}")
-                    break
-                except:
-                    continue
+            # Wait on all candidates at once instead of probing them one by one,
+            # with the selector that won on the last run leading the race
+            found_selector, match_counts, cached = await timed(
+                "discovery", discover_selector(page, selectors_to_try, "latest", timeout=5000))
+            if found_selector:
+                print(f"Found content with selector: {found_selector}{' (cached)' if cached else ''}")
+                print(f"Match counts: {match_counts}")
             
             if not found_selector:
                 print("Could not find expected selectors. Let's check what's actually on the page...")
                 # Get page content and look for any story-related elements
-                content = await page.content()
+                content = await timed("content", page.content(), size=text_size)
                 soup = BeautifulSoup(content, "html.parser")
                 
                 # Print some debug information
@@ -58,28 +69,29 @@ async def scrape_Bloomberg_Latest():
                 
                 return
         
-            # Scroll to load more content
+            # Scroll to load more content until no new stories appear,
+            # harvesting the new stories after every scroll
             print("Scrolling to load more content...")
-            for i in range(3):
-                await page.evaluate("window.scrollTo(0, document.documentElement.scrollHeight);")
-                await page.wait_for_timeout(2000)
-                print(f"Scroll {i+1}/3 completed")
+            harvester = IncrementalHarvester(
+                found_selector, STORY_DOM_FIELDS, key="url",
+                max_items=max_items, max_age=max_age, timestamp_field="datetime"
+            )
+            with phase("scroll") as span:
+                await scroll_until_stable(page, item_selector=found_selector, harvester=harvester)
+                span.items = len(harvester.items)
           
-            # Get page content and parse with BeautifulSoup
-            content = await page.content()
-            soup = BeautifulSoup(content, "html.parser")
+            # Stories were extracted incrementally while scrolling
+            latest_stories = harvester.items
             
-            # Use the selector that worked
-            if found_selector == "div.Latest_storyPadding__GBJUE":
-                latest_stories = soup.find_all("div", class_="Latest_storyPadding__GBJUE")
-            else:
-                latest_stories = soup.select(found_selector)
-        
             print(f"Found {len(latest_stories)} stories")
+            if harvester.empty:
+                # The selector matched but gave no stories; don't lead the next run's race with it
+                reject_selector(page, found_selector, "latest", cached)
             
             if not latest_stories:
                 print("No stories found with the expected structure. Trying alternative extraction...")
                 # Try to find any headlines or articles
+                soup = BeautifulSoup(await page.content(), "html.parser")
                 headlines = soup.find_all(attrs={"class": lambda x: x and 'headline' in str(x).lower()})
                 if headlines:
                     print(f"Found {len(headlines)} headlines using alternative method")
@@ -89,36 +101,15 @@ async def scrape_Bloomberg_Latest():
                             print(f"{i+1}. {title}")
                 return
         
-            titles = []
-            times = []
-        
-            for story in latest_stories:
-                try:
-                    # Extract title using the correct selector
-                    title_element = story.select_one("div.Latest_itemTextContainer__YMnVV a div span")
-                    if title_element:
-                        title = title_element.get_text().strip()
-                        titles.append(title)
-                    
-                    # Extract time using the correct selector
-                    time_element = story.select_one("div.Latest_desktopTimestamp__oiCLC div.Latest_itemTimestamp__SqjF_ time")
-                    if time_element:
-                        time = time_element.get_text().strip()
-                        times.append(time)
-                except Exception as e:
-                    print(f"Error extracting data from story: {e}")
-                    continue
+            # One record per story container, so a missing timestamp cannot shift the others
+            stories = list(stories_from_items(latest_stories))
             
             # Print results
-            for i, (title, time) in enumerate(zip(titles, times)):
-                print(f"{i+1}. Title: {title}")
-                print(f"   Time: {time}")
-                print("-" * 80)
+            with phase("export") as span:
+                span.items = print_stories(stories)
                 
         except Exception as e:
             print(f"An error occurred: {e}")
-        finally:
-            await browser.close()
 
 if __name__ == "__main__":
     asyncio.run(scrape_Bloomberg_Latest())
\ No newline at end of file
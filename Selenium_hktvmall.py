@@ -1,38 +1,74 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+import sys
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-import time
-
-try:
-    service = webdriver.Chrome(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service)
-except Exception as e:
-    exit()
-    
-
-url = "https://www.hktvmall.com/hktv/en/search_a?keyword=iphone"
-try:
-    driver.get(url)
-    WebDriverWait(driver, 10).until(
-        EC.presence_of_element_located((By.CLASS_NAME, "info-wrapper"))
-    )
-except Exception as e:
-    driver.quit()
-    exit()
-
-soup = BeautifulSoup(driver.page_source, 'html.parser')
-
-peoduct_brief_wrapper = soup.find_all("span", class_= "product-brief-wrapper")
-
-for product in peoduct_brief_wrapper:
-    info_wrapper = product.find("div", class_="info-wrapper")
-    upper_wrapper = info_wrapper.find("div", class_="upper-wrapper")
-    product_name = upper_wrapper.find("div", class_="brand-product-name").text.strip()
-    print(product_name)
-    
-driver.quit()
-    
+from html_parsing import make_soup
+from hktvmall import BASE_URL, LAYOUT_SELECTOR, PRODUCT_TARGET, product_names, search_url
+from selenium_pool import DriverPool
+from rate_limit import throttle_sync
+from telemetry import traced_block, phase, text_size
+
+# Cards in any known layout mean the results have rendered
+PRODUCTS_LOADED = EC.presence_of_element_located((By.CSS_SELECTOR, LAYOUT_SELECTOR))
+
+def search_products(driver, keyword="iphone", base_url=BASE_URL, timeout=10):
+    """Product names for one keyword, loaded in `driver`
+
+    Callers throttle_sync(search_url(...)) before checking out `driver` (DriverPool.map's `before`).
+    """
+    url = search_url(keyword, base_url)
+    with phase("goto"):
+        driver.get(url)
+    with phase("discovery"):
+        WebDriverWait(driver, timeout).until(PRODUCTS_LOADED)
+
+    # Get page content, parsing only the product cards
+    with phase("content") as span:
+        html = driver.page_source
+        span.bytes = text_size(html)
+    with phase("parse", bytes=text_size(html)):
+        soup = make_soup(html, PRODUCT_TARGET)
+    with phase("extract") as span:
+        names = product_names(soup, base_url)
+        span.items = len(names)
+    return names
+
+def scrape_hktvmall(keywords=("iphone",), pool=None, base_url=BASE_URL):
+    """Search every keyword concurrently on a pool of headless drivers; returns {keyword: names}"""
+    keywords = list(keywords)
+    if not keywords:
+        # Nothing to search, and DriverPool/ThreadPoolExecutor need at least one worker
+        return {}
+
+    def search(driver, keyword):
+        return search_products(driver, keyword, base_url)
+
+    def wait_turn(keyword):
+        # Drivers run in threads, so they share the site's budget through the blocking variant
+        throttle_sync(search_url(keyword, base_url))
+
+    def failed(keyword, e):
+        # The pool has already discarded the driver that raised
+        print(f"Error searching '{keyword}': {e}")
+        return []
+
+    with traced_block("hktvmall_selenium", "hktvmall.com"):
+        own_pool = pool is None
+        if own_pool:
+            pool = DriverPool(size=min(len(keywords), 4))
+        try:
+            results = dict(zip(keywords, pool.map(search, keywords, on_error=failed, before=wait_turn)))
+        finally:
+            if own_pool:
+                pool.close()
+
+        with phase("export", items=sum(len(names) for names in results.values())):
+            for keyword, names in results.items():
+                print(f"=== {keyword}: {len(names)} products ===")
+                for name in names:
+                    print(name)
+    return results
+
+if __name__ == "__main__":
+    # python Selenium_hktvmall.py [keyword ...]  -> one pooled headless driver per keyword (up to 4)
+    scrape_hktvmall(sys.argv[1:] or ["iphone"])
@@ -0,0 +1,120 @@
+import time
+
+# Scrolls once, then watches the DOM with a MutationObserver until either new
+# content has arrived and the page has gone quiet, or nothing arrived at all
+# within `settleMs`. Returns the item count and scrollHeight afterwards.
+SCROLL_STEP_JS = """
+async ({selector, settleMs, quietMs, maxStepMs}) => {
+    const count = () => selector ? document.querySelectorAll(selector).length : 0;
+    const height = () => document.documentElement.scrollHeight;
+    const startCount = count();
+    const startHeight = height();
+    let lastMutation = performance.now();
+    const observer = new MutationObserver(() => { lastMutation = performance.now(); });
+    observer.observe(document.body, {childList: true, subtree: true});
+    window.scrollTo(0, height());
+    const started = performance.now();
+    try {
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, 100));
+            const now = performance.now();
+            const grew = count() > startCount || height() > startHeight;
+            if (grew && now - lastMutation >= quietMs) break;
+            if (!grew && now - started >= settleMs) break;
+            if (now - started >= maxStepMs) break;
+        }
+    } finally {
+        observer.disconnect();
+    }
+    return {count: count(), height: height()};
+}
+"""
+
+# Resolves once no DOM mutation has been seen for `quietMs` (or `maxMs` passed)
+DOM_QUIET_JS = """
+async ({quietMs, maxMs}) => {
+    let lastMutation = performance.now();
+    const observer = new MutationObserver(() => { lastMutation = performance.now(); });
+    observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true});
+    const started = performance.now();
+    try {
+        while (performance.now() - lastMutation < quietMs && performance.now() - started < maxMs) {
+            await new Promise(resolve => setTimeout(resolve, 50));
+        }
+    } finally {
+        observer.disconnect();
+    }
+    return performance.now() - started;
+}
+"""
+
+async def wait_for_dom_quiet(page, quiet_ms=500, max_ms=5000):
+    """Wait until the page stops mutating instead of sleeping a fixed time; returns ms waited"""
+    return await page.evaluate(DOM_QUIET_JS, {"quietMs": quiet_ms, "maxMs": max_ms})
+
+async def scroll_until_stable(page, item_selector=None, target_count=None, max_time=30000,
+                              settle_ms=2000, quiet_ms=300, max_stable_scrolls=1, harvester=None, verbose=True):
+    """Scroll to the bottom until the page stops growing, `target_count` items exist or `max_time` ms pass
+
+    Returns one dict per scroll with the number of items it produced, so callers
+    can see how productive each scroll was. With an IncrementalHarvester, newly
+    appended items are extracted after every scroll and scrolling stops early
+    once the harvester is done.
+    """
+    started = time.perf_counter()
+    selector_count = await page.evaluate(
+        "(selector) => selector ? document.querySelectorAll(selector).length : 0",
+        item_selector
+    )
+    height = await page.evaluate("document.documentElement.scrollHeight")
+    report = []
+    stable_scrolls = 0
+    if harvester is not None:
+        await harvester.harvest(page)
+
+    while True:
+        if harvester is not None and harvester.done:
+            if verbose:
+                print(f"Stopped scrolling: harvested {len(harvester.items)} items")
+            break
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        remaining_ms = max_time - elapsed_ms
+        if remaining_ms <= 0:
+            if verbose:
+                print(f"Stopped scrolling: reached the {max_time / 1000:.0f}s time cap")
+            break
+        if target_count is not None and selector_count >= target_count:
+            if verbose:
+                print(f"Stopped scrolling: reached target of {target_count} items")
+            break
+
+        result = await page.evaluate(SCROLL_STEP_JS, {
+            "selector": item_selector,
+            "settleMs": settle_ms,
+            "quietMs": quiet_ms,
+            "maxStepMs": remaining_ms
+        })
+        new_items = result["count"] - selector_count
+        grew = new_items > 0 or result["height"] > height
+        selector_count, height = result["count"], result["height"]
+        if harvester is not None:
+            await harvester.harvest(page)
+        report.append({
+            "scroll": len(report) + 1,
+            "new_items": new_items,
+            "total_items": selector_count,
+            "height": height
+        })
+        if verbose:
+            print(f"Scroll {len(report)}: +{new_items} items ({selector_count} total)")
+
+        if grew:
+            stable_scrolls = 0
+        else:
+            stable_scrolls += 1
+            if stable_scrolls >= max_stable_scrolls:
+                if verbose:
+                    print("Stopped scrolling: page is stable")
+                break
+
+    return report
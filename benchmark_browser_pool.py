@@ -0,0 +1,34 @@
+import argparse
+import asyncio
+import time
+from run_batch import SCRAPERS, run_batch, run_one
+
+async def run_sequential(names):
+    """Old behaviour: each scraper launches and closes its own Chromium, one after another"""
+    for name in names:
+        await run_one(name, SCRAPERS[name], None)
+
+async def main(names, pool_size):
+    print("=== Before: one browser launch per scraper, run sequentially ===")
+    start = time.perf_counter()
+    await run_sequential(names)
+    before = time.perf_counter() - start
+
+    print("\n=== After: shared browser pool, scrapers run concurrently ===")
+    start = time.perf_counter()
+    await run_batch(names, pool_size=pool_size)
+    after = time.perf_counter() - start
+
+    print("\n" + "=" * 60)
+    print(f"Scrapers:           {', '.join(names)}")
+    print(f"Before (sequential): {before:.2f}s")
+    print(f"After (pooled):      {after:.2f}s")
+    if after > 0:
+        print(f"Speed-up:            {before / after:.2f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare total batch time with and without the shared browser pool")
+    parser.add_argument("--only", nargs="+", choices=list(SCRAPERS), help="Scrapers to include (default: all)")
+    parser.add_argument("--pool-size", type=int, default=4, help="Number of reusable browser contexts")
+    args = parser.parse_args()
+    asyncio.run(main(args.only or list(SCRAPERS), args.pool_size))
@@ -0,0 +1,194 @@
+import argparse
+import copy
+import glob
+import importlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+from html_parsing import ParseTarget, make_soup
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(ROOT, "fixtures")
+RESULTS_DIR = os.path.join(ROOT, "benchmark_results")
+
+# Fixture runs must not teach the scrapers' shared selector cache anything about the real sites
+os.environ.setdefault("SCRAPER_SELECTOR_CACHE", "")
+
+# name -> fixture, CSS of the repeated item (what gets multiplied when scaling), and
+# the parse/extract steps each scraper module actually runs, loaded lazily so a
+# missing optional dependency only skips its own case
+def _quotes():
+    quotes = importlib.import_module("Beautifulsoup_quotes")
+    return (lambda html: make_soup(html, quotes.QUOTE_TARGET)), quotes.extract_quotes
+
+def _crypto():
+    crawl = importlib.import_module("crypto_crawl")
+    return (lambda html: make_soup(html, crawl.TABLE_TARGET)), (lambda soup: crawl.to_frame(*crawl.table_rows(soup)))
+
+def _hktvmall():
+    hktvmall = importlib.import_module("hktvmall")
+    return (lambda html: make_soup(html, hktvmall.PRODUCT_TARGET)), hktvmall.product_names
+
+def _berkeley():
+    from field_extraction import ExtractionSpec
+    berkeley = importlib.import_module("Berkeley_PhD")
+    spec = ExtractionSpec("div.program-grid", berkeley.PROGRAM_FIELDS)
+    target = ParseTarget("div", "program-grid")
+    return (lambda html: make_soup(html, target)), (lambda soup: spec.extract_html(soup, "https://grad.berkeley.edu"))
+
+def _bloomberg():
+    feed = importlib.import_module("bloomberg_feed")
+    target = ParseTarget("div", "Latest_storyPadding__GBJUE")
+    return (lambda html: make_soup(html, target)), (lambda soup: feed.STORY_SPEC.extract_html(soup, feed.BASE_URL))
+
+CASES = {
+    "quotes": ("quotes.html", "div.quote", _quotes),
+    "crypto_table": ("crypto_table.html", "table tbody tr", _crypto),
+    "hktvmall": ("hktvmall_search.html", "span.product-brief-wrapper", _hktvmall),
+    "hktvmall_bare": ("hktvmall_search_bare.html", "div.info-wrapper", _hktvmall),
+    "hktvmall_linked": ("hktvmall_search_linked.html", "a:has(> div.info-wrapper)", _hktvmall),
+    "berkeley": ("berkeley_programs.html", "div.program-grid", _berkeley),
+    "bloomberg": ("bloomberg_latest.html", "div.Latest_storyPadding__GBJUE", _bloomberg),
+}
+
+def scale_fixture(html, item_css, factor):
+    """The fixture with every item repeated `factor` times in place (the rest of the page unchanged)"""
+    if factor == 1:
+        return html
+    soup = BeautifulSoup(html, "html.parser")
+    for item in soup.select(item_css):
+        for _ in range(factor - 1):
+            item.insert_after(copy.copy(item))
+    return str(soup)
+
+def _median_ms(fn, arg, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(arg)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+def measure(parse, extract, html, repeat):
+    parse_ms, soup = _median_ms(parse, html, repeat)
+    extract_ms, items = _median_ms(extract, soup, repeat)
+
+    # Peak memory of one parse + extract, measured separately so tracing does not skew the timings
+    del soup
+    tracemalloc.start()
+    extract(parse(html))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "parse_ms": round(parse_ms, 3),
+        "extract_ms": round(extract_ms, 3),
+        "peak_kib": round(peak / 1024, 1),
+        "items": len(items),
+        "html_kib": round(len(html) / 1024, 1),
+    }
+
+def git_revision():
+    """Short commit id, with "-dirty" when the tree has uncommitted changes"""
+    try:
+        sha = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "--ignore-cr-at-eol", "HEAD", "--", "*.py"], cwd=ROOT).returncode
+        return sha + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def run(cases, scales, repeat):
+    results = {}
+    for name in cases:
+        fixture, item_css, loader = CASES[name]
+        try:
+            parse, extract = loader()
+        except ImportError as e:
+            print(f"{name:<14} skipped ({e})")
+            continue
+        with open(os.path.join(FIXTURE_DIR, fixture), "r", encoding="utf-8") as f:
+            html = f.read()
+        for factor in scales:
+            scaled = scale_fixture(html, item_css, factor)
+            # Fewer repeats for the big inputs keeps a full run to a minute or so
+            stats = measure(parse, extract, scaled, max(1, repeat // factor) if factor > 10 else repeat)
+            results[f"{name}@{factor}x"] = stats
+            print(f"{name:<14} {factor:>4}x {stats['html_kib']:>9.0f} {stats['items']:>7} "
+                  f"{stats['parse_ms']:>10.2f} {stats['extract_ms']:>10.2f} {stats['peak_kib']:>10.0f}")
+    return results
+
+def load_baseline(baseline):
+    """Stored results to compare with: a file, a revision, or (None) the most recent stored run"""
+    if baseline is None:
+        paths = glob.glob(os.path.join(RESULTS_DIR, "*.json"))
+        if not paths:
+            return None
+        baseline = max(paths, key=os.path.getmtime)
+    elif not os.path.exists(baseline):
+        # Allow a bare revision, e.g. --baseline 1a2b3c4
+        baseline = os.path.join(RESULTS_DIR, f"{baseline}.json")
+    with open(baseline, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def compare(current, baseline, threshold):
+    """Print every case slower or bigger than the baseline by more than `threshold`; returns the count"""
+    print(f"\nCompared with {baseline['revision']} ({baseline['created']}), threshold {threshold:.0%}:")
+    regressions = 0
+    for key, stats in current.items():
+        old = baseline["results"].get(key)
+        if not old:
+            continue
+        for metric in ("parse_ms", "extract_ms", "peak_kib"):
+            # Sub-millisecond steps are too noisy to flag on their own
+            if metric.endswith("_ms") and max(old[metric], stats[metric]) < 1.0:
+                continue
+            if old[metric] and stats[metric] > old[metric] * (1 + threshold):
+                regressions += 1
+                print(f"  REGRESSION {key:<22} {metric:<10} {old[metric]:>10.2f} -> {stats[metric]:>10.2f} "
+                      f"({stats[metric] / old[metric] - 1:+.0%})")
+    if not regressions:
+        print("  no regressions")
+    return regressions
+
+def main(cases, scales, repeat, baseline, threshold, save):
+    print(f"{'case':<14} {'scale':>5} {'html KiB':>9} {'items':>7} {'parse ms':>10} {'extract ms':>10} {'peak KiB':>10}")
+    print("-" * 72)
+    # Read the baseline first: saving may overwrite the previous run of this same revision
+    baseline = load_baseline(baseline)
+    results = run(cases, scales, repeat)
+
+    revision = git_revision()
+    path = os.path.join(RESULTS_DIR, f"{revision}.json")
+    if save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "revision": revision,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "results": results,
+            }, f, indent=2)
+        print(f"\nSaved {path}")
+
+    if baseline is not None:
+        return compare(results, baseline, threshold)
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse + extract time and peak memory per scraper on scaled HTML fixtures")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--scales", nargs="+", type=int, default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--baseline", help="results file or revision to compare with (default: the latest stored run)")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown/growth flagged as a regression")
+    parser.add_argument("--no-save", action="store_true", help="do not store this run under benchmark_results/")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 when a regression is flagged")
+    args = parser.parse_args()
+    regressions = main(args.cases, args.scales, args.repeat, args.baseline, args.threshold, not args.no_save)
+    sys.exit(1 if regressions and args.fail_on_regression else 0)
@@ -0,0 +1,38 @@
+import argparse
+import asyncio
+from browser_pool import BrowserPool
+from fixture_server import start_server
+from hktvmall_crawl import HktvmallCrawler
+
+async def run(base_url, keywords, concurrency, pages_ahead):
+    async with BrowserPool(size=concurrency) as pool:
+        crawler = HktvmallCrawler(pool, keywords, base_url=base_url, concurrency=concurrency,
+                                  pages_ahead=pages_ahead, timeout=2000)
+        async for _ in crawler.crawl():
+            pass
+    return crawler
+
+def main(keywords, search_pages, latency, concurrency):
+    server, base_url = start_server(latency=latency, search_pages=search_pages)
+    keywords = [f"keyword{i}" for i in range(keywords)]
+    print(f"Stand-in site at {base_url}: {len(keywords)} keywords x {search_pages} recorded result pages, "
+          f"{latency * 1000:.0f} ms latency per response")
+    try:
+        # One page at a time is what running the old script once per keyword amounts to (minus the relaunches)
+        baseline = asyncio.run(run(base_url, keywords, 1, 1))
+        print(f"one page at a time  : {baseline.summary()}")
+        for limit in concurrency:
+            crawler = asyncio.run(run(base_url, keywords, limit, 2))
+            speedup = baseline.elapsed / crawler.elapsed if crawler.elapsed else 0.0
+            print(f"concurrency={limit:<8}: {crawler.summary()} ({speedup:.1f}x)")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Products/sec of the HKTVmall crawler on recorded result pages")
+    parser.add_argument("--keywords", type=int, default=8)
+    parser.add_argument("--search-pages", type=int, default=3, help="result pages per keyword on the stand-in site")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds of simulated server latency")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 8])
+    args = parser.parse_args()
+    main(args.keywords, args.search_pages, args.latency, args.concurrency)
@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import time
+from fixture_server import start_server
+
+# Both engines load the recorded search page (fixtures/hktvmall_search.html) from the
+# local stand-in site, so the comparison is browser + driver overhead, not hktvmall.com
+
+def keywords_for(searches):
+    return [f"keyword{i}" for i in range(searches)]
+
+def bench_selenium(base_url, searches, pool_size):
+    from selenium_pool import DriverPool
+    from Selenium_hktvmall import search_products
+    from hktvmall import search_url
+    from rate_limit import throttle_sync
+
+    def wait_turn(keyword):
+        throttle_sync(search_url(keyword, base_url))
+
+    with DriverPool(size=pool_size) as pool:
+        start = time.perf_counter()
+        wait_turn("iphone")
+        with pool.driver() as driver:
+            first = search_products(driver, "iphone", base_url)
+        cold = time.perf_counter() - start
+
+        # Start the rest of the pool so the timed batch measures searches, not launches
+        pool.map(lambda driver, _: None, range(pool_size))
+        start = time.perf_counter()
+        results = pool.map(lambda driver, keyword: search_products(driver, keyword, base_url), keywords_for(searches),
+                           before=wait_turn)
+        warm = time.perf_counter() - start
+    return cold, warm, first, results
+
+async def _bench_playwright(base_url, searches, pool_size):
+    from browser_pool import BrowserPool
+    from Plaaywright_hktvmall import search_products
+    from hktvmall import search_url
+    from rate_limit import throttle
+
+    async with BrowserPool(size=pool_size) as pool:
+        start = time.perf_counter()
+        await throttle(search_url("iphone", base_url))
+        async with pool.page() as page:
+            first = await search_products(page, "iphone", base_url)
+        cold = time.perf_counter() - start
+
+        async def search(keyword):
+            await throttle(search_url(keyword, base_url))
+            async with pool.page() as page:
+                return await search_products(page, keyword, base_url)
+
+        await asyncio.gather(*(search(f"warmup{i}") for i in range(pool_size)))
+        start = time.perf_counter()
+        results = await asyncio.gather(*(search(keyword) for keyword in keywords_for(searches)))
+        warm = time.perf_counter() - start
+    return cold, warm, first, results
+
+def bench_playwright(base_url, searches, pool_size):
+    return asyncio.run(_bench_playwright(base_url, searches, pool_size))
+
+ENGINES = {
+    "selenium": bench_selenium,
+    "playwright": bench_playwright,
+}
+
+def main(engines, searches, pool_size, latency):
+    server, base_url = start_server(latency=latency)
+    print(f"Stand-in site at {base_url}: recorded HKTVmall search page, {latency * 1000:.0f} ms latency per response")
+    print(f"{'engine':<12} {'cold start':>11} {'searches':>9} {'total':>8} {'per search':>11} {'searches/s':>11} {'products':>9}")
+    print("-" * 77)
+    names = {}
+    try:
+        for engine in engines:
+            try:
+                cold, warm, first, results = ENGINES[engine](base_url, searches, pool_size)
+            except Exception as e:
+                print(f"{engine:<12} failed: {e!r}")
+                continue
+            names[engine] = first
+            print(f"{engine:<12} {cold:>10.2f}s {searches:>9} {warm:>7.2f}s {warm / searches * 1000:>9.0f}ms "
+                  f"{searches / warm:>11.1f} {sum(len(r) for r in results):>9}")
+    finally:
+        server.shutdown()
+
+    # Same page, same parser: both engines should see the same products
+    if len(names) == 2:
+        a, b = names.values()
+        print("\nProduct lists match" if a == b else f"\nProduct lists differ: {len(a)} vs {len(b)} names")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Selenium vs Playwright HKTVmall search on the same recorded page")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument("--searches", type=int, default=20, help="keyword searches in the timed batch")
+    parser.add_argument("--pool-size", type=int, default=4, help="drivers / browser contexts working concurrently")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds of simulated server latency")
+    args = parser.parse_args()
+    main(args.engines, args.searches, args.pool_size, args.latency)
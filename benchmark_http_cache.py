@@ -0,0 +1,48 @@
+import argparse
+import asyncio
+import shutil
+import tempfile
+from fixture_server import start_server
+from http_cache import HttpCache
+from quotes_crawler import QuotesCrawler
+
+def run(base_url, cache, concurrency):
+    crawler = QuotesCrawler(base_url, concurrency=concurrency, cache=cache)
+    asyncio.run(crawler.crawl())
+    return crawler
+
+def main(pages, latency, concurrency, max_age):
+    directory = tempfile.mkdtemp(prefix="http_cache_")
+    # Validators only: every repeat visit is a conditional request answered with 304
+    server, base_url = start_server(latency=latency, pages=pages, validators=True)
+    # Validators plus max-age: repeat visits inside the window make no request at all
+    fresh_server, fresh_url = start_server(latency=latency, pages=pages, validators=True, max_age=max_age)
+    try:
+        print(f"{'run':<28} {'s':>6} {'pages':>6} {'quotes':>7} {'hit':>5} {'304':>5} {'miss':>5} {'KiB down':>9}")
+        print("-" * 78)
+        for label, url in [("cold (empty cache)", base_url), ("revalidate (ETag -> 304)", base_url),
+                           ("cold, max-age", fresh_url), (f"fresh (max-age={max_age})", fresh_url)]:
+            with HttpCache(directory) as cache:
+                crawler = run(url, cache, concurrency)
+                s = cache.stats()
+            print(f"{label:<28} {crawler.elapsed:>6.2f} {crawler.pages:>6} {len(crawler.quotes):>7} "
+                  f"{s['hits']:>5} {s['revalidated']:>5} {s['misses']:>5} {crawler.bytes / 1024:>9.0f}")
+
+        # LRU: a cap smaller than the site keeps only the most recently used pages
+        shutil.rmtree(directory)
+        with HttpCache(directory, max_bytes=200 * 1024) as cache:
+            run(base_url, cache, concurrency)
+            print(f"\n200 KiB cap: {cache.summary()}")
+    finally:
+        server.shutdown()
+        fresh_server.shutdown()
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold vs revalidated vs fresh crawls through the on-disk HTTP cache")
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-age", type=int, default=300)
+    args = parser.parse_args()
+    main(args.pages, args.latency, args.concurrency, args.max_age)
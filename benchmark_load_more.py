@@ -0,0 +1,97 @@
+import argparse
+import asyncio
+import time
+from run_batch import create_pool
+from consent import dismiss_consent
+from selector_race import race_selectors
+from load_more import load_more_until_exhausted
+
+URL = "https://www.bloomberg.com/latest"
+STORY_SELECTOR = "[class*='Latest_storyPadding']"
+
+# The selector list and loop the wizard used before the in-page detector
+LEGACY_LOAD_MORE_SELECTORS = [
+    'button:has-text("Load More")',
+    'button:has-text("Show More")',
+    'button:has-text("More Stories")',
+    'button:has-text("View More")',
+    '[data-testid="load-more"]',
+    '[class*="load-more" i]',
+    '[class*="LoadMore" i]',
+    '[class*="show-more" i]',
+    'button[aria-label*="load more" i]',
+    'button[aria-label*="show more" i]',
+    '.load-more-button',
+    '#load-more',
+    'button[class*="More"]'
+]
+
+async def count_items(page, selector):
+    return await page.evaluate("(s) => document.querySelectorAll(s).length", selector)
+
+def record_milestones(milestones, reached, count, elapsed):
+    for target in milestones:
+        if count >= target and target not in reached:
+            reached[target] = elapsed
+
+async def legacy_load_more(page, item_selector, milestones):
+    started = time.perf_counter()
+    reached = {}
+    load_more_clicked = 0
+    for _ in range(6):
+        await page.evaluate("window.scrollTo(0, document.documentElement.scrollHeight);")
+        await page.wait_for_timeout(2000)
+        record_milestones(milestones, reached, await count_items(page, item_selector), time.perf_counter() - started)
+        for selector in LEGACY_LOAD_MORE_SELECTORS:
+            try:
+                button = await page.wait_for_selector(selector, timeout=2000)
+                if button and await button.is_visible() and await button.is_enabled() and load_more_clicked < 5:
+                    await button.scroll_into_view_if_needed()
+                    await page.wait_for_timeout(1000)
+                    await button.click()
+                    load_more_clicked += 1
+                    await page.wait_for_timeout(3000)
+                    break
+            except Exception:
+                continue
+        record_milestones(milestones, reached, await count_items(page, item_selector), time.perf_counter() - started)
+    return reached, time.perf_counter() - started
+
+async def new_load_more(page, item_selector, milestones):
+    started = time.perf_counter()
+    reached = {}
+    record_milestones(milestones, reached, await count_items(page, item_selector), 0.0)
+    rounds = await load_more_until_exhausted(page, item_selector, target_count=max(milestones), verbose=False)
+    for r in rounds:
+        record_milestones(milestones, reached, r["total_items"], r["elapsed"])
+    return reached, time.perf_counter() - started
+
+async def run_variant(pool, name, loader, url, item_selector, milestones):
+    async with pool.page() as page:
+        await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        await dismiss_consent(page)
+        found, _ = await race_selectors(page, [item_selector], timeout=15000)
+        if not found:
+            print(f"[{name}] no items matching {item_selector}; skipping")
+            return None
+        reached, total = await loader(page, item_selector, milestones)
+    print(f"\n[{name}] total {total:.1f}s")
+    for target in milestones:
+        if target in reached:
+            print(f"  time to {target:>4} stories: {reached[target]:6.1f}s")
+        else:
+            print(f"  time to {target:>4} stories:    not reached")
+    return reached, total
+
+async def main(url, item_selector, milestones):
+    async with create_pool(size=1) as pool:
+        await run_variant(pool, "legacy selector loop", legacy_load_more, url, item_selector, milestones)
+        await run_variant(pool, "in-page detector", new_load_more, url, item_selector, milestones)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time-to-N-stories for the old and new load-more loops")
+    parser.add_argument("--url", default=URL)
+    parser.add_argument("--selector", default=STORY_SELECTOR)
+    parser.add_argument("--targets", nargs="+", type=int, default=[20, 50, 100])
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.selector, sorted(args.targets)))
@@ -0,0 +1,71 @@
+import argparse
+import importlib
+import os
+import statistics
+import time
+import tracemalloc
+from html_parsing import ParseTarget, available_backends, make_soup
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def _declared(module, name):
+    # The target object the scraper module parses with, loaded lazily so a missing
+    # optional dependency only skips its own case
+    return lambda: getattr(importlib.import_module(module), name)
+
+def _fixed(target):
+    return lambda: target
+
+# fixture file -> (target each scraper declares, CSS used to check the result). Berkeley and
+# Bloomberg extract in the page and declare no target; theirs match benchmark_extraction.py
+CASES = {
+    "quotes.html": (_declared("Beautifulsoup_quotes", "QUOTE_TARGET"), "div.quote"),
+    "crypto_table.html": (_declared("crypto_crawl", "TABLE_TARGET"), "table tr"),
+    "hktvmall_search.html": (_declared("hktvmall", "PRODUCT_TARGET"), "span.product-brief-wrapper"),
+    "hktvmall_search_bare.html": (_declared("hktvmall", "PRODUCT_TARGET"), "div.info-wrapper"),
+    "hktvmall_search_linked.html": (_declared("hktvmall", "PRODUCT_TARGET"), "a:has(> div.info-wrapper)"),
+    "berkeley_programs.html": (_fixed(ParseTarget("div", "program-grid")), "div.program-grid"),
+    "bloomberg_latest.html": (_fixed(ParseTarget("div", "Latest_storyPadding__GBJUE")), "div.Latest_storyPadding__GBJUE"),
+}
+
+def measure(html, target, backend, check_css, repeat):
+    """Median parse time (ms), peak traced memory (KiB) and matched element count"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        soup = make_soup(html, target, backend)
+        timings.append((time.perf_counter() - start) * 1000)
+    count = len(soup.select(check_css))
+
+    tracemalloc.start()
+    soup = make_soup(html, target, backend)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del soup
+    return statistics.median(timings), peak / 1024, count
+
+def main(repeat, backends):
+    print(f"{'fixture':<28} {'backend':<12} {'mode':<9} {'ms':>8} {'peak KiB':>10} {'items':>6}")
+    print("-" * 78)
+    for fixture, (load_target, check_css) in CASES.items():
+        try:
+            target = load_target()
+        except ImportError as e:
+            print(f"{fixture:<28} skipped: {e}\n")
+            continue
+        with open(os.path.join(FIXTURE_DIR, fixture), "r", encoding="utf-8") as f:
+            html = f.read()
+        for backend in backends:
+            # lexbor only makes sense with a target; without one it is the default bs4 backend
+            modes = [("strained", target)] if backend == "lexbor" else [("full", None), ("strained", target)]
+            for mode, mode_target in modes:
+                ms, peak, count = measure(html, mode_target, backend, check_css, repeat)
+                print(f"{fixture:<28} {backend:<12} {mode:<9} {ms:>8.2f} {peak:>10.0f} {count:>6}")
+        print()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-backend parse time and memory on the saved HTML fixtures")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--backends", nargs="+", default=available_backends())
+    args = parser.parse_args()
+    main(args.repeat, args.backends)
@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from story_records import Story
+
+def fake_stories(n):
+    """Generate n Story records lazily, like a long scrape would"""
+    for i in range(n):
+        yield Story(f"Story {i}: markets move as investors weigh the latest data release", f"{i % 12 + 1}:{i % 60:02d} PM", None, None)
+
+def legacy_report(stories, filename):
+    """The previous create_pdf_report: rebuild styles, collect every flowable, build once"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+
+    doc = SimpleDocTemplate(filename, pagesize=letter)
+    styles = getSampleStyleSheet()
+    story = []
+    title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=18, spaceAfter=30, alignment=1)
+    article_title_style = ParagraphStyle('ArticleTitle', parent=styles['Heading2'], fontSize=12, spaceAfter=6, textColor='darkblue')
+    time_style = ParagraphStyle('TimeStyle', parent=styles['Normal'], fontSize=10, textColor='gray', spaceAfter=12)
+    story.append(Paragraph("Bloomberg Latest News Report", title_style))
+    story.append(Spacer(1, 0.2*inch))
+    for i, article in enumerate(stories, 1):
+        story.append(Paragraph(f"{i}. {article.title}", article_title_style))
+        story.append(Paragraph(f"Published: {article.time}", time_style))
+        story.append(Spacer(1, 0.1*inch))
+    doc.build(story)
+
+def streaming_report(stories, filename):
+    from pdf_report import write_pdf_report
+    write_pdf_report(stories, filename)
+
+def run_child(mode, size):
+    """Run one measurement in this process and print it as JSON (called in a fresh subprocess)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "report.pdf")
+        start = time.perf_counter()
+        (legacy_report if mode == "legacy" else streaming_report)(fake_stories(size), filename)
+        elapsed = time.perf_counter() - start
+        size_bytes = os.path.getsize(filename)
+    peak_rss_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"mode": mode, "size": size, "seconds": elapsed, "peak_rss_mib": peak_rss_kib / 1024, "pdf_mib": size_bytes / 2**20}))
+
+def measure(mode, size):
+    out = subprocess.run([sys.executable, __file__, "--child", mode, str(size)], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+# Peak RSS of the streaming writer at 100k stories may be at most this multiple of its peak at 10k
+RSS_GROWTH_LIMIT = 1.5
+
+def check_rss(small=10_000, large=100_000, limit=RSS_GROWTH_LIMIT):
+    """Fail unless streaming memory stays flat: 10x the stories must not need anywhere near 10x the RSS"""
+    small_rss = measure("streaming", small)["peak_rss_mib"]
+    large_rss = measure("streaming", large)["peak_rss_mib"]
+    ratio = large_rss / small_rss
+    print(f"streaming peak RSS: {small_rss:.1f} MiB at {small} stories, {large_rss:.1f} MiB at {large} "
+          f"({ratio:.2f}x, limit {limit}x)")
+    if ratio > limit:
+        sys.exit(f"Peak RSS grew {ratio:.2f}x from {small} to {large} stories (limit {limit}x)")
+
+def main(sizes, modes):
+    print(f"{'stories':>8} {'mode':<10} {'seconds':>9} {'peak RSS MiB':>13} {'PDF MiB':>8}")
+    print("-" * 52)
+    for size in sizes:
+        for mode in modes:
+            r = measure(mode, size)
+            print(f"{size:>8} {mode:<10} {r['seconds']:>9.2f} {r['peak_rss_mib']:>13.1f} {r['pdf_mib']:>8.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time and peak RSS of the legacy vs streaming PDF report writer")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 10_000, 100_000])
+    parser.add_argument("--modes", nargs="+", choices=["legacy", "streaming"], default=["legacy", "streaming"])
+    parser.add_argument("--check", action="store_true",
+                        help=f"only check that streaming peak RSS at 100k stories is within {RSS_GROWTH_LIMIT}x of 10k")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(args.child[0], int(args.child[1]))
+    elif args.check:
+        check_rss()
+    else:
+        main(args.sizes, args.modes)
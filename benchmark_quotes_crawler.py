@@ -0,0 +1,56 @@
+import argparse
+import asyncio
+import time
+import requests
+from fixture_server import start_server
+from quotes_crawler import QuotesCrawler, parse_page
+
+def crawl_sequential(base_url, follow_authors=True, follow_tags=True):
+    """The original approach -- one bare requests.get per page, one page at a time -- over the same link graph"""
+    pending = [base_url.rstrip("/") + "/"]
+    seen = set(pending)
+    pages = 0
+    quotes = set()
+    start = time.perf_counter()
+    while pending:
+        url = pending.pop(0)
+        response = requests.get(url)
+        if response.status_code != 200:
+            continue
+        pages += 1
+        page_quotes, _, next_url, author_urls, tag_urls = parse_page(response.text, url)
+        quotes.update((q.text, q.author) for q in page_quotes)
+        links = [next_url]
+        if follow_authors:
+            links += author_urls
+        if follow_tags:
+            links += tag_urls
+        for link in links:
+            if link and link not in seen:
+                seen.add(link)
+                pending.append(link)
+    return pages, len(quotes), time.perf_counter() - start
+
+def main(pages, latency, concurrency):
+    server, base_url = start_server(latency=latency, pages=pages)
+    print(f"Stand-in site at {base_url}: {pages} listing pages, {latency * 1000:.0f} ms latency per response")
+    try:
+        seq_pages, seq_quotes, seq_time = crawl_sequential(base_url)
+        print(f"sequential requests.get : {seq_pages} pages, {seq_quotes} quotes in {seq_time:.2f}s "
+              f"= {seq_pages / seq_time:.1f} pages/s")
+        for limit in concurrency:
+            crawler = QuotesCrawler(base_url, concurrency=limit)
+            asyncio.run(crawler.crawl())
+            print(f"async, concurrency={limit:<3}: {crawler.pages} pages, {len(crawler.quotes)} quotes in "
+                  f"{crawler.elapsed:.2f}s = {crawler.pages / crawler.elapsed:.1f} pages/s "
+                  f"({seq_time / crawler.elapsed:.1f}x)")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pages/sec of the async quotes crawler vs the sequential requests path")
+    parser.add_argument("--pages", type=int, default=10, help="listing pages on the stand-in site")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds of simulated server latency")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 8, 16])
+    args = parser.parse_args()
+    main(args.pages, args.latency, args.concurrency)
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import os
+import re
+import sys
+from urllib.parse import urljoin, urlparse
+from field_extraction import ExtractionSpec
+from telemetry import phase
+
+BASE_URL = "https://www.bloomberg.com"
+
+# Keys the Bloomberg feed uses (or has used) for each story field, in order of preference
+TITLE_KEYS = ("headline", "title", "primaryHeadline", "seoHeadline")
+URL_KEYS = ("url", "longURL", "canonicalUrl", "link", "href")
+TIME_KEYS = ("publishedAt", "published", "updatedAt", "lastModified", "date", "publishedTime")
+
+# Per-story fields when reading the rendered page instead: name -> (relative selector, attribute or None for text)
+STORY_DOM_FIELDS = {
+    "title": ("div.Latest_itemTextContainer__YMnVV a div span", None),
+    "url": ("div.Latest_itemTextContainer__YMnVV a", "href"),
+    "time": ("div.Latest_desktopTimestamp__oiCLC div.Latest_itemTimestamp__SqjF_ time", None),
+    "datetime": ("div.Latest_desktopTimestamp__oiCLC div.Latest_itemTimestamp__SqjF_ time", "datetime"),
+}
+STORY_SPEC = ExtractionSpec("div.Latest_storyPadding__GBJUE", STORY_DOM_FIELDS)
+
+def _first(item, keys):
+    for key in keys:
+        value = item.get(key)
+        if isinstance(value, dict):
+            # Some payloads nest text as {"text": "..."} or {"plain": "..."}
+            value = value.get("text") or value.get("plain")
+        if value not in (None, ""):
+            return value
+    return None
+
+def _is_story_url(url):
+    return isinstance(url, str) and ("/news/" in url or "/articles/" in url)
+
+def stories_from_payload(payload):
+    """Walk a decoded JSON payload and return every story dict found as {title, time, url}"""
+    stories = []
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            title = _first(node, TITLE_KEYS)
+            url = _first(node, URL_KEYS)
+            if isinstance(title, str) and _is_story_url(url):
+                stories.append({
+                    "title": title.strip(),
+                    "time": _first(node, TIME_KEYS),
+                    "url": urljoin(BASE_URL, url)
+                })
+            stack.extend(reversed([v for v in node.values() if isinstance(v, (dict, list))]))
+    return stories
+
+# JSON the page embeds for its own first render (Next.js __NEXT_DATA__ and other application/json scripts)
+EMBEDDED_JSON_SELECTOR = "script[type='application/json'], script[type='application/ld+json'], script#__NEXT_DATA__"
+# The same blocks found in saved page HTML, for offline decoding
+EMBEDDED_JSON_RE = re.compile(
+    r'<script[^>]*type="application/(?:ld\+)?json"[^>]*>(.*?)</script>', re.DOTALL | re.IGNORECASE)
+
+def decode_payloads(texts):
+    """Decode JSON script bodies, skipping any that are not valid JSON"""
+    payloads = []
+    for text in texts:
+        try:
+            payloads.append(json.loads(text))
+        except (TypeError, ValueError):
+            continue
+    return payloads
+
+def embedded_payloads(html):
+    """Decoded JSON script blocks of saved page HTML; unlike the DOM they do not depend on CSS class names"""
+    return decode_payloads(match.group(1) for match in EMBEDDED_JSON_RE.finditer(html or ""))
+
+async def read_embedded(page):
+    """Decoded JSON script blocks of a live page, read in-page so the DOM is never serialized"""
+    texts = await page.eval_on_selector_all(EMBEDDED_JSON_SELECTOR, "els => els.map(e => e.textContent)")
+    return decode_payloads(texts)
+
+def stories_from_embedded(html):
+    """Stories from the JSON embedded in saved or live page HTML"""
+    found = []
+    for payload in embedded_payloads(html):
+        found.extend(stories_from_payload(payload))
+    return dedupe_stories(found)
+
+def stories_from_html(html, container=None):
+    """Extract stories from saved page HTML with the same spec the live scrapers run in-page"""
+    spec = STORY_SPEC if container is None else STORY_SPEC.with_container(container)
+    return spec.extract_html(html, BASE_URL)
+
+def dedupe_stories(stories):
+    """Keep the first occurrence of every URL, preserving feed order"""
+    seen = set()
+    unique = []
+    for story in stories:
+        if story["url"] in seen:
+            continue
+        seen.add(story["url"])
+        unique.append(story)
+    return unique
+
+class FeedCapture:
+    """Collects JSON XHR/fetch responses from a page while it loads and scrolls"""
+
+    def __init__(self, host_suffix="bloomberg.com", save_dir=None):
+        self.host_suffix = host_suffix
+        self.save_dir = save_dir
+        self.payloads = []
+        self.embedded = []
+        self._pending = set()
+
+    def attach(self, page):
+        page.on("response", self._on_response)
+        return self
+
+    def _on_response(self, response):
+        if response.request.resource_type not in ("xhr", "fetch"):
+            return
+        host = urlparse(response.url).hostname or ""
+        if not host.endswith(self.host_suffix):
+            return
+        if "json" not in response.headers.get("content-type", ""):
+            return
+        task = asyncio.ensure_future(self._read(response))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _read(self, response):
+        try:
+            payload = await response.json()
+        except Exception:
+            return
+        self.payloads.append(payload)
+        if self.save_dir:
+            os.makedirs(self.save_dir, exist_ok=True)
+            path = os.path.join(self.save_dir, f"response_{len(self.payloads):04d}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"url": response.url, "body": payload}, f)
+
+    async def drain(self):
+        """Wait for response bodies that are still being read"""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    async def read_embedded(self, page):
+        """Read the JSON the live page embeds; it is decoded ahead of the captured responses"""
+        self.embedded = await read_embedded(page)
+        return self.embedded
+
+    async def stories(self, html=None):
+        """Stories from the embedded JSON and captured responses, plus the JSON embedded in saved `html`"""
+        await self.drain()
+        found = []
+        for payload in self.embedded + embedded_payloads(html) + self.payloads:
+            found.extend(stories_from_payload(payload))
+        return dedupe_stories(found)
+
+class FeedHarvester:
+    """Harvests a FeedCapture from scroll_until_stable instead of the DOM
+
+    The first round decodes the page's embedded JSON; every later round decodes
+    only the responses that arrived since, deduped by URL. It is `done` once a
+    scroll brings no new stories or `max_items` are collected.
+    """
+
+    def __init__(self, capture, max_items=None):
+        self.capture = capture
+        self.max_items = max_items
+        self.items = []
+        self.seen = set()
+        self.done = False
+        self.rounds = 0
+        self._decoded = 0
+
+    async def harvest(self, page):
+        """Decode what arrived since the last round; returns the new unique stories"""
+        with phase("extract") as span:
+            payloads = await self.capture.read_embedded(page) if self.rounds == 0 else []
+            await self.capture.drain()
+            payloads = payloads + self.capture.payloads[self._decoded:]
+            self._decoded = len(self.capture.payloads)
+            new_items = []
+            for payload in payloads:
+                for story in stories_from_payload(payload):
+                    if self.done or story["url"] in self.seen:
+                        continue
+                    self.seen.add(story["url"])
+                    new_items.append(story)
+                    self.items.append(story)
+                    if self.max_items is not None and len(self.items) >= self.max_items:
+                        self.done = True
+            span.items = len(new_items)
+        if self.rounds > 0 and not new_items:
+            # The scroll's responses held nothing new: the feed has run out
+            self.done = True
+        self.rounds += 1
+        return new_items
+
+def load_saved_payloads(paths):
+    """Read responses written by FeedCapture(save_dir=...) (or bare JSON bodies)"""
+    payloads = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        payloads.append(data["body"] if isinstance(data, dict) and "body" in data else data)
+    return payloads
+
+if __name__ == "__main__":
+    # Decode previously recorded responses offline: python bloomberg_feed.py recorded/*.json
+    found = []
+    for payload in load_saved_payloads(sys.argv[1:]):
+        found.extend(stories_from_payload(payload))
+    for i, story in enumerate(dedupe_stories(found), 1):
+        print(f"{i}. Title: {story['title']}")
+        print(f"   Time: {story['time']}")
+        print(f"   URL: {story['url']}")
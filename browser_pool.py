@@ -0,0 +1,152 @@
+import asyncio
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+from har_archive import HarArchive
+from telemetry import phase
+
+# Launch flags used by the Bloomberg scrapers to look less like automation
+STEALTH_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-web-security',
+    '--disable-features=VizDisplayCompositor'
+]
+
+# Hide navigator.webdriver on every page of a context
+STEALTH_INIT_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined,
+    });
+"""
+
+class BrowserPool:
+    """One Chromium process shared by all scrapers, with a bounded set of reusable contexts"""
+
+    def __init__(self, size=4, headless=True, launch_args=None, context_options=None, init_script=None, har=None):
+        self.size = size
+        self.headless = headless
+        self.launch_args = launch_args or []
+        self.context_options = context_options or {}
+        self.init_script = init_script
+        # HAR record/replay (har_archive.HarArchive); by default chosen by SCRAPER_HAR_MODE
+        self.har = har if har is not None else HarArchive.from_env()
+
+        self._playwright = None
+        self._browser = None
+        self._idle = []
+        self._slots = None
+
+        # Simple counters so a batch run can report how much reuse it got
+        self.checkouts = 0
+        self.contexts_created = 0
+
+    async def start(self):
+        """Launch the shared Chromium process"""
+        if self._browser is not None:
+            return self
+        with phase("launch"):
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(
+                headless=self.headless,
+                args=self.launch_args
+            )
+        self._slots = asyncio.Semaphore(self.size)
+        return self
+
+    async def close(self):
+        """Close every pooled context, the browser and the Playwright driver"""
+        for context in self._idle:
+            try:
+                await context.close()
+            except Exception:
+                pass
+        self._idle.clear()
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _new_context(self):
+        options = dict(self.context_options)
+        if self.har is not None:
+            options.update(self.har.context_options())
+        with phase("new_context"):
+            context = await self._browser.new_context(**options)
+            if self.har is not None:
+                await self.har.attach(context)
+            if self.init_script:
+                await context.add_init_script(self.init_script)
+        self.contexts_created += 1
+        return context
+
+    async def checkout(self):
+        """Borrow a context, waiting if all `size` contexts are in use"""
+        if self._browser is None:
+            await self.start()
+        await self._slots.acquire()
+        try:
+            if self._idle:
+                context = self._idle.pop()
+            else:
+                context = await self._new_context()
+        except Exception:
+            self._slots.release()
+            raise
+        self.checkouts += 1
+        return context
+
+    async def checkin(self, context, discard=False):
+        """Return a context to the pool; its pages are closed but cookies are kept"""
+        try:
+            if not discard:
+                for page in list(context.pages):
+                    await page.close()
+                self._idle.append(context)
+            else:
+                await context.close()
+        except Exception:
+            # A context that cannot be cleaned up is not worth reusing
+            try:
+                await context.close()
+            except Exception:
+                pass
+        finally:
+            self._slots.release()
+
+    @asynccontextmanager
+    async def context(self):
+        """`async with pool.context() as context:` checkout/checkin helper"""
+        context = await self.checkout()
+        discard = False
+        try:
+            yield context
+        except BaseException:
+            discard = True
+            raise
+        finally:
+            await self.checkin(context, discard=discard)
+
+    @asynccontextmanager
+    async def page(self):
+        """`async with pool.page() as page:` opens a fresh page in a pooled context"""
+        async with self.context() as context:
+            page = await context.new_page()
+            yield page
+
+@asynccontextmanager
+async def pooled_page(pool=None, **pool_options):
+    """Yield a page from `pool`, or from a one-off pool when a scraper runs standalone"""
+    if pool is not None:
+        async with pool.page() as page:
+            yield page
+    else:
+        async with BrowserPool(size=1, **pool_options) as own_pool:
+            async with own_pool.page() as page:
+                yield page
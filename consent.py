@@ -0,0 +1,117 @@
+import json
+import os
+import re
+from adaptive_scroll import wait_for_dom_quiet
+from urls import site_of
+
+# Common selectors for accept buttons, in order of preference.
+# `:has-text("...")` is matched in-page as a case-insensitive text search.
+DEFAULT_CONSENT_SELECTORS = [
+    'button[data-testid="accept-all"]',
+    'button[id*="accept"]',
+    'button[class*="accept"]',
+    'button:has-text("Accept")',
+    'button:has-text("Accept All")',
+    'button:has-text("I Accept")',
+    'button:has-text("Continue")',
+    'button:has-text("Agree")',
+    '[data-testid="cookie-accept"]',
+    '.cookie-accept',
+    '#cookie-accept',
+    'button[aria-label*="Accept all" i]',
+    'button[name="agree"]'
+]
+
+MEMORY_FILE = "consent_memory.json"
+
+HAS_TEXT_RE = re.compile(r'^(.*):has-text\("(.*)"\)$')
+
+# Finds the first visible candidate in one pass and clicks it in-page.
+# Returns the index of the clicked candidate, or -1 when there is no overlay.
+DISMISS_JS = """
+(candidates) => {
+    const isVisible = el => {
+        const style = window.getComputedStyle(el);
+        return el.getClientRects().length > 0 && style.visibility !== 'hidden' && style.display !== 'none';
+    };
+    for (let i = 0; i < candidates.length; i++) {
+        const {css, text} = candidates[i];
+        let nodes;
+        try {
+            nodes = document.querySelectorAll(css);
+        } catch (e) {
+            continue;
+        }
+        for (const node of nodes) {
+            if (!isVisible(node) || node.disabled) continue;
+            if (text && !(node.innerText || '').toLowerCase().includes(text)) continue;
+            node.click();
+            return i;
+        }
+    }
+    return -1;
+}
+"""
+
+def _to_candidate(selector):
+    match = HAS_TEXT_RE.match(selector)
+    if match:
+        return {"css": match.group(1) or "*", "text": match.group(2).lower()}
+    return {"css": selector, "text": None}
+
+class ConsentHandler:
+    """Dismisses cookie/consent overlays with one in-page query, remembering per domain which selector worked"""
+
+    def __init__(self, selectors=None, memory_path=MEMORY_FILE):
+        self.selectors = list(selectors or DEFAULT_CONSENT_SELECTORS)
+        self.memory_path = memory_path
+        self.memory = self._load_memory()
+
+    def _load_memory(self):
+        if not self.memory_path or not os.path.exists(self.memory_path):
+            return {}
+        try:
+            with open(self.memory_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_memory(self):
+        if not self.memory_path:
+            return
+        with open(self.memory_path, "w", encoding="utf-8") as f:
+            json.dump(self.memory, f, indent=2)
+
+    def ordered_selectors(self, domain):
+        """Known selectors with the one that worked last time on `domain` first"""
+        remembered = self.memory.get(domain)
+        if remembered in self.selectors:
+            return [remembered] + [s for s in self.selectors if s != remembered]
+        if remembered:
+            return [remembered] + self.selectors
+        return self.selectors
+
+    async def dismiss(self, page, settle_ms=2000):
+        """Click the consent button if an overlay is visible; returns the selector used or None"""
+        domain = site_of(page.url)
+        selectors = self.ordered_selectors(domain)
+        index = await page.evaluate(DISMISS_JS, [_to_candidate(s) for s in selectors])
+        if index < 0:
+            return None
+
+        selector = selectors[index]
+        if self.memory.get(domain) != selector:
+            self.memory[domain] = selector
+            self._save_memory()
+        # Let the overlay close before the caller continues
+        await wait_for_dom_quiet(page, quiet_ms=300, max_ms=settle_ms)
+        return selector
+
+_default_handler = None
+
+async def dismiss_consent(page, settle_ms=2000):
+    """Module-level shortcut using a shared ConsentHandler backed by consent_memory.json"""
+    global _default_handler
+    if _default_handler is None:
+        _default_handler = ConsentHandler()
+    return await _default_handler.dismiss(page, settle_ms=settle_ms)
@@ -0,0 +1,225 @@
+import asyncio
+import os
+import re
+import pandas as pd
+from html_parsing import ParseTarget, make_soup
+from browser_pool import BrowserPool
+from consent import dismiss_consent
+from network_policy import apply_network_policy
+from rate_limit import throttle
+from telemetry import traced_run, timed, phase, text_size
+
+BASE_URL = "https://finance.yahoo.com/markets/crypto/all/"
+PAGE_SIZE = 100
+
+TABLE_TARGET = ParseTarget("table")
+
+# Declared type of every column the crypto table has (had); the same column always gets the same
+# type, whatever a page happens to contain, so Parquet appends and store writes keep one schema.
+# Columns not listed here are kept as text.
+COLUMN_DTYPES = {
+    "Symbol": "string",
+    "Name": "string",
+    "Price": "float64",
+    "Change": "float64",
+    "Change %": "float64",
+    "Market Cap": "float64",
+    "Volume": "float64",
+    "Volume In Currency (24hr)": "float64",
+    "Total Volume All Currencies (24hr)": "float64",
+    "Circulating Supply": "float64",
+    "52 Wk Change %": "float64",
+    "52 Wk Range": "string",
+}
+SUFFIX_MULTIPLIERS = {"": 1.0, "K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12, "%": 1.0}
+NUMBER_RE = r"^([+-]?\d*\.?\d+)([KMBT%]?)$"
+MISSING_VALUES = {"", "-", "--", "N/A"}
+
+TOTAL_RE = re.compile(r"of\s+([\d,]+)\s+results", re.IGNORECASE)
+
+def page_url(start, count=PAGE_SIZE):
+    return f"{BASE_URL}?start={start}&count={count}"
+
+def parse_table_html(html):
+    """Header and row cells of the first table in `html` (a saved page or the table's outerHTML)"""
+    return table_rows(make_soup(html, TABLE_TARGET))
+
+def table_rows(soup):
+    """Header and row cells of the first table in a parsed document"""
+    table = soup.find("table")
+    if table is None:
+        return [], []
+    header = [th.get_text(strip=True) for th in table.select("thead th")]
+    rows = []
+    for row in table.select("tbody tr"):
+        cols = [col.get_text(strip=True) for col in row.find_all(["td", "th"])]
+        if cols:
+            rows.append(cols)
+    if not header and rows:
+        header, rows = rows[0], rows[1:]
+    return header, rows
+
+def parse_numeric(series):
+    """Vectorised "1.23B" / "+4.5%" / "67,123.45" -> float64 (NaN when not a number)"""
+    cleaned = series.astype("string").str.replace(",", "", regex=False).str.strip()
+    cleaned = cleaned.mask(cleaned.isin(MISSING_VALUES))
+    parts = cleaned.str.extract(NUMBER_RE)
+    values = pd.to_numeric(parts[0], errors="coerce")
+    multipliers = parts[1].map(SUFFIX_MULTIPLIERS).astype("float64")
+    return (values * multipliers).astype("float64")
+
+def to_frame(header, rows, dtypes=COLUMN_DTYPES):
+    """Build a DataFrame typed by `dtypes` (float64 columns parsed from "1.23B" / "-1.6%" text)"""
+    width = len(header)
+    # Pad/trim so a short row cannot shift columns
+    rows = [(row + [None] * width)[:width] for row in rows]
+    frame = pd.DataFrame(rows, columns=header, dtype="string")
+    for column in frame.columns:
+        if dtypes.get(column, "string") == "float64":
+            frame[column] = parse_numeric(frame[column])
+    return frame
+
+STORE_SUFFIXES = (".db", ".sqlite")
+
+def open_sink(output):
+    """FrameSink for .csv/.parquet, or a change-only snapshot in a CryptoStore for .db/.sqlite"""
+    if output.endswith(STORE_SUFFIXES):
+        from crypto_store import CryptoStore
+        return CryptoStore(output).snapshot(close_store=True)
+    return FrameSink(output)
+
+class FrameSink:
+    """Appends DataFrames to a CSV or Parquet file as they arrive"""
+
+    def __init__(self, path):
+        self.path = path
+        self.format = "parquet" if path.endswith(".parquet") else "csv"
+        self.rows = 0
+        self._parquet_writer = None
+        self._schema = None
+        if os.path.exists(path):
+            os.remove(path)
+
+    def write(self, frame):
+        if frame.empty:
+            return
+        if self.format == "csv":
+            frame.to_csv(self.path, mode="a", header=self.rows == 0, index=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self._parquet_writer is None:
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                self._schema = table.schema
+                self._parquet_writer = pq.ParquetWriter(self.path, self._schema)
+            else:
+                # Later pages may infer different types (e.g. an all-NaN column); keep the first schema
+                table = pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False, safe=False)
+            self._parquet_writer.write_table(table)
+        self.rows += len(frame)
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+async def fetch_table_page(pool, start, count=PAGE_SIZE):
+    """Load one result page and return (header, rows, total result count or None)"""
+    url = page_url(start, count)
+    # Wait for the site's request budget before holding a pooled page
+    await throttle(url)
+    async with pool.page() as page:
+        await apply_network_policy(page, url, report=False)
+        await timed("goto", page.goto(url))
+        await timed("consent", dismiss_consent(page))
+        try:
+            await page.wait_for_selector("table tbody tr", timeout=15000)
+        except Exception:
+            return [], [], None
+        # Ship only the table (and the "x-y of N results" text), not the whole document
+        table_html = await timed("content", page.eval_on_selector("table", "table => table.outerHTML"), size=text_size)
+        body_text = await page.evaluate("document.body.innerText")
+    match = TOTAL_RE.search(body_text)
+    total = int(match.group(1).replace(",", "")) if match else None
+    with phase("parse", bytes=text_size(table_html)) as span:
+        header, rows = parse_table_html(table_html)
+        span.items = len(rows)
+    return header, rows, total
+
+@traced_run("yahoo_crypto_all", "finance.yahoo.com")
+async def crawl_crypto(pool=None, output="crypto_data.csv", concurrency=4, count=PAGE_SIZE, max_pages=None):
+    """Fetch every result page concurrently (bounded by `concurrency`) and stream typed rows to `output`
+
+    `output` ending in .parquet writes Parquet (needs pyarrow), .db/.sqlite appends
+    the changed rows to a CryptoStore, anything else writes CSV.
+    """
+    if pool is None:
+        async with BrowserPool(size=concurrency) as own_pool:
+            return await crawl_crypto(own_pool, output, concurrency, count, max_pages)
+
+    sink = open_sink(output)
+    # Closed whatever happens, so a Parquet file always gets its footer and a store is released
+    try:
+        header, rows, total = await fetch_table_page(pool, 0, count)
+        if not rows:
+            print("No table found.")
+            return 0
+        with phase("export", items=len(rows)):
+            sink.write(to_frame(header, rows))
+        print(f"Page 1: {len(rows)} rows" + (f" of {total}" if total else ""))
+
+        semaphore = asyncio.Semaphore(concurrency)
+        errors = 0
+
+        async def fetch(start):
+            # One page failing (a goto timeout, a closed page) is counted, not fatal to the crawl
+            nonlocal errors
+            async with semaphore:
+                try:
+                    return start, await fetch_table_page(pool, start, count)
+                except Exception as e:
+                    print(f"Failed to load rows {start + 1}-{start + count}: {e!r}")
+                    errors += 1
+                    return start, None
+
+        if total:
+            starts = list(range(count, total, count))
+            if max_pages is not None:
+                starts = starts[:max_pages - 1]
+            for finished in asyncio.as_completed([fetch(s) for s in starts]):
+                start, result = await finished
+                if result is None:
+                    continue
+                page_header, page_rows, _ = result
+                with phase("export", items=len(page_rows)):
+                    sink.write(to_frame(page_header or header, page_rows))
+                print(f"Rows {start + 1}-{start + len(page_rows)}: {len(page_rows)} rows")
+        else:
+            # Total unknown: fetch windows of `concurrency` pages until one comes back empty
+            # (or every page of a window fails)
+            start = count
+            pages = 1
+            while max_pages is None or pages < max_pages:
+                window = [start + i * count for i in range(concurrency)]
+                if max_pages is not None:
+                    window = window[:max_pages - pages]
+                results = await asyncio.gather(*(fetch(s) for s in window))
+                empty = all(result is None for _, result in results)
+                for page_start, result in sorted(results, key=lambda pair: pair[0]):
+                    if result is None:
+                        continue
+                    page_header, page_rows, _ = result
+                    if not page_rows:
+                        empty = True
+                        continue
+                    with phase("export", items=len(page_rows)):
+                        sink.write(to_frame(page_header or header, page_rows))
+                    print(f"Rows {page_start + 1}-{page_start + len(page_rows)}: {len(page_rows)} rows")
+                pages += len(window)
+                start += len(window) * count
+                if empty:
+                    break
+    finally:
+        sink.close()
+
+    print(f"Processed {sink.rows} rows into '{output}'" + (f" ({errors} pages failed)" if errors else ""))
+    return sink.rows
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+# One row per (symbol, poll time) -- but only written when the row changed since
+# that symbol's previous snapshot, so the table grows with the rate of change.
+# `latest` mirrors the newest hash per symbol: change detection and the
+# "latest per symbol" query never have to scan the history.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    symbol TEXT NOT NULL,
+    ts REAL NOT NULL,
+    row_hash TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (symbol, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS snapshots_ts ON snapshots (ts);
+CREATE TABLE IF NOT EXISTS latest (
+    symbol TEXT PRIMARY KEY,
+    ts REAL NOT NULL,
+    row_hash TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+def _clean(value):
+    # NaN / pd.NA -> None so rows serialise (and hash) the same way every poll
+    if value is None:
+        return None
+    try:
+        if value != value:
+            return None
+    except TypeError:
+        return None
+    return value
+
+def _records(rows):
+    """Accept a DataFrame or an iterable of dicts"""
+    if hasattr(rows, "to_dict"):
+        return rows.to_dict("records")
+    return rows
+
+def row_hash(record):
+    """Stable hash of a row's values (key order independent)"""
+    payload = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+class CryptoStore:
+    """Append-only SQLite history of the crypto table, keyed by symbol and poll time"""
+
+    def __init__(self, path="crypto_history.db", key="Symbol"):
+        self.path = path
+        self.key = key
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def write(self, rows, ts=None):
+        """Store the rows that changed since each symbol's last snapshot; returns (written, unchanged)"""
+        ts = time.time() if ts is None else ts
+        records = []
+        for record in _records(rows):
+            record = {str(k): _clean(v) for k, v in record.items()}
+            if record.get(self.key):
+                records.append(record)
+        if not records:
+            return 0, 0
+
+        # Previous hashes for just these symbols, in chunks (SQLite caps bound parameters)
+        symbols = [record[self.key] for record in records]
+        previous = {}
+        for i in range(0, len(symbols), 500):
+            chunk = symbols[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            previous.update(self.conn.execute(
+                f"SELECT symbol, row_hash FROM latest WHERE symbol IN ({marks})", chunk))
+
+        changed = []
+        for record in records:
+            digest = row_hash(record)
+            if previous.get(record[self.key]) != digest:
+                changed.append((record[self.key], ts, digest, json.dumps(record, default=str)))
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO snapshots (symbol, ts, row_hash, data) VALUES (?, ?, ?, ?)", changed)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO latest (symbol, ts, row_hash) VALUES (?, ?, ?)",
+                [(symbol, ts, digest) for symbol, ts, digest, _ in changed])
+        return len(changed), len(records) - len(changed)
+
+    def latest(self, symbols=None):
+        """Newest stored row per symbol as {symbol: (ts, row)}"""
+        query = ("SELECT s.symbol, s.ts, s.data FROM latest l "
+                 "JOIN snapshots s ON s.symbol = l.symbol AND s.ts = l.ts")
+        params = []
+        if symbols:
+            query += f" WHERE l.symbol IN ({','.join('?' * len(symbols))})"
+            params = list(symbols)
+        return {symbol: (ts, json.loads(data)) for symbol, ts, data in self.conn.execute(query, params)}
+
+    def history(self, symbol, start=None, end=None):
+        """(ts, row) changes of one symbol between `start` and `end` (epoch seconds), oldest first"""
+        rows = self.conn.execute(
+            "SELECT ts, data FROM snapshots WHERE symbol = ? AND ts >= ? AND ts <= ? ORDER BY ts",
+            (symbol, float("-inf") if start is None else start, float("inf") if end is None else end))
+        for ts, data in rows:
+            yield ts, json.loads(data)
+
+    def changes(self, start=None, end=None):
+        """(symbol, ts, row) for every change in a time range, across all symbols"""
+        rows = self.conn.execute(
+            "SELECT symbol, ts, data FROM snapshots WHERE ts >= ? AND ts <= ? ORDER BY ts, symbol",
+            (float("-inf") if start is None else start, float("inf") if end is None else end))
+        for symbol, ts, data in rows:
+            yield symbol, ts, json.loads(data)
+
+    def as_of(self, ts):
+        """The table as it stood at `ts`: the last stored row per symbol at or before it"""
+        rows = self.conn.execute(
+            "SELECT s.symbol, s.ts, s.data FROM snapshots s "
+            "JOIN (SELECT symbol, MAX(ts) AS ts FROM snapshots WHERE ts <= ? GROUP BY symbol) m "
+            "ON s.symbol = m.symbol AND s.ts = m.ts", (ts,))
+        return {symbol: (row_ts, json.loads(data)) for symbol, row_ts, data in rows}
+
+    def snapshot(self, ts=None, close_store=False):
+        """A sink (write/close, like crypto_crawl.FrameSink) that stores every page of one poll under one timestamp"""
+        return SnapshotSink(self, time.time() if ts is None else ts, close_store)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class SnapshotSink:
+    """Collects the pages of one poll into the store, all under the poll's timestamp"""
+
+    def __init__(self, store, ts, close_store=False):
+        self.store = store
+        self.ts = ts
+        self.close_store = close_store
+        self.rows = 0
+        self.written = 0
+
+    def write(self, frame):
+        written, unchanged = self.store.write(frame, ts=self.ts)
+        self.rows += written + unchanged
+        self.written += written
+
+    def close(self):
+        print(f"Snapshot {self.ts:.0f}: {self.written} changed of {self.rows} rows")
+        if self.close_store:
+            self.store.close()
@@ -0,0 +1,115 @@
+import re
+from urllib.parse import urljoin
+from html_parsing import make_soup
+
+# Attributes whose values are resolved against the page URL
+URL_ATTRIBUTES = {"href", "src"}
+
+# One simple selector step: tag, tag.class or tag[attribute] (any part optional)
+SIMPLE_SELECTOR_RE = re.compile(r"^([a-zA-Z][\w-]*)?(?:\.([\w-]+))?(?:\[([\w-]+)\])?$")
+
+def compile_selector(selector, many=False):
+    """node -> first match of `selector` under node (every match with many=True)
+
+    Single-step selectors become one bs4 find()/find_all() call, which is
+    several times cheaper than soupsieve's select_one/select for the same
+    match; anything more complex keeps soupsieve.
+    """
+    match = SIMPLE_SELECTOR_RE.match(selector.strip())
+    if not match or not any(match.groups()):
+        if many:
+            return lambda node: node.select(selector)
+        return lambda node: node.select_one(selector)
+    tag, css_class, attribute = match.groups()
+    kwargs = {}
+    if css_class:
+        kwargs["class_"] = css_class
+    if attribute:
+        kwargs["attrs"] = {attribute: True}
+    if many:
+        return lambda node: node.find_all(tag or True, **kwargs)
+    return lambda node: node.find(tag or True, **kwargs)
+
+# Runs once over every container matched by page.eval_on_selector_all and
+# returns only the raw field values. `mark`, when set, tags each container so
+# later calls can skip it. Text is normalised in Python for both paths.
+EXTRACT_JS = """
+(nodes, {fields, mark}) => nodes.map(node => {
+    if (mark) node.setAttribute(mark, '1');
+    const item = {};
+    for (const [name, [selector, attribute]] of Object.entries(fields)) {
+        const target = selector ? node.querySelector(selector) : node;
+        if (!target) {
+            item[name] = null;
+        } else if (attribute) {
+            item[name] = target.getAttribute(attribute);
+        } else {
+            item[name] = target.textContent;
+        }
+    }
+    return item;
+})
+"""
+
+class ExtractionSpec:
+    """Container selector plus per-field (relative selector, attribute) pairs
+
+    A field selector of "" means the container itself; an attribute of None
+    means its text. The same spec runs in the browser (extract) and against
+    stored HTML (extract_html) with identical results.
+    """
+
+    def __init__(self, container, fields):
+        self.container = container
+        self.fields = {name: (selector, attribute) for name, (selector, attribute) in fields.items()}
+        # Offline lookups for the container and each field, compiled once
+        self._find_containers = compile_selector(container, many=True)
+        self._finders = {name: compile_selector(selector) for name, (selector, _) in self.fields.items() if selector}
+
+    def with_container(self, container):
+        """Same fields, different container selector (e.g. the one selector discovery picked)"""
+        return ExtractionSpec(container, self.fields)
+
+    def _finish(self, raw, base_url):
+        item = {}
+        for name, (_, attribute) in self.fields.items():
+            value = raw.get(name)
+            if value is not None:
+                if attribute is None:
+                    value = " ".join(value.split())
+                elif attribute in URL_ATTRIBUTES and base_url:
+                    value = urljoin(base_url, value)
+            item[name] = value
+        return item
+
+    async def extract(self, page, mark=None):
+        """Extract every container in one eval_on_selector_all round-trip
+
+        With `mark`, containers already marked are skipped and the new ones get marked.
+        """
+        selector = f":is({self.container}):not([{mark}])" if mark else self.container
+        raw_items = await page.eval_on_selector_all(selector, EXTRACT_JS, {
+            "fields": {name: list(spec) for name, spec in self.fields.items()},
+            "mark": mark
+        })
+        return [self._finish(raw, page.url) for raw in raw_items]
+
+    def extract_html(self, html, base_url=None):
+        """Run the spec offline against stored HTML (a string or an existing soup)"""
+        if isinstance(html, str):
+            html = make_soup(html)
+        items = []
+        for node in self._find_containers(html):
+            raw = {}
+            for name, (selector, attribute) in self.fields.items():
+                target = self._finders[name](node) if selector else node
+                if target is None:
+                    raw[name] = None
+                elif attribute:
+                    value = target.get(attribute)
+                    # bs4 splits multi-valued attributes such as class into lists
+                    raw[name] = " ".join(value) if isinstance(value, list) else value
+                else:
+                    raw[name] = target.get_text()
+            items.append(self._finish(raw, base_url))
+        return items
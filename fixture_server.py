@@ -0,0 +1,186 @@
+import argparse
+import hashlib
+import os
+import re
+import threading
+import time
+from email.utils import formatdate
+from html import escape
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+QUOTE_BLOCK_RE = re.compile(r'\s*<div class="quote".*?</div>\s*</div>', re.DOTALL)
+QUOTE_TEXT_RE = re.compile(r'(<span class="text" itemprop="text">)“[^”]*”')
+PAGER_RE = re.compile(r'<ul class="pager">.*?</ul>', re.DOTALL)
+PRODUCT_CARD_RE = re.compile(r'\s*<span class="product-brief-wrapper".*?</a>\s*</span>', re.DOTALL)
+SKU_ATTR_RE = re.compile(r'data-sku="([^"]+)"')
+AUTHOR_RE = re.compile(r'<small class="author" itemprop="author">([^<]*)</small>\s*<a href="/author/([^"]+)">')
+
+AUTHOR_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>Quotes to Scrape</title></head>
+<body>
+  <div class="author-details">
+    <h3 class="author-title">{name}</h3>
+    <p><strong>Born:</strong> <span class="author-born-date">March 14, 1879</span>
+    <span class="author-born-location">in Somewhere</span></p>
+    <div class="author-description">{name} is a stand-in author served by fixture_server.py.</div>
+  </div>
+</body>
+</html>
+"""
+
+def _read_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+class QuotesSite:
+    """quotes.toscrape.com look-alike generated from fixtures/quotes.html
+
+    /page/N/ (N <= pages) and /tag/<tag>/page/N/ (N <= tag_pages) reuse the
+    fixture's header, footer and quote markup with page-specific quote texts;
+    /author/<slug> serves a small bio page.
+    """
+
+    def __init__(self, pages=10, tag_pages=2):
+        self.pages = pages
+        self.tag_pages = tag_pages
+        html = _read_fixture("quotes.html")
+        self.blocks = QUOTE_BLOCK_RE.findall(html)
+        first, last = html.find(self.blocks[0]), html.rfind(self.blocks[-1]) + len(self.blocks[-1])
+        self.head, self.tail = html[:first], html[last:]
+        self.authors = {slug: name for name, slug in AUTHOR_RE.findall(html)}
+
+    def _listing(self, prefix, number, last_page, label):
+        blocks = [
+            QUOTE_TEXT_RE.sub(lambda m: f"{m.group(1)}“{label} page {number}, quote {i + 1}.”", block)
+            for i, block in enumerate(self.blocks)
+        ]
+        pager = '<ul class="pager">'
+        if number < last_page:
+            pager += f'\n            <li class="next">\n                <a href="{prefix}/page/{number + 1}/">Next <span aria-hidden="true">&rarr;</span></a>\n            </li>'
+        pager += "\n        </ul>"
+        return PAGER_RE.sub(lambda _: pager, self.head + "".join(blocks) + self.tail)
+
+    def render(self, path):
+        """HTML for `path`, or None for a 404"""
+        if path in ("/", ""):
+            path = "/page/1/"
+        match = re.fullmatch(r"/page/(\d+)/?", path)
+        if match and 1 <= int(match.group(1)) <= self.pages:
+            return self._listing("", int(match.group(1)), self.pages, "Main")
+        match = re.fullmatch(r"/tag/([^/]+)/page/(\d+)/?", path)
+        if match and 1 <= int(match.group(2)) <= self.tag_pages:
+            tag = match.group(1)
+            return self._listing(f"/tag/{tag}", int(match.group(2)), self.tag_pages, f"Tag {tag}")
+        match = re.fullmatch(r"/author/([^/]+)/?", path)
+        if match and match.group(1) in self.authors:
+            return AUTHOR_PAGE.format(name=escape(self.authors[match.group(1)]))
+        return None
+
+class HktvmallSearch:
+    """HKTVmall search look-alike generated from fixtures/hktvmall_search.html
+
+    /hktv/en/search_a?keyword=...&page=N serves the recorded cards for every
+    N < pages (with page-specific SKUs after the first page) and a page with
+    no product cards after the last one, whatever the keyword.
+    """
+
+    def __init__(self, pages=3):
+        self.pages = pages
+        self.html = _read_fixture("hktvmall_search.html")
+        self.cards = PRODUCT_CARD_RE.findall(self.html)
+        first = self.html.find(self.cards[0])
+        last = self.html.rfind(self.cards[-1]) + len(self.cards[-1])
+        self.head, self.tail = self.html[:first], self.html[last:]
+
+    def render(self, query):
+        number = int(parse_qs(query).get("page", ["0"])[0])
+        if number == 0:
+            return self.html
+        if number >= self.pages:
+            return self.head + self.tail
+        cards = "".join(
+            card.replace(sku, f"{sku}_P{number}")
+            for card in self.cards
+            for sku in SKU_ATTR_RE.findall(card)
+        )
+        return self.head + cards + self.tail
+
+def make_handler(site, latency=0.0, validators=False, max_age=None, search=None):
+    # Pages never change while the server runs, so they all share its start time
+    last_modified = formatdate(time.time(), usegmt=True)
+
+    class Handler(BaseHTTPRequestHandler):
+        # HTTP/1.1 so clients can keep connections alive between requests
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if latency:
+                # Stand-in for network/server time, so concurrency has something to overlap
+                time.sleep(latency)
+            path, _, query = self.path.partition("?")
+            if path.startswith("/fixtures/"):
+                name = os.path.basename(path)
+                body = _read_fixture(name) if os.path.exists(os.path.join(FIXTURE_DIR, name)) else None
+            elif path == "/hktv/en/search_a":
+                body = (search or HktvmallSearch()).render(query)
+            else:
+                body = site.render(path)
+            status = 200 if body is not None else 404
+            data = (body if body is not None else "Not found").encode("utf-8")
+            headers = {"Content-Type": "text/html; charset=utf-8"}
+            if validators and status == 200:
+                etag = '"' + hashlib.md5(data).hexdigest() + '"'
+                headers.update({"ETag": etag, "Last-Modified": last_modified})
+                if max_age is not None:
+                    headers["Cache-Control"] = f"max-age={max_age}"
+                if (self.headers.get("If-None-Match") == etag
+                        or self.headers.get("If-Modified-Since") == last_modified):
+                    status, data = 304, b""
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+def start_server(port=0, latency=0.0, pages=10, tag_pages=2, validators=False, max_age=None, search_pages=3):
+    """Serve the stand-in site from a background thread; returns (server, base_url)
+
+    validators=True adds ETag/Last-Modified (and Cache-Control max-age when
+    given) and answers matching conditional requests with 304. search_pages
+    is the number of result pages of every HKTVmall search.
+    """
+    handler = make_handler(QuotesSite(pages, tag_pages), latency, validators, max_age,
+                           HktvmallSearch(search_pages))
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the HTML fixtures as a local stand-in site")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--validators", action="store_true", help="send ETag/Last-Modified and answer 304s")
+    parser.add_argument("--max-age", type=int, default=None)
+    parser.add_argument("--search-pages", type=int, default=3, help="result pages per HKTVmall search")
+    args = parser.parse_args()
+    server, base_url = start_server(args.port, args.latency, args.pages,
+                                    validators=args.validators, max_age=args.max_age,
+                                    search_pages=args.search_pages)
+    print(f"Serving {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,414 @@
+import atexit
+import base64
+import glob
+import itertools
+import json
+import os
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+
+# SCRAPER_HAR_MODE=record  -> every browser context and HTTP session saves its traffic to SCRAPER_HAR_DIR
+# SCRAPER_HAR_MODE=replay  -> the same traffic is served back from the archive; nothing reaches the network
+HAR_MODE_ENV = "SCRAPER_HAR_MODE"
+HAR_DIR_ENV = "SCRAPER_HAR_DIR"
+DEFAULT_HAR_DIR = "har"
+
+_file_counter = itertools.count(1)
+
+# Writers still open; weak, so a dropped writer is not kept alive until exit
+_open_writers = weakref.WeakSet()
+
+@atexit.register
+def _close_writers():
+    for writer in list(_open_writers):
+        writer.close()
+
+class HarArchive:
+    """A directory of HAR files that scrapers record into or replay from
+
+    Browser contexts record with Playwright's record_har_path (one zip per
+    context) and replay with route_from_har; requests/httpx traffic is kept in
+    plain HAR 1.2 JSON files next to them, and Selenium drivers keep the
+    rendered pages they read (see RecordingDriver). In replay mode anything
+    that was not recorded is aborted, so a run is either fully offline or fails
+    loudly.
+    """
+
+    def __init__(self, directory=DEFAULT_HAR_DIR, mode="replay"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"HAR mode must be 'record' or 'replay', not {mode!r}")
+        self.directory = directory
+        self.mode = mode
+        if mode == "record":
+            os.makedirs(directory, exist_ok=True)
+        elif not os.path.isdir(directory):
+            raise FileNotFoundError(f"No HAR archive at '{directory}'; record one first ({HAR_MODE_ENV}=record)")
+
+    @classmethod
+    def from_env(cls):
+        """The archive selected by SCRAPER_HAR_MODE / SCRAPER_HAR_DIR, or None"""
+        mode = os.environ.get(HAR_MODE_ENV)
+        if not mode:
+            return None
+        return cls(os.environ.get(HAR_DIR_ENV, DEFAULT_HAR_DIR), mode)
+
+    def _new_path(self, prefix, suffix):
+        return os.path.join(self.directory, f"{prefix}-{os.getpid()}-{next(_file_counter)}{suffix}")
+
+    # --- Playwright -------------------------------------------------------
+
+    def context_options(self):
+        """Extra browser.new_context() options (the HAR is written when the context closes)"""
+        if self.mode != "record":
+            return {}
+        return {
+            "record_har_path": self._new_path("browser", ".zip"),
+            "record_har_content": "attach",
+            "record_har_mode": "full",
+        }
+
+    async def attach(self, context):
+        """Serve a replaying context from every HAR in the archive"""
+        if self.mode != "replay":
+            return
+        # Routes registered later are tried first: HARs fall back to one another, then to the abort
+        await context.route("**/*", lambda route: route.abort("internetdisconnected"))
+        for path in sorted(glob.glob(os.path.join(self.directory, "*.zip"))):
+            await context.route_from_har(path, not_found="fallback")
+
+    # --- requests / httpx -------------------------------------------------
+
+    def _entries(self, prefix):
+        entries = {}
+        for path in sorted(glob.glob(os.path.join(self.directory, f"{prefix}-*.har"))):
+            for entry in read_har(path)["log"]["entries"]:
+                key = (entry["request"]["method"], entry["request"]["url"])
+                entries.setdefault(key, []).append(entry)
+        return entries
+
+    def http_entries(self):
+        """(method, url) -> list of recorded HAR entries from the HTTP (non-browser) files"""
+        return self._entries("http")
+
+    def http_recorder(self):
+        return HarWriter(self._new_path("http", ".har"))
+
+    # --- Selenium ---------------------------------------------------------
+
+    def page_entries(self):
+        """(method, url) -> list of rendered pages recorded by Selenium drivers"""
+        return self._entries("selenium")
+
+    def page_recorder(self):
+        return HarWriter(self._new_path("selenium", ".har"))
+
+HAR_PREFIX = '{"log": {"version": "1.2", "creator": {"name": "har_archive", "version": "1"}, "entries": [\n'
+HAR_SUFFIX = "\n]}}\n"
+
+def read_har(path):
+    """A HAR file as a dict; one left open by a crashed recording is closed on the fly"""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    try:
+        return json.loads(text)
+    except ValueError:
+        return json.loads(text.rstrip().rstrip(",") + HAR_SUFFIX)
+
+class HarWriter:
+    """Appends HTTP exchanges to one HAR 1.2 file as they happen
+
+    Each entry is written (and flushed) once, so long recordings cost O(n)
+    I/O, and a crashed run still leaves every finished exchange readable by
+    read_har(). close() writes the closing brackets; writers still open at exit
+    are closed then.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = None
+        _open_writers.add(self)
+
+    def add(self, method, url, request_headers, status, reason, headers, body, elapsed_ms):
+        lower = {name.lower(): value for name, value in headers.items()}
+        content = {"size": len(body), "mimeType": lower.get("content-type", "")}
+        try:
+            content["text"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            content["text"] = base64.b64encode(body).decode("ascii")
+            content["encoding"] = "base64"
+        entry = {
+            "startedDateTime": datetime.now(timezone.utc).isoformat(),
+            "time": elapsed_ms,
+            "request": {
+                "method": method, "url": url, "httpVersion": "HTTP/1.1",
+                "headers": [{"name": k, "value": v} for k, v in request_headers.items()],
+                "queryString": [], "cookies": [], "headersSize": -1, "bodySize": 0,
+            },
+            "response": {
+                "status": status, "statusText": reason or "", "httpVersion": "HTTP/1.1",
+                "headers": [{"name": k, "value": v} for k, v in headers.items()],
+                "cookies": [], "content": content, "redirectURL": lower.get("location", ""),
+                "headersSize": -1, "bodySize": len(body),
+            },
+            "cache": {}, "timings": {"send": 0, "wait": elapsed_ms, "receive": 0},
+        }
+        if self._file is None:
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._file.write(HAR_PREFIX)
+        self._file.write((",\n" if self.count else "") + json.dumps(entry))
+        self._file.flush()
+        self.count += 1
+
+    def close(self):
+        _open_writers.discard(self)
+        if self._file is not None and not self._file.closed:
+            self._file.write(HAR_SUFFIX)
+            self._file.close()
+
+def _decoded_headers(headers):
+    # Bodies are stored decoded, so transfer encodings from the original response no longer apply
+    skip = {"content-encoding", "transfer-encoding", "content-length"}
+    return {name: value for name, value in headers.items() if name.lower() not in skip}
+
+def entry_body(entry):
+    content = entry["response"]["content"]
+    text = content.get("text", "")
+    if content.get("encoding") == "base64":
+        return base64.b64decode(text)
+    return text.encode("utf-8")
+
+def entry_headers(entry):
+    return _decoded_headers({h["name"]: h["value"] for h in entry["response"]["headers"]})
+
+class _Replayer:
+    """Serves recorded entries for (method, url) in recorded order, repeating the last one"""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.positions = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, method, url):
+        """The entry to replay, or None when (method, url) was never recorded"""
+        recorded = self.entries.get((method, url))
+        if not recorded:
+            return None
+        # Selenium drivers replay from worker threads
+        with self._lock:
+            position = self.positions.get((method, url), 0)
+            self.positions[(method, url)] = position + 1
+        return recorded[min(position, len(recorded) - 1)]
+
+def _not_recorded(method, url):
+    return f"{method} {url} is not in the HAR archive (replay is offline)"
+
+# --- requests adapter ----------------------------------------------------------
+
+def har_session(archive=None, session=None):
+    """A requests.Session that records into / replays from `archive` (default: from the environment)"""
+    import requests
+    session = session or requests.Session()
+    archive = archive if archive is not None else HarArchive.from_env()
+    if archive is None:
+        return session
+    adapter = _requests_adapter(archive)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def _requests_adapter(archive):
+    import requests
+    from requests.adapters import BaseAdapter, HTTPAdapter
+    from requests.structures import CaseInsensitiveDict
+
+    if archive.mode == "record":
+        class HarRecordingAdapter(HTTPAdapter):
+            def __init__(self):
+                super().__init__()
+                self.writer = archive.http_recorder()
+
+            def send(self, request, **kwargs):
+                start = time.perf_counter()
+                response = super().send(request, **kwargs)
+                self.writer.add(request.method, request.url, dict(request.headers), response.status_code,
+                                response.reason, dict(response.headers), response.content,
+                                (time.perf_counter() - start) * 1000)
+                return response
+
+            def close(self):
+                self.writer.close()
+                super().close()
+
+        return HarRecordingAdapter()
+
+    class HarReplayAdapter(BaseAdapter):
+        def __init__(self):
+            super().__init__()
+            self.replayer = _Replayer(archive.http_entries())
+
+        def send(self, request, **kwargs):
+            entry = self.replayer.lookup(request.method, request.url)
+            if entry is None:
+                # The same exception a refused connection raises, so callers handle it as one
+                raise requests.ConnectionError(_not_recorded(request.method, request.url), request=request)
+            response = requests.Response()
+            response.status_code = entry["response"]["status"]
+            response.reason = entry["response"]["statusText"]
+            response.headers = CaseInsensitiveDict(entry_headers(entry))
+            response._content = entry_body(entry)
+            response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+            response.url = request.url
+            response.request = request
+            response.connection = self
+            return response
+
+        def close(self):
+            pass
+
+    return HarReplayAdapter()
+
+# --- httpx transport ---------------------------------------------------------
+
+def har_transport(archive=None):
+    """httpx async transport class for `archive` (default: from the environment), or None for the network
+
+    The class takes the same keyword arguments as httpx.AsyncHTTPTransport (http2, limits, ...).
+    """
+    import httpx
+    archive = archive if archive is not None else HarArchive.from_env()
+    if archive is None:
+        return None
+
+    if archive.mode == "record":
+        class HarRecordingTransport(httpx.AsyncHTTPTransport):
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+                self.writer = archive.http_recorder()
+
+            async def handle_async_request(self, request):
+                start = time.perf_counter()
+                response = await super().handle_async_request(request)
+                body = await response.aread()
+                self.writer.add(request.method, str(request.url), dict(request.headers), response.status_code,
+                                response.reason_phrase, dict(response.headers), body,
+                                (time.perf_counter() - start) * 1000)
+                # aread() has already undone any content-encoding
+                return httpx.Response(response.status_code, headers=_decoded_headers(response.headers),
+                                      content=body, extensions=response.extensions)
+
+            async def aclose(self):
+                self.writer.close()
+                await super().aclose()
+
+        return HarRecordingTransport
+
+    replayer = _Replayer(archive.http_entries())
+
+    class HarReplayTransport(httpx.AsyncBaseTransport):
+        def __init__(self, **kwargs):
+            pass
+
+        async def handle_async_request(self, request):
+            entry = replayer.lookup(request.method, str(request.url))
+            if entry is None:
+                raise httpx.ConnectError(_not_recorded(request.method, request.url), request=request)
+            return httpx.Response(entry["response"]["status"], headers=entry_headers(entry),
+                                  content=entry_body(entry))
+
+    return HarReplayTransport
+
+# --- Selenium ----------------------------------------------------------------
+
+# WebDriver has no network layer to hook (no interception without a proxy), so
+# Selenium runs are archived at the level a scraper reads them: the rendered
+# page_source of each page it loads, as a GET entry under the URL it asked for.
+
+class RecordingDriver:
+    """A WebDriver whose rendered pages are saved to a HAR file as they are read
+
+    The first page_source read after each get() is recorded; everything else is
+    passed through to the wrapped driver.
+    """
+
+    def __init__(self, driver, writer):
+        self._driver = driver
+        self._writer = writer
+        self._url = None
+        self._elapsed_ms = 0.0
+
+    def get(self, url):
+        start = time.perf_counter()
+        self._driver.get(url)
+        self._url = url
+        self._elapsed_ms = (time.perf_counter() - start) * 1000
+
+    @property
+    def page_source(self):
+        html = self._driver.page_source
+        if self._url is not None:
+            self._writer.add("GET", self._url, {}, 200, "OK", {"Content-Type": "text/html; charset=utf-8"},
+                             html.encode("utf-8"), self._elapsed_ms)
+            self._url = None
+        return html
+
+    def quit(self):
+        self._writer.close()
+        self._driver.quit()
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+class ReplayDriver:
+    """Stands in for a WebDriver offline, serving the pages a RecordingDriver saved
+
+    get() loads the recorded page (WebDriverException when it was never
+    recorded), and find_element(s) answer CSS selectors from it, which is what
+    WebDriverWait's presence conditions ask. No browser is started.
+    """
+
+    def __init__(self, replayer):
+        self._replayer = replayer
+        self._soup = None
+        self.current_url = None
+        self.page_source = ""
+
+    def get(self, url):
+        from selenium.common.exceptions import WebDriverException
+        entry = self._replayer.lookup("GET", url)
+        if entry is None:
+            raise WebDriverException(_not_recorded("GET", url))
+        self.current_url = url
+        self.page_source = entry_body(entry).decode("utf-8")
+        self._soup = None
+
+    def _select(self, by, value):
+        from bs4 import BeautifulSoup
+        from selenium.webdriver.common.by import By
+        if by != By.CSS_SELECTOR:
+            raise NotImplementedError(f"Replayed pages answer CSS selectors only, not {by!r}")
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.page_source, "html.parser")
+        return self._soup.select(value)
+
+    def find_elements(self, by, value):
+        return self._select(by, value)
+
+    def find_element(self, by, value):
+        from selenium.common.exceptions import NoSuchElementException
+        found = self._select(by, value)
+        if not found:
+            raise NoSuchElementException(f"{value!r} is not in the replayed page")
+        return found[0]
+
+    def set_page_load_timeout(self, seconds):
+        pass
+
+    def quit(self):
+        pass
+
+def page_replayer(archive):
+    """One replay position per archive, shared by every ReplayDriver of a pool"""
+    return _Replayer(archive.page_entries())
@@ -0,0 +1,76 @@
+from datetime import datetime, timezone
+from field_extraction import ExtractionSpec
+from telemetry import phase
+
+def parse_timestamp(value):
+    """Parse an ISO-8601 timestamp (as found in <time datetime="...">) into an aware datetime"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+class IncrementalHarvester:
+    """Pulls only newly appended items after each scroll/load-more, deduped by `key`
+
+    Stops (`done`) once `max_items` unique items are collected or an item older
+    than `max_age` seconds is seen (feeds are newest-first, so the rest is older too).
+    """
+
+    def __init__(self, container, fields, key="url", max_items=None, max_age=None,
+                 timestamp_field=None, mark="data-harvested"):
+        # `fields` maps name -> (relative selector, attribute or None for text), see ExtractionSpec
+        self.spec = ExtractionSpec(container, fields)
+        self.key = key
+        self.max_items = max_items
+        self.max_age = max_age
+        self.timestamp_field = timestamp_field
+        self.mark = mark
+
+        self.items = []
+        self.seen = set()
+        self.done = False
+        self.rounds = 0
+
+    def _too_old(self, item):
+        if self.max_age is None or not self.timestamp_field:
+            return False
+        published = parse_timestamp(item.get(self.timestamp_field))
+        if published is None:
+            return False
+        return (datetime.now(timezone.utc) - published).total_seconds() > self.max_age
+
+    @property
+    def empty(self):
+        """Nothing extracted and nothing cut off by max_age: the container selector found no items"""
+        return not self.items and not self.done
+
+    async def harvest(self, page):
+        """Extract newly appended containers; returns the new unique items"""
+        # One "extract" span per round, nested inside the scroll/load-more phase that triggered it
+        with phase("extract") as span:
+            raw = await self.spec.extract(page, mark=self.mark)
+            span.items = len(raw)
+        self.rounds += 1
+        new_items = []
+        for item in raw:
+            if self.done:
+                break
+            # Items without a key cannot be deduped, so they are always kept
+            key = item.get(self.key)
+            if key is not None:
+                if key in self.seen:
+                    continue
+                self.seen.add(key)
+            if self._too_old(item):
+                self.done = True
+                break
+            new_items.append(item)
+            self.items.append(item)
+            if self.max_items is not None and len(self.items) >= self.max_items:
+                self.done = True
+        return new_items
@@ -0,0 +1,95 @@
+import os
+import re
+from collections import namedtuple
+from urllib.parse import urlencode
+from html_parsing import ParseTarget
+from layout_strategy import Layout, LayoutStrategy
+from selector_cache import default_cache
+from urls import site_of
+
+# HKTVMALL_BASE_URL=http://127.0.0.1:8000 points the scrapers at a local stand-in (python fixture_server.py)
+BASE_URL = os.environ.get("HKTVMALL_BASE_URL", "https://www.hktvmall.com")
+
+Product = namedtuple("Product", ["keyword", "name", "price", "url", "sku"])
+
+PRICE_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+SKU_RE = re.compile(r"/p/([^/?#]+)")
+
+# Product cards in any layout; links are kept whole because the linked layout's card is the <a> itself,
+# but only product links (/p/<sku>), so navigation, footer and other links are dropped
+PRODUCT_TARGET = ParseTarget(["span", "div"], ["product-brief-wrapper", "info-wrapper"], wrappers="a",
+                             wrapper_attrs={"href": "/p/"})
+
+# Fields of a product card, relative to the card; a card's price and name sit at
+# different depths depending on whether there is an upper-wrapper, so the
+# selectors only name the element they want
+PRODUCT_FIELDS = {
+    "name": ("div.brand-product-name", None),
+    "price": ("div.price", None),
+    "url": ("a[href]", "href"),
+    "sku": ("", "data-sku"),
+}
+
+# Known search page layouts, most common first
+LAYOUTS = [
+    # <span class="product-brief-wrapper" data-sku=...><a href=...><div class="info-wrapper">...
+    Layout("product-brief-wrapper", "span.product-brief-wrapper", PRODUCT_FIELDS),
+    # <a href=...><div class="info-wrapper">... without the outer span
+    Layout("linked-info-wrapper", "a:has(> div.info-wrapper)", dict(PRODUCT_FIELDS, url=("", "href"))),
+    # <div class="info-wrapper">... with the link (if any) inside
+    Layout("info-wrapper", "div.info-wrapper", PRODUCT_FIELDS),
+]
+
+# CSS matching a card in any known layout, e.g. to wait for the results to render
+LAYOUT_SELECTOR = LayoutStrategy(LAYOUTS).selector
+
+# Selector-cache page types: a live page and a parsed (possibly strained) copy of it
+# can match different layouts, so their remembered choices are kept apart
+DOM_PAGE_TYPE = "search_dom"
+HTML_PAGE_TYPE = "search_html"
+
+_layouts = {}
+
+def search_layouts(page_type=HTML_PAGE_TYPE):
+    """The LayoutStrategy for search pages of `page_type`, created on first use
+
+    Shared by every scraper in the process, so each site is only probed on its
+    first page, and remembered in selector_cache.json so later runs do not probe
+    at all. Importing this module does not touch the cache file.
+    """
+    if page_type not in _layouts:
+        _layouts[page_type] = LayoutStrategy(LAYOUTS, cache=default_cache(), page_type=page_type)
+    return _layouts[page_type]
+
+def product_items(soup, base_url=BASE_URL, fields=None):
+    """Raw field dicts for every product card, in whichever known layout the page uses"""
+    _, items = search_layouts().extract(soup, site_of(base_url), base_url, fields)
+    return [item for item in items if item["name"]]
+
+def product_names(soup, base_url=BASE_URL):
+    """Product names from a parsed search page (product-brief-wrapper cards, or bare info-wrapper blocks)"""
+    return [item["name"] for item in product_items(soup, base_url, ["name"])]
+
+def parse_price(text):
+    """"$11,422" -> 11422.0 (None when there is no number)"""
+    match = PRICE_RE.search(text or "")
+    return float(match.group(0).replace(",", "")) if match else None
+
+def to_product(item, keyword):
+    sku = item["sku"]
+    if not sku and item["url"]:
+        match = SKU_RE.search(item["url"])
+        sku = match.group(1) if match else None
+    return Product(keyword=keyword, name=item["name"], price=parse_price(item["price"]), url=item["url"], sku=sku)
+
+def product_records(soup, keyword, base_url=BASE_URL):
+    """Product records from a parsed search page, in any known card layout"""
+    return [to_product(item, keyword) for item in product_items(soup, base_url)]
+
+def search_url(keyword, base_url=BASE_URL, page=0):
+    """Search results URL for `keyword` (base_url points at a local stand-in when benchmarking)"""
+    params = {"keyword": keyword}
+    if page:
+        # Result pages are numbered from 0; the first page has no parameter
+        params["page"] = page
+    return f"{base_url.rstrip('/')}/hktv/en/search_a?{urlencode(params)}"
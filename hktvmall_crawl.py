@@ -0,0 +1,137 @@
+import asyncio
+import csv
+import time
+from browser_pool import BrowserPool
+from consent import dismiss_consent
+from network_policy import apply_network_policy
+from rate_limit import throttle, default_limiter, is_bot_check
+from hktvmall import BASE_URL, DOM_PAGE_TYPE, LAYOUT_SELECTOR, Product, search_layouts, search_url, to_product
+from urls import site_of
+from telemetry import traced_run, timed, phase
+
+class HktvmallCrawler:
+    """Every result page of every keyword, fetched concurrently in one browser
+
+    At most `concurrency` pages are open at once across all keywords. Each
+    keyword walks its result pages `pages_ahead` at a time and stops at the
+    first page without new products (or after `max_pages`).
+    """
+
+    def __init__(self, pool, keywords, base_url=BASE_URL, concurrency=4, pages_ahead=2, max_pages=None, timeout=10000):
+        self.pool = pool
+        self.keywords = list(keywords)
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.pages_ahead = pages_ahead
+        self.max_pages = max_pages
+        # An empty result page has no cards to wait for, so this is also what the last page of a keyword costs
+        self.timeout = timeout
+
+        self.pages = 0
+        self.products = 0
+        self.errors = 0
+        self.elapsed = 0.0
+        self._semaphore = None
+
+    async def fetch_page(self, keyword, number):
+        """Product records on result page `number` of `keyword` ([] past the last page)"""
+        url = search_url(keyword, self.base_url, number)
+        # Wait for the site's request budget before taking one of the open-page slots
+        await throttle(url)
+        async with self._semaphore:
+            async with self.pool.page() as page:
+                await apply_network_policy(page, url, report=False)
+                await timed("goto", page.goto(url))
+                await timed("consent", dismiss_consent(page))
+                try:
+                    await timed("discovery", page.wait_for_selector(LAYOUT_SELECTOR, timeout=self.timeout))
+                except Exception:
+                    if is_bot_check(await page.title()):
+                        # Blocked rather than past the last page: back off the whole site
+                        default_limiter().penalize(url)
+                        raise RuntimeError(f"Bot check on {url}")
+                    return []
+                # Fields are read in the browser in one round-trip, with the layout chosen for this site
+                with phase("extract") as span:
+                    _, items = await search_layouts(DOM_PAGE_TYPE).extract_page(page, site_of(self.base_url))
+                    span.items = len(items)
+        return [to_product(item, keyword) for item in items if item["name"]]
+
+    async def _walk(self, keyword, queue):
+        seen = set()
+        number = 0
+        try:
+            while self.max_pages is None or number < self.max_pages:
+                last = number + self.pages_ahead
+                if self.max_pages is not None:
+                    last = min(last, self.max_pages)
+                window = range(number, last)
+                results = await asyncio.gather(*(self.fetch_page(keyword, n) for n in window), return_exceptions=True)
+                done = False
+                for n, result in zip(window, results):
+                    if isinstance(result, Exception):
+                        print(f"Failed to load '{keyword}' page {n}: {result!r}")
+                        self.errors += 1
+                        done = True
+                        continue
+                    self.pages += 1
+                    fresh = [p for p in result if (p.sku or p.url or p.name) not in seen]
+                    if not fresh:
+                        # Past the last page (or the site repeating its last page)
+                        done = True
+                        continue
+                    seen.update(p.sku or p.url or p.name for p in fresh)
+                    for product in fresh:
+                        queue.put_nowait(product)
+                if done:
+                    break
+                number = last
+        finally:
+            # One None per keyword tells crawl() this keyword is finished
+            queue.put_nowait(None)
+
+    async def crawl(self):
+        """Async generator of Product records, in arrival order"""
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        queue = asyncio.Queue()
+        start = time.perf_counter()
+        walkers = [asyncio.create_task(self._walk(keyword, queue)) for keyword in self.keywords]
+        try:
+            remaining = len(walkers)
+            while remaining:
+                product = await queue.get()
+                if product is None:
+                    remaining -= 1
+                    continue
+                self.products += 1
+                yield product
+        finally:
+            for walker in walkers:
+                walker.cancel()
+            self.elapsed = time.perf_counter() - start
+
+    def summary(self):
+        rate = self.products / self.elapsed if self.elapsed else 0.0
+        return (f"{len(self.keywords)} keywords, {self.pages} pages ({self.errors} errors), {self.products} products "
+                f"in {self.elapsed:.2f}s = {rate:.1f} products/s")
+
+@traced_run("hktvmall_crawl", "hktvmall.com")
+async def crawl_hktvmall(keywords, pool=None, output=None, base_url=BASE_URL, concurrency=4, **options):
+    """Crawl every keyword into `output` (CSV) when given; returns the crawler and its products"""
+    if pool is None:
+        async with BrowserPool(size=concurrency) as own_pool:
+            return await crawl_hktvmall(keywords, own_pool, output, base_url, concurrency, **options)
+
+    crawler = HktvmallCrawler(pool, keywords, base_url=base_url, concurrency=concurrency, **options)
+    products = []
+    async for product in crawler.crawl():
+        products.append(product)
+    if output:
+        with phase("export", items=len(products)):
+            with open(output, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(Product._fields)
+                writer.writerows(products)
+        print(f"Wrote {len(products)} products to '{output}'")
+    print(crawler.summary())
+    return crawler, products
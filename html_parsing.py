@@ -0,0 +1,125 @@
+import re
+import warnings
+import bs4
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Optional fast backends; html.parser is always available
+try:
+    import lxml  # noqa: F401
+    HAVE_LXML = True
+except ImportError:
+    HAVE_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    HAVE_LEXBOR = True
+except ImportError:
+    LexborHTMLParser = None
+    HAVE_LEXBOR = False
+
+def available_backends():
+    """Backends usable on this machine, fastest first"""
+    backends = []
+    if HAVE_LEXBOR:
+        backends.append("lexbor")
+    if HAVE_LXML:
+        backends.append("lxml")
+    backends.append("html.parser")
+    return backends
+
+def default_backend():
+    # lxml gives bs4 objects directly and is the cheapest to build a full tree with
+    return "lxml" if HAVE_LXML else "html.parser"
+
+# _AnyStrainer overrides SoupStrainer internals, which bs4 renamed once already (search_tag became
+# allow_tag_creation in 4.13). It is only used on the bs4 releases it is tested against; anywhere
+# else a target with wrappers parses the whole document, which is slower but gives the same items.
+BS4_VERSION = tuple(int(part) for part in re.findall(r"\d+", bs4.__version__)[:2])
+ANY_STRAINER_SUPPORTED = (4, 9) <= BS4_VERSION < (5, 0) and (
+    hasattr(SoupStrainer, "allow_tag_creation") or hasattr(SoupStrainer, "search_tag"))
+
+class _AnyStrainer(SoupStrainer):
+    """Keeps a tag when any of `strainers` would (bs4 ANDs the rules of a single strainer)"""
+
+    def __init__(self, strainers):
+        super().__init__()
+        self.strainers = strainers
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return any(s.allow_tag_creation(nsprefix, name, attrs) for s in self.strainers)
+
+    def search_tag(self, name, attrs=None):
+        # bs4 < 4.13 asks this instead of allow_tag_creation
+        return any(s.search_tag(name, attrs) for s in self.strainers)
+
+class ParseTarget:
+    """The subtree(s) a scraper actually needs, e.g. ParseTarget("div", "quote")
+
+    `tags`/`classes` may be lists to accept several layouts. `wrappers` are
+    tags kept whatever their class, for items wrapped in a plain element such
+    as a link; `wrapper_attrs` ({attribute: substring}) narrows them to the
+    ones whose attributes contain those substrings, e.g. only product links
+    rather than every link on the page. The SoupStrainer and the equivalent CSS selector are built
+    once, when the target is declared. `strainer` is None when the installed
+    bs4 cannot combine strainers (see ANY_STRAINER_SUPPORTED); the target then
+    parses the whole document.
+    """
+
+    def __init__(self, tags, classes=None, wrappers=None, wrapper_attrs=None):
+        self.tags = [tags] if isinstance(tags, str) else list(tags)
+        if classes is None:
+            self.classes = []
+        else:
+            self.classes = [classes] if isinstance(classes, str) else list(classes)
+        self.wrappers = [wrappers] if isinstance(wrappers, str) else list(wrappers or [])
+        self.wrapper_attrs = dict(wrapper_attrs or {})
+
+        if self.classes:
+            self.strainer = SoupStrainer(self.tags, class_=self.classes)
+            self.css = ", ".join(f"{t}.{c}" for t in self.tags for c in self.classes)
+        else:
+            self.strainer = SoupStrainer(self.tags)
+            self.css = ", ".join(self.tags)
+        if self.wrappers:
+            if ANY_STRAINER_SUPPORTED:
+                attrs = {name: re.compile(re.escape(value)) for name, value in self.wrapper_attrs.items()}
+                self.strainer = _AnyStrainer([self.strainer, SoupStrainer(self.wrappers, attrs=attrs)])
+            else:
+                warnings.warn(f"bs4 {bs4.__version__} is not supported by _AnyStrainer; "
+                              f"{self.css} with wrappers parses the whole document", RuntimeWarning)
+                self.strainer = None
+            attr_css = "".join(f'[{name}*="{value}"]' for name, value in self.wrapper_attrs.items())
+            self.css = ", ".join([self.css] + [wrapper + attr_css for wrapper in self.wrappers])
+
+    def __repr__(self):
+        return f"ParseTarget({self.css!r})"
+
+def _has_matched_ancestor(node, matched):
+    parent = node.parent
+    while parent is not None:
+        if parent.mem_id in matched:
+            return True
+        parent = parent.parent
+    return False
+
+def make_soup(html, target=None, backend=None):
+    """Parse `html` into a BeautifulSoup, limited to `target` when one is given
+
+    backend="lexbor" uses selectolax to cut the target elements out of the
+    document and only hands those fragments to bs4, so callers keep the same
+    find()/select() API whichever backend is used.
+    """
+    backend = backend or default_backend()
+    if backend == "lexbor":
+        if not HAVE_LEXBOR:
+            raise ValueError("selectolax is not installed; pip install selectolax")
+        if target is None:
+            return BeautifulSoup(html, default_backend())
+        nodes = LexborHTMLParser(html).css(target.css)
+        # Skip matches nested inside another match; they come along with their ancestor
+        matched = {node.mem_id for node in nodes}
+        fragments = [node.html for node in nodes if not _has_matched_ancestor(node, matched)]
+        return BeautifulSoup("".join(fragments), default_backend())
+    if target is None:
+        return BeautifulSoup(html, backend)
+    return BeautifulSoup(html, backend, parse_only=target.strainer)
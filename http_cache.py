@@ -0,0 +1,277 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from collections import namedtuple
+from rate_limit import throttle, throttle_sync
+
+# source: "network" (downloaded), "cache" (fresh, no request made) or "revalidated" (304)
+CachedResponse = namedtuple("CachedResponse", ["url", "status_code", "text", "headers", "source", "parsed"])
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    encoding TEXT,
+    stored_at REAL NOT NULL,
+    max_age REAL,
+    no_cache INTEGER NOT NULL DEFAULT 0,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    parser TEXT
+)
+"""
+
+MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+def parse_cache_control(value):
+    """(store, max_age, must_revalidate) from a Cache-Control header"""
+    value = (value or "").lower()
+    if "no-store" in value:
+        return False, None, True
+    match = MAX_AGE_RE.search(value)
+    max_age = int(match.group(1)) if match else None
+    return True, max_age, "no-cache" in value
+
+def _parse_key(parse, parse_key=None):
+    """Key of a parse function's stored results: `parse_key` when given, else the function's
+    `cache_key` attribute. Bump it whenever the parser's output changes, so results parsed by
+    older parser code are never returned."""
+    if parse is None:
+        return None
+    key = parse_key or getattr(parse, "cache_key", None)
+    if not key:
+        raise ValueError("Caching parse results needs a version key: pass parse_key= or set parse.cache_key")
+    return key
+
+class HttpCache:
+    """On-disk HTTP cache with conditional revalidation and an LRU size cap
+
+    Bodies live in `directory` as one file per URL; a SQLite index keeps the
+    validators (ETag / Last-Modified), freshness and last use. Responses still
+    fresh under Cache-Control max-age are served without a request; stale ones
+    are revalidated with If-None-Match / If-Modified-Since. When `parse` is
+    given its result is stored next to the body as JSON, keyed by `parse_key`
+    (or `parse.cache_key`), so a hit or a 304 returns the stored result without
+    parsing the page again. `parse` must return JSON-serializable data, and
+    `parsed` is always the JSON round trip of it (tuples come back as lists),
+    whether it was parsed now or read from disk. Nothing in `directory` is ever
+    executed: a tampered file can only yield wrong data, never run code.
+    """
+
+    def __init__(self, directory=".http_cache", max_bytes=50 * 1024 * 1024, clock=time.time):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.clock = clock
+        os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False)
+        self.conn.execute(INDEX_SCHEMA)
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+
+    def _key(self, url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, key + suffix)
+
+    def _lookup(self, key):
+        row = self.conn.execute(
+            "SELECT url, etag, last_modified, encoding, stored_at, max_age, no_cache, size, parser "
+            "FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or not os.path.exists(self._path(key, ".body")):
+            return None
+        names = ["url", "etag", "last_modified", "encoding", "stored_at", "max_age", "no_cache", "size", "parser"]
+        return dict(zip(names, row))
+
+    def _is_fresh(self, entry):
+        if entry["no_cache"] or entry["max_age"] is None:
+            return False
+        return self.clock() - entry["stored_at"] < entry["max_age"]
+
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since for a stored response (empty when nothing is stored)"""
+        entry = self._lookup(self._key(url))
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _read(self, key, entry, parse, parse_key, source):
+        with open(self._path(key, ".body"), "rb") as f:
+            body = f.read()
+        text = body.decode(entry["encoding"] or "utf-8", errors="replace")
+        parsed = None
+        if parse is not None:
+            parsed_path = self._path(key, ".parsed")
+            if entry["parser"] == parse_key and os.path.exists(parsed_path):
+                with open(parsed_path, "r", encoding="utf-8") as f:
+                    parsed = json.load(f)
+            else:
+                # Stored before this parser (version) was used; parse once and keep the result
+                parsed = self._store_parsed(key, parse_key, parse(text))
+        self.bytes_saved += len(body)
+        self.conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (self.clock(), key))
+        self.conn.commit()
+        return CachedResponse(entry["url"], 200, text, {}, source, parsed)
+
+    def _store_parsed(self, key, parse_key, parsed):
+        """Write a parse result as JSON; returns it as it will read back"""
+        data = json.dumps(parsed)
+        with open(self._path(key, ".parsed"), "w", encoding="utf-8") as f:
+            f.write(data)
+        self.conn.execute("UPDATE entries SET parser = ? WHERE key = ?", (parse_key, key))
+        return json.loads(data)
+
+    def _delete(self, key):
+        for suffix in (".body", ".parsed"):
+            if os.path.exists(self._path(key, suffix)):
+                os.remove(self._path(key, suffix))
+        self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def _store(self, url, key, status, body, headers, encoding, parse, parse_key):
+        text = body.decode(encoding or "utf-8", errors="replace")
+        parsed = parse(text) if parse is not None and status == 200 else None
+        if parsed is not None:
+            # The same shape a later hit reads back from disk
+            parsed = json.loads(json.dumps(parsed))
+        store, max_age, no_cache = parse_cache_control(headers.get("Cache-Control"))
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        if status == 200 and store and (etag or last_modified or max_age):
+            with open(self._path(key, ".body"), "wb") as f:
+                f.write(body)
+            now = self.clock()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries (key, url, etag, last_modified, encoding, stored_at, max_age, "
+                "no_cache, size, last_used, parser) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL)",
+                (key, url, etag, last_modified, encoding, now, max_age, int(no_cache), len(body), now))
+            if parse is not None:
+                self._store_parsed(key, parse_key, parsed)
+            self.conn.commit()
+            self._evict()
+        elif status == 200:
+            # The page may no longer be stored (no-store) or can no longer be revalidated (no validators
+            # or max-age): drop what an earlier response left, or it would keep being revalidated
+            self._delete(key)
+            self.conn.commit()
+        return CachedResponse(url, status, text, dict(headers), "network", parsed)
+
+    def _refresh(self, key, headers):
+        # A 304 may carry new validators or new Cache-Control directives; whatever it omits stays as stored
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        if headers.get("Cache-Control") is None:
+            self.conn.execute(
+                "UPDATE entries SET stored_at = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE key = ?",
+                (self.clock(), etag, last_modified, key))
+            return
+        store, max_age, no_cache = parse_cache_control(headers.get("Cache-Control"))
+        self.conn.execute(
+            "UPDATE entries SET stored_at = ?, max_age = ?, no_cache = ?, "
+            "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE key = ?",
+            (self.clock(), max_age, int(no_cache), etag, last_modified, key))
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.conn.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._delete(key)
+            total -= size
+            self.evictions += 1
+        self.conn.commit()
+
+    def _before_request(self, url):
+        """(key, stored entry or None, whether it is still fresh, conditional request headers)"""
+        key = self._key(url)
+        entry = self._lookup(key)
+        if entry is None:
+            return key, None, False, {}
+        if self._is_fresh(entry):
+            return key, entry, True, {}
+        return key, entry, False, self.conditional_headers(url)
+
+    def _after_response(self, url, key, entry, status, body, headers, encoding, parse, parse_key):
+        if status == 304 and entry is not None:
+            self.revalidated += 1
+            store, _, _ = parse_cache_control(headers.get("Cache-Control"))
+            if not store:
+                # Answer from the stored body one last time, then forget it
+                response = self._read(key, entry, parse, parse_key, "revalidated")
+                self._delete(key)
+                self.conn.commit()
+                return response
+            self._refresh(key, headers)
+            return self._read(key, entry, parse, parse_key, "revalidated")
+        self.misses += 1
+        return self._store(url, key, status, body, headers, encoding, parse, parse_key)
+
+    def get(self, url, session=None, parse=None, parse_key=None, **kwargs):
+        """GET through the cache with a requests Session (or the requests module)"""
+        parse_key = _parse_key(parse, parse_key)
+        key, entry, fresh, headers = self._before_request(url)
+        if fresh:
+            self.hits += 1
+            return self._read(key, entry, parse, parse_key, "cache")
+        if session is None:
+            import requests
+            session = requests
+        headers.update(kwargs.pop("headers", None) or {})
+        # Only requests that reach the server count against the host's rate limit
+        throttle_sync(url)
+        response = session.get(url, headers=headers, **kwargs)
+        return self._after_response(url, key, entry, response.status_code, response.content,
+                                    response.headers, response.encoding, parse, parse_key)
+
+    async def aget(self, client, url, parse=None, parse_key=None, **kwargs):
+        """Same as get() for an httpx.AsyncClient"""
+        parse_key = _parse_key(parse, parse_key)
+        key, entry, fresh, headers = self._before_request(url)
+        if fresh:
+            self.hits += 1
+            return self._read(key, entry, parse, parse_key, "cache")
+        headers.update(kwargs.pop("headers", None) or {})
+        await throttle(url)
+        response = await client.get(url, headers=headers, **kwargs)
+        return self._after_response(url, key, entry, response.status_code, response.content,
+                                    response.headers, response.encoding, parse, parse_key)
+
+    def stats(self):
+        entries, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "evictions": self.evictions,
+            "bytes_saved": self.bytes_saved,
+            "entries": entries,
+            "size": size,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (f"HTTP cache: {s['hits']} hits, {s['revalidated']} revalidated (304), {s['misses']} misses, "
+                f"{s['evictions']} evicted; {s['entries']} entries / {s['size'] / 1024:.0f} KiB, "
+                f"{s['bytes_saved'] / 1024:.0f} KiB not downloaded")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,131 @@
+from field_extraction import ExtractionSpec
+from urls import site_of
+
+# Index of the first probe selector that matches anything on the page, or -1
+PROBE_JS = """
+(probes) => probes.findIndex(probe => document.querySelector(probe) !== null)
+"""
+
+class Layout:
+    """One known page layout: the selector that identifies it and the extraction it compiles to"""
+
+    def __init__(self, name, container, fields, probe=None):
+        self.name = name
+        self.probe = probe or container
+        self.spec = ExtractionSpec(container, fields)
+        self._subsets = {}
+
+    def spec_for(self, fields=None):
+        """The extraction spec, limited to `fields` (names) when given"""
+        if not fields:
+            return self.spec
+        key = tuple(fields)
+        if key not in self._subsets:
+            self._subsets[key] = ExtractionSpec(self.spec.container, {name: self.spec.fields[name] for name in key})
+        return self._subsets[key]
+
+    def __repr__(self):
+        return f"Layout({self.name!r})"
+
+class LayoutStrategy:
+    """Decides once per site which of several known layouts its pages use
+
+    `layouts` are in priority order. The first page from a site is probed and
+    the first layout whose probe selector matches is remembered for the site;
+    later pages go straight to that layout's single-pass extraction. When the
+    remembered layout finds nothing, the page is probed again in case the site
+    switched layouts (a page matching no layout keeps the old choice).
+
+    With a selector_cache.SelectorCache the choice also outlives the process:
+    the container of the winning layout is stored under `page_type`, so the
+    next run skips the probe too, and a stored layout that no longer matches
+    counts as a miss and is replaced.
+    """
+
+    def __init__(self, layouts, cache=None, page_type="default"):
+        self.layouts = list(layouts)
+        self.cache = cache
+        self.page_type = page_type
+        self.chosen = {}
+        self.probes = 0
+        self.reprobes = 0
+        # Sites whose layout came from the cache and has not been checked against a page yet
+        self._unconfirmed = set()
+        self._loaded = set()
+
+    @property
+    def selector(self):
+        """CSS matching any known layout, e.g. to wait for the results to render"""
+        return ", ".join(layout.probe for layout in self.layouts)
+
+    def probe(self, soup):
+        """The first layout present in a parsed page, or None"""
+        self.probes += 1
+        for layout in self.layouts:
+            if soup.select_one(layout.probe) is not None:
+                return layout
+        return None
+
+    async def probe_page(self, page):
+        """Same as probe() in the browser, in one round-trip"""
+        self.probes += 1
+        index = await page.evaluate(PROBE_JS, [layout.probe for layout in self.layouts])
+        return self.layouts[index] if index >= 0 else None
+
+    def _remembered(self, site):
+        layout = self.chosen.get(site)
+        if layout is None and self.cache is not None and site not in self._loaded:
+            # First page of this site in this process: look up the layout of earlier runs
+            self._loaded.add(site)
+            container = self.cache.get(site, self.page_type)
+            layout = next((l for l in self.layouts if l.spec.container == container), None)
+            if layout is not None:
+                self.chosen[site] = layout
+                self._unconfirmed.add(site)
+        return layout
+
+    def _matched(self, site, layout):
+        # The remembered layout worked; a layout from the cache counts as a hit once per run
+        if site in self._unconfirmed:
+            self._unconfirmed.discard(site)
+            self.cache.record(site, self.page_type, layout.spec.container)
+
+    def _choose(self, site, layout):
+        if layout is not None:
+            self.chosen[site] = layout
+            self._unconfirmed.discard(site)
+            if self.cache is not None:
+                self.cache.record(site, self.page_type, layout.spec.container)
+        return layout
+
+    def extract(self, soup, site, base_url=None, fields=None):
+        """(layout, items) for a parsed page, using the layout remembered for `site`
+
+        `fields` limits extraction to those field names (default: all of them).
+        """
+        layout = self._remembered(site)
+        if layout is not None:
+            items = layout.spec_for(fields).extract_html(soup, base_url)
+            if items:
+                self._matched(site, layout)
+                return layout, items
+            self.reprobes += 1
+        layout = self._choose(site, self.probe(soup))
+        if layout is None:
+            return None, []
+        return layout, layout.spec_for(fields).extract_html(soup, base_url)
+
+    async def extract_page(self, page, site=None, fields=None):
+        """(layout, items) for a live page, extracted in the browser"""
+        site = site or site_of(page.url)
+        layout = self._remembered(site)
+        if layout is not None:
+            items = await layout.spec_for(fields).extract(page)
+            if items:
+                self._matched(site, layout)
+                return layout, items
+            self.reprobes += 1
+        layout = self._choose(site, await self.probe_page(page))
+        if layout is None:
+            return None, []
+        return layout, await layout.spec_for(fields).extract(page)
@@ -0,0 +1,131 @@
+import time
+from adaptive_scroll import SCROLL_STEP_JS
+
+# Finds a visible, enabled "more" button (or an <a> without a real href) by text,
+# aria-label, id or class, clicks it and resolves once new items have been
+# appended (or `timeoutMs` passes).
+LOAD_MORE_JS = """
+async ({itemSelector, timeoutMs, quietMs}) => {
+    const count = () => document.querySelectorAll(itemSelector).length;
+    const textPattern = /\\b(load|show|view)\\s+more\\b|\\bmore\\s+stories\\b/i;
+    const classPattern = /load-?more|show-?more|view-?more/i;
+    const isVisible = el => {
+        const style = window.getComputedStyle(el);
+        return el.getClientRects().length > 0 && style.visibility !== 'hidden' && style.display !== 'none';
+    };
+    const isEnabled = el => !el.disabled && el.getAttribute('aria-disabled') !== 'true';
+    // Clicking a real link would navigate away in the middle of this evaluate()
+    const navigates = el => {
+        const link = el.closest('a[href]');
+        if (!link) return false;
+        const href = link.getAttribute('href').trim();
+        return href !== '' && href !== '#' && !/^javascript:/i.test(href);
+    };
+
+    const before = count();
+    let target = null;
+    let label = null;
+    for (const el of document.querySelectorAll('button, a, [role="button"], input[type="button"]')) {
+        if (!isVisible(el) || !isEnabled(el) || navigates(el)) continue;
+        const text = (el.innerText || '').trim();
+        const ariaLabel = el.getAttribute('aria-label') || '';
+        const className = el.getAttribute('class') || '';
+        if (textPattern.test(text) || textPattern.test(ariaLabel) || classPattern.test(className)
+                || el.getAttribute('data-testid') === 'load-more' || el.id === 'load-more') {
+            target = el;
+            label = text || ariaLabel || className;
+            break;
+        }
+    }
+    if (!target) return {clicked: false, label: null, before, after: before};
+
+    target.scrollIntoView({block: 'center'});
+    target.click();
+
+    // Wait for the first new item, then for the batch to finish arriving
+    const started = performance.now();
+    let lastCount = before;
+    let lastChange = performance.now();
+    while (performance.now() - started < timeoutMs) {
+        await new Promise(resolve => setTimeout(resolve, 100));
+        const current = count();
+        if (current !== lastCount) {
+            lastCount = current;
+            lastChange = performance.now();
+        } else if (current > before && performance.now() - lastChange >= quietMs) {
+            break;
+        }
+    }
+    return {clicked: true, label: label.slice(0, 80), before, after: count()};
+}
+"""
+
+async def load_more_until_exhausted(page, item_selector, target_count=None, max_time=120000,
+                                    click_timeout=5000, quiet_ms=300, settle_ms=2000, harvester=None, verbose=True):
+    """Click "Load More" (or scroll when there is no button) until no new items arrive
+
+    Stops when a round produces no new items, `target_count` items exist, an
+    IncrementalHarvester reports it is done, or `max_time` ms pass. Returns one
+    dict per round describing what it did.
+    """
+    started = time.perf_counter()
+    report = []
+    if harvester is not None:
+        await harvester.harvest(page)
+
+    while True:
+        if harvester is not None and harvester.done:
+            if verbose:
+                print(f"Stopped loading: harvested {len(harvester.items)} items")
+            break
+        remaining_ms = max_time - (time.perf_counter() - started) * 1000
+        if remaining_ms <= 0:
+            if verbose:
+                print(f"Stopped loading: reached the {max_time / 1000:.0f}s time cap")
+            break
+
+        result = await page.evaluate(LOAD_MORE_JS, {
+            "itemSelector": item_selector,
+            "timeoutMs": min(click_timeout, remaining_ms),
+            "quietMs": quiet_ms
+        })
+        action = "click" if result["clicked"] else "scroll"
+        before = result["before"]
+        after = result["after"]
+
+        # No button (or the click produced nothing): fall back to infinite scroll
+        if after <= before:
+            scrolled = await page.evaluate(SCROLL_STEP_JS, {
+                "selector": item_selector,
+                "settleMs": settle_ms,
+                "quietMs": quiet_ms,
+                "maxStepMs": max(remaining_ms, 0)
+            })
+            after = scrolled["count"]
+            if result["clicked"]:
+                action = "click+scroll"
+
+        if harvester is not None:
+            await harvester.harvest(page)
+        report.append({
+            "round": len(report) + 1,
+            "action": action,
+            "label": result["label"],
+            "new_items": after - before,
+            "total_items": after,
+            "elapsed": time.perf_counter() - started
+        })
+        if verbose:
+            via = f" via '{result['label']}'" if result["clicked"] else ""
+            print(f"Round {len(report)} ({action}{via}): +{after - before} items ({after} total)")
+
+        if after <= before:
+            if verbose:
+                print("Stopped loading: no new items")
+            break
+        if target_count is not None and after >= target_count:
+            if verbose:
+                print(f"Stopped loading: reached target of {target_count} items")
+            break
+
+    return report
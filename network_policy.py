@@ -0,0 +1,171 @@
+from urllib.parse import urlparse
+from telemetry import current_run
+
+# Resource types we never read: the scrapers only use text from page.content()
+DEFAULT_BLOCKED_TYPES = {"image", "media", "font"}
+
+# Ad, tracking and analytics hosts (subdomains match too)
+DEFAULT_DENY_DOMAINS = {
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "adservice.google.com",
+    "amazon-adsystem.com",
+    "adsafeprotected.com",
+    "moatads.com",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "chartbeat.com",
+    "chartbeat.net",
+    "taboola.com",
+    "outbrain.com",
+    "criteo.com",
+    "criteo.net",
+    "facebook.net",
+    "hotjar.com",
+    "segment.io",
+    "newrelic.com",
+    "nr-data.net",
+}
+
+# Rough transfer sizes used to estimate what a blocked request would have cost. Nothing is
+# measured: a blocked request never transfers, so its real size is unknown. The estimate is
+# reported as such; the blocked-request counts are the figures to compare runs by
+ESTIMATED_BYTES_BY_TYPE = {
+    "image": 40_000,
+    "media": 500_000,
+    "font": 30_000,
+    "stylesheet": 20_000,
+    "script": 60_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+}
+DEFAULT_ESTIMATED_BYTES = 10_000
+
+def _host_matches(host, domains):
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+class NetworkStats:
+    """Per-run counters for requests blocked/allowed, bytes loaded (from Content-Length),
+    and an estimate of the bytes blocking saved"""
+
+    def __init__(self):
+        self.requests_allowed = 0
+        self.requests_blocked = 0
+        self.blocked_by_reason = {}
+        self.bytes_loaded = 0
+        self.bytes_saved_estimate = 0
+
+    def record_blocked(self, reason, resource_type):
+        self.requests_blocked += 1
+        self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+        self.bytes_saved_estimate += ESTIMATED_BYTES_BY_TYPE.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+
+    def as_dict(self):
+        return {
+            "requests_blocked": self.requests_blocked,
+            "blocked_by_reason": dict(self.blocked_by_reason),
+            "requests_allowed": self.requests_allowed,
+            "bytes_loaded": self.bytes_loaded,
+            "bytes_saved_estimate": self.bytes_saved_estimate,
+        }
+
+    def summary(self):
+        reasons = ", ".join(f"{k}={v}" for k, v in sorted(self.blocked_by_reason.items())) or "none"
+        return (f"Network: {self.requests_blocked} requests blocked [{reasons}], "
+                f"{self.requests_allowed} allowed ({self.bytes_loaded / 1024:.0f} KiB loaded); "
+                f"estimated ~{self.bytes_saved_estimate / 1024:.0f} KiB saved (fixed per-type sizes, not measured)")
+
+class NetworkPolicy:
+    """Request-interception rules: block by resource type, by domain deny-list, or
+    only allow scripts from an allow-list of domains (first-party is always allowed)"""
+
+    def __init__(self, blocked_types=None, deny_domains=None, allow_script_domains=None):
+        self.blocked_types = set(DEFAULT_BLOCKED_TYPES if blocked_types is None else blocked_types)
+        self.deny_domains = set(DEFAULT_DENY_DOMAINS if deny_domains is None else deny_domains)
+        # An empty allow-list means first-party scripts only; None allows every script domain
+        self.allow_script_domains = set(allow_script_domains) if allow_script_domains is not None else None
+
+    def block_reason(self, url, resource_type, first_party):
+        """Why a request should be blocked, or None to let it through"""
+        host = urlparse(url).hostname or ""
+        if resource_type in self.blocked_types:
+            return f"type:{resource_type}"
+        if _host_matches(host, self.deny_domains):
+            return "deny-list"
+        if (self.allow_script_domains is not None and resource_type == "script"
+                and not _host_matches(host, {first_party})
+                and not _host_matches(host, self.allow_script_domains)):
+            return "script-not-allowed"
+        return None
+
+    async def attach(self, page, site_url, report=True):
+        """Route every request of `page` through this policy; returns the NetworkStats for the run"""
+        stats = NetworkStats()
+        run = current_run()
+        if run is not None:
+            # Written with the run record, whether or not the page is closed first
+            run.network.append(stats)
+        first_party = ".".join((urlparse(site_url).hostname or "").split(".")[-2:])
+
+        async def handle(route):
+            request = route.request
+            reason = self.block_reason(request.url, request.resource_type, first_party)
+            if reason:
+                stats.record_blocked(reason, request.resource_type)
+                await route.abort()
+            else:
+                stats.requests_allowed += 1
+                # fallback (not continue_) so context-level routes such as HAR replay still apply
+                await route.fallback()
+
+        def on_response(response):
+            length = response.headers.get("content-length")
+            if length and length.isdigit():
+                stats.bytes_loaded += int(length)
+
+        await page.route("**/*", handle)
+        page.on("response", on_response)
+        if report:
+            page.on("close", lambda _: print(stats.summary()))
+        return stats
+
+# Per-site policies; anything not listed gets DEFAULT_POLICY
+DEFAULT_POLICY = NetworkPolicy()
+
+SITE_POLICIES = {
+    # Video thumbnails and previews are images/media; stylesheets are safe to drop too
+    "youtube.com": NetworkPolicy(blocked_types=DEFAULT_BLOCKED_TYPES | {"stylesheet"}),
+    # No script allow-list: the third-party bot-check scripts must load or the captcha page appears.
+    # Header-bidding and audience trackers go; stylesheets stay so the consent dialog is clickable
+    "bloomberg.com": NetworkPolicy(deny_domains=DEFAULT_DENY_DOMAINS | {
+        "permutive.com", "permutive.app", "krxd.net", "adnxs.com", "pubmatic.com",
+        "rubiconproject.com", "casalemedia.com", "bounceexchange.com", "bouncex.net",
+    }),
+    # Results are rendered by first-party scripts; only the card markup is read, so CSS can go
+    "hktvmall.com": NetworkPolicy(
+        blocked_types=DEFAULT_BLOCKED_TYPES | {"stylesheet"},
+        deny_domains=DEFAULT_DENY_DOMAINS | {"mixpanel.com", "clarity.ms", "analytics.tiktok.com", "licdn.com"},
+    ),
+    # Yahoo's own ad and beacon hosts; the consent dialog needs its scripts and CSS
+    "yahoo.com": NetworkPolicy(deny_domains=DEFAULT_DENY_DOMAINS | {
+        "analytics.yahoo.com", "ads.yahoo.com", "geo.yahoo.com", "doubleverify.com", "btloader.com",
+        "yieldmo.com", "adnxs.com",
+    }),
+    # The program list is in the server-rendered HTML: first-party scripts only, no CSS
+    "berkeley.edu": NetworkPolicy(blocked_types=DEFAULT_BLOCKED_TYPES | {"stylesheet"}, allow_script_domains=set()),
+}
+
+def policy_for(url):
+    host = urlparse(url).hostname or ""
+    for domain, policy in SITE_POLICIES.items():
+        if _host_matches(host, {domain}):
+            return policy
+    return DEFAULT_POLICY
+
+async def apply_network_policy(page, url, report=True):
+    """Attach the policy registered for `url`'s site to `page`; returns its NetworkStats"""
+    return await policy_for(url).attach(page, url, report=report)
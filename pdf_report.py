@@ -0,0 +1,341 @@
+import os
+import re
+from datetime import datetime
+from xml.sax.saxutils import escape
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Frame, Paragraph, Spacer
+
+MARGIN = inch
+
+# Finished pages are saved to a part file on disk every CHUNK_PAGES pages
+CHUNK_PAGES = 200
+
+_styles = None
+
+def report_styles():
+    """Paragraph styles for the news report, built once per process"""
+    global _styles
+    if _styles is None:
+        base = getSampleStyleSheet()
+        _styles = {
+            "normal": base['Normal'],
+            # Report title
+            "title": ParagraphStyle(
+                'CustomTitle',
+                parent=base['Heading1'],
+                fontSize=18,
+                spaceAfter=30,
+                alignment=1  # Center alignment
+            ),
+            # Heading for a batch appended to an existing report
+            "update": ParagraphStyle(
+                'UpdateTitle',
+                parent=base['Heading2'],
+                fontSize=14,
+                spaceAfter=12
+            ),
+            "article_title": ParagraphStyle(
+                'ArticleTitle',
+                parent=base['Heading2'],
+                fontSize=12,
+                spaceAfter=6,
+                textColor='darkblue'
+            ),
+            "time": ParagraphStyle(
+                'TimeStyle',
+                parent=base['Normal'],
+                fontSize=10,
+                textColor='gray',
+                spaceAfter=12
+            ),
+        }
+    return _styles
+
+def daily_report_path(prefix="bloomberg_latest_news", day=None):
+    """e.g. bloomberg_latest_news_2024-05-14.pdf"""
+    day = day or datetime.now()
+    return f"{prefix}_{day.strftime('%Y-%m-%d')}.pdf"
+
+def stories_since_update(stories, filename):
+    """The stories published after `filename` was last written (all of them while it does not exist)
+
+    Keeps repeated runs appending to one daily report from adding a story twice;
+    stories without a timestamp cannot be placed, so they are left out of an existing report.
+    """
+    if not os.path.exists(filename):
+        return list(stories)
+    updated = os.path.getmtime(filename)
+    return [story for story in stories if story.epoch is not None and story.epoch > updated]
+
+def _pypdf():
+    # pypdf is only needed (and only imported) for reports longer than one chunk and when appending
+    try:
+        import pypdf
+    except ImportError:
+        raise RuntimeError("Appending to a report, or writing more than one chunk of pages, "
+                           "requires pypdf; pip install pypdf")
+    return pypdf
+
+def _story_count(filename):
+    """Number of stories already in a report written by this module (kept in the PDF subject)"""
+    with open(filename, "rb") as f:
+        subject = (_pypdf().PdfReader(f).metadata or {}).get("/Subject") or ""
+    if subject.startswith("stories="):
+        try:
+            return int(subject.split("=", 1)[1])
+        except ValueError:
+            pass
+    return 0
+
+def _copy_object(value, renumber, parent):
+    """Copy a pypdf object, renumbering its references (a page's /Parent becomes `parent`)"""
+    generic = _pypdf().generic
+    if isinstance(value, generic.IndirectObject):
+        return renumber(value)
+    if isinstance(value, generic.DictionaryObject):
+        copy = type(value)()
+        if isinstance(value, generic.StreamObject):
+            # Already-encoded content is copied as is, never decoded
+            copy._data = value._data
+        for key, item in value.items():
+            copy[generic.NameObject(key)] = parent if key == "/Parent" else _copy_object(item, renumber, parent)
+        return copy
+    if isinstance(value, generic.ArrayObject):
+        return generic.ArrayObject(_copy_object(item, renumber, parent) for item in value)
+    return value
+
+def _append_parts(filename, parts, info):
+    """Append the pages of the `parts` PDFs to `filename` as one incremental update
+
+    Only the page tree root, a new info dictionary and the copied pages are
+    written after the existing bytes; existing pages are neither read nor
+    rewritten, and each part is read on its own, so memory stays bounded by one
+    part however long the report grows.
+    """
+    generic = _pypdf().generic
+    with open(filename, "rb") as f:
+        base = _pypdf().PdfReader(f)
+        trailer = base.trailer
+        root_ref = trailer.raw_get("/Root")
+        pages_ref = root_ref.get_object().raw_get("/Pages")
+        pages = generic.DictionaryObject(pages_ref.get_object())
+        kids = generic.ArrayObject(pages["/Kids"])
+        count = int(pages["/Count"])
+        old_info = dict(trailer["/Info"].get_object()) if "/Info" in trailer else {}
+        file_id = trailer.get("/ID")
+        next_id = int(trailer["/Size"])
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - 1024))
+        prev = int(re.findall(rb"startxref\s+(\d+)", f.read())[-1])
+
+    offsets = {}
+    with open(filename, "ab") as out:
+        try:
+            def emit(idnum, obj):
+                offsets[idnum] = out.tell()
+                out.write(f"{idnum} 0 obj\n".encode())
+                obj.write_to_stream(out)
+                out.write(b"\nendobj\n")
+
+            out.write(b"\n")
+            for part in parts:
+                reader = _pypdf().PdfReader(part)
+                numbers = {}
+                queue = []
+
+                def renumber(ref):
+                    nonlocal next_id
+                    if ref.idnum not in numbers:
+                        numbers[ref.idnum] = next_id
+                        next_id += 1
+                        queue.append(ref)
+                    return generic.IndirectObject(numbers[ref.idnum], 0, None)
+
+                for page in reader.pages:
+                    kids.append(renumber(page.indirect_reference))
+                    count += 1
+                while queue:
+                    ref = queue.pop(0)
+                    emit(numbers[ref.idnum], _copy_object(ref.get_object(), renumber, pages_ref))
+
+            pages[generic.NameObject("/Kids")] = kids
+            pages[generic.NameObject("/Count")] = generic.NumberObject(count)
+            emit(pages_ref.idnum, pages)
+            info_id = next_id
+            next_id += 1
+            new_info = generic.DictionaryObject(old_info)
+            for key, value in info.items():
+                new_info[generic.NameObject(key)] = generic.TextStringObject(value)
+            emit(info_id, new_info)
+
+            xref = out.tell()
+            out.write(b"xref\n")
+            numbers = sorted(offsets)
+            start = 0
+            while start < len(numbers):
+                end = start
+                while end + 1 < len(numbers) and numbers[end + 1] == numbers[end] + 1:
+                    end += 1
+                out.write(f"{numbers[start]} {end - start + 1}\n".encode())
+                for idnum in numbers[start:end + 1]:
+                    out.write(f"{offsets[idnum]:010d} 00000 n\r\n".encode())
+                start = end + 1
+            new_trailer = generic.DictionaryObject({
+                generic.NameObject("/Size"): generic.NumberObject(next_id),
+                generic.NameObject("/Root"): root_ref,
+                generic.NameObject("/Info"): generic.IndirectObject(info_id, 0, None),
+                generic.NameObject("/Prev"): generic.NumberObject(prev),
+            })
+            if file_id is not None:
+                new_trailer[generic.NameObject("/ID")] = file_id
+            out.write(b"trailer\n")
+            new_trailer.write_to_stream(out)
+            out.write(f"\nstartxref\n{xref}\n%%EOF\n".encode())
+        except BaseException:
+            # A failed update is cut off again, so `filename` is left as it was
+            out.truncate(size)
+            raise
+
+class StreamingReportWriter:
+    """Writes the news report page by page from an iterator of Story records
+
+    Only the flowables of the current story are alive at any time: each is laid
+    out into the current page frame and dropped. reportlab keeps finished pages
+    in memory until its canvas is saved, so every `chunk_pages` pages the canvas
+    is saved to a part file and a new one started. close() appends the parts
+    to `filename` as one incremental PDF update, copying one part at a time, so
+    memory does not grow with the batch. With append=True, new stories are
+    added the same way after the existing pages of `filename` and numbering
+    continues (requires pypdf).
+    """
+
+    def __init__(self, filename, title="Bloomberg Latest News Report", append=False, chunk_pages=CHUNK_PAGES):
+        self.filename = filename
+        self.title = title
+        self.styles = report_styles()
+        self.appending = append and os.path.exists(filename)
+        self.chunk_pages = chunk_pages
+
+        self.offset = _story_count(filename) if self.appending else 0
+        self.count = 0
+        self.parts = []
+        self._new_canvas()
+        self._frame = None
+        self._new_frame()
+        self._write_header()
+
+    def _new_canvas(self):
+        part = f"{self.filename}.part{len(self.parts):04d}"
+        self.parts.append(part)
+        self._canvas = canvas.Canvas(part, pagesize=letter, pageCompression=1)
+        self._canvas.setTitle(self.title)
+        self._chunk_page_count = 0
+
+    def _new_frame(self):
+        width, height = letter
+        self._frame = Frame(MARGIN, MARGIN, width - 2 * MARGIN, height - 2 * MARGIN)
+        self._frame_empty = True
+
+    def _draw(self, flowables):
+        pending = list(flowables)
+        while pending:
+            before = len(pending)
+            self._frame.addFromList(pending, self._canvas)
+            if len(pending) < before:
+                self._frame_empty = False
+            if not pending:
+                break
+            if len(pending) == before and self._frame_empty:
+                # Taller than a whole page: continue it across pages instead of emitting blank ones
+                parts = self._frame.split(pending[0], self._canvas)
+                if not parts:
+                    raise ValueError("Report item is taller than a page and cannot be split")
+                pending[0:1] = parts
+                continue
+            self._canvas.showPage()
+            self._chunk_page_count += 1
+            if self._chunk_page_count >= self.chunk_pages:
+                # More of `pending` follows, so the next canvas never starts out empty
+                self._flush()
+                self._new_canvas()
+            self._new_frame()
+
+    def _write_header(self):
+        generated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        if self.appending:
+            self._draw([Paragraph(f"Update: {generated}", self.styles["update"])])
+        else:
+            self._draw([
+                Paragraph(escape(self.title), self.styles["title"]),
+                Paragraph(f"Generated on: {generated}", self.styles["normal"]),
+                Spacer(1, 0.2 * inch)
+            ])
+
+    def write(self, story):
+        """Lay out one Story (article number, title, time)"""
+        self.count += 1
+        number = self.offset + self.count
+        self._draw([
+            Paragraph(f"{number}. {escape(story.title)}", self.styles["article_title"]),
+            Paragraph(f"Published: {escape(story.time or 'unknown')}", self.styles["time"]),
+            Spacer(1, 0.1 * inch)
+        ])
+
+    def write_all(self, stories):
+        for story in stories:
+            self.write(story)
+        return self.count
+
+    def _flush(self):
+        """Save the current canvas, releasing the pages it holds"""
+        self._canvas.setSubject(f"stories={self.offset + self.count}")
+        self._canvas.save()
+        self._canvas = None
+
+    def close(self):
+        """Finish the PDF: save the last part and append the parts to `filename`"""
+        total = self.offset + self.count
+        info = {"/Title": self.title, "/Subject": f"stories={total}"}
+        try:
+            self._flush()
+            if self.appending:
+                _append_parts(self.filename, self.parts, info)
+            else:
+                # The report is completed in the first part (more than one part requires pypdf),
+                # so `filename` is only ever replaced by a whole report
+                if len(self.parts) > 1:
+                    _append_parts(self.parts[0], self.parts[1:], info)
+                os.replace(self.parts[0], self.filename)
+        finally:
+            self._remove_parts()
+        return total
+
+    def discard(self):
+        """Drop the stories written so far; `filename` is left as it was"""
+        self._canvas = None
+        self._remove_parts()
+
+    def _remove_parts(self):
+        for part in self.parts:
+            if os.path.exists(part):
+                os.remove(part)
+        self.parts = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # A run that fails half way must not replace (or append half a batch to) the report
+        if exc_type is not None:
+            self.discard()
+        else:
+            self.close()
+
+def write_pdf_report(stories, filename="bloomberg_latest_news.pdf", append=False):
+    """Stream `stories` into `filename`; returns the number of stories written in this call"""
+    with StreamingReportWriter(filename, append=append) as writer:
+        return writer.write_all(stories)
@@ -0,0 +1,241 @@
+import asyncio
+import re
+import time
+from collections import namedtuple
+from urllib.parse import urljoin
+from html_parsing import ParseTarget, make_soup
+from har_archive import har_transport
+from rate_limit import throttle, default_limiter
+from telemetry import traced_run, phase
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401
+    HAVE_HTTP2 = True
+except ImportError:
+    HAVE_HTTP2 = False
+
+# Quote blocks, the pager and the author bio are all a crawl needs from a page
+PAGE_TARGET = ParseTarget(["div", "li"], ["quote", "next", "author-details"])
+
+Quote = namedtuple("Quote", ["text", "author", "author_url", "tags", "page_url"])
+Author = namedtuple("Author", ["name", "born_date", "born_location", "description", "url"])
+
+# Version of parse_page's output in the HTTP cache; bump it when parse_page changes what it returns
+PAGE_PARSE_KEY = "quotes_crawler.parse_page:v1"
+
+def _page_order(url):
+    # "/page/2/" before "/page/10/", and the main listing before /tag/ pages
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", url)]
+
+def _text(node, css):
+    found = node.select_one(css)
+    return " ".join(found.get_text().split()) if found else None
+
+def parse_page(html, url):
+    """Parse a listing or author page into (quotes, authors, next_url, author_urls, tag_urls)"""
+    soup = make_soup(html, PAGE_TARGET)
+    quotes, author_urls, tag_urls = [], [], []
+    for block in soup.select("div.quote"):
+        author_link = block.select_one('a[href*="/author/"]')
+        author_url = urljoin(url, author_link["href"]) if author_link else None
+        tag_links = block.select("a.tag")
+        quotes.append(Quote(
+            text=_text(block, "span.text"),
+            author=_text(block, "small.author"),
+            author_url=author_url,
+            tags=tuple(link.get_text(strip=True) for link in tag_links),
+            page_url=url
+        ))
+        if author_url:
+            author_urls.append(author_url)
+        tag_urls.extend(urljoin(url, link["href"]) for link in tag_links)
+
+    authors = []
+    details = soup.select_one("div.author-details")
+    if details:
+        born_location = _text(details, "span.author-born-location")
+        authors.append(Author(
+            name=_text(details, "h3.author-title"),
+            born_date=_text(details, "span.author-born-date"),
+            born_location=born_location[3:] if born_location and born_location.startswith("in ") else born_location,
+            description=_text(details, "div.author-description"),
+            url=url
+        ))
+
+    next_link = soup.select_one("li.next a")
+    next_url = urljoin(url, next_link["href"]) if next_link else None
+    return quotes, authors, next_url, author_urls, tag_urls
+
+def page_from_json(parsed):
+    """parse_page's result as the HTTP cache returns it (JSON lists), with the Quote/Author records rebuilt"""
+    quotes, authors, next_url, author_urls, tag_urls = parsed
+    quotes = [Quote(text, author, author_url, tuple(tags), page_url)
+              for text, author, author_url, tags, page_url in quotes]
+    authors = [Author(*author) for author in authors]
+    return quotes, authors, next_url, author_urls, tag_urls
+
+class QuotesCrawler:
+    """Concurrent crawler for quotes.toscrape-style sites
+
+    Starts at `base_url`, follows "Next" links and (optionally) every author and
+    tag page it finds, with at most `concurrency` requests in flight over one
+    keep-alive httpx client (HTTP/2 when the h2 package is installed).
+    Connection errors, 429 and 5xx answers are retried `retries` times with
+    exponential backoff; a page that still fails (or fails to parse) is
+    counted in `errors` and the crawl carries on.
+    """
+
+    def __init__(self, base_url="http://quotes.toscrape.com", concurrency=8, follow_authors=True,
+                 follow_tags=True, max_pages=None, http2=True, timeout=30.0, cache=None, retries=2,
+                 retry_delay=0.5, transport=None):
+        if httpx is None:
+            raise RuntimeError("The async crawler requires httpx; pip install httpx (and h2 for HTTP/2)")
+        self.base_url = base_url.rstrip("/") + "/"
+        self.concurrency = concurrency
+        self.follow_authors = follow_authors
+        self.follow_tags = follow_tags
+        self.max_pages = max_pages
+        self.http2 = http2 and HAVE_HTTP2
+        self.timeout = timeout
+        # Optional http_cache.HttpCache: unchanged pages come back already parsed
+        self.cache = cache
+        self.retries = retries
+        self.retry_delay = retry_delay
+        # httpx transport to use instead of the network (tests pass an httpx.MockTransport)
+        self.transport = transport
+
+        self.quotes = []
+        self.authors = []
+        self.seen_urls = set()
+        self._pages = []
+        self.pages = 0
+        self.errors = 0
+        self.retried = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+
+    def _enqueue(self, queue, url):
+        if url and url not in self.seen_urls:
+            if self.max_pages is not None and len(self.seen_urls) >= self.max_pages:
+                return
+            self.seen_urls.add(url)
+            queue.put_nowait(url)
+
+    def _finish(self):
+        """Order results by page URL rather than by arrival, so every run (live or replayed) prints the same"""
+        self._pages.sort(key=lambda page: _page_order(page[0]))
+        seen = set()
+        self.quotes = []
+        self.authors = []
+        for _, quotes, authors in self._pages:
+            for quote in quotes:
+                # Tag pages repeat quotes already seen on the main listing
+                key = (quote.text, quote.author)
+                if key not in seen:
+                    seen.add(key)
+                    self.quotes.append(quote)
+            self.authors.extend(authors)
+
+    async def _get(self, client, url):
+        if self.cache is not None:
+            return await self.cache.aget(client, url, parse=lambda text: parse_page(text, url),
+                                         parse_key=PAGE_PARSE_KEY)
+        await throttle(url)
+        return await client.get(url)
+
+    async def fetch(self, client, url):
+        """GET `url`, retrying connection errors, 429 and 5xx answers"""
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                response = await self._get(client, url)
+            except httpx.TransportError:
+                if last:
+                    raise
+            else:
+                if response.status_code in (429, 503):
+                    # The server is shedding load: slow every request to this host down
+                    default_limiter().penalize(url)
+                if last or (response.status_code < 500 and response.status_code != 429):
+                    return response
+            self.retried += 1
+            await asyncio.sleep(self.retry_delay * 2 ** attempt)
+
+    async def _worker(self, client, queue):
+        while True:
+            url = await queue.get()
+            try:
+                with phase("fetch") as span:
+                    response = await self.fetch(client, url)
+                    span.bytes = len(response.text)
+                if response.status_code != 200:
+                    print(f"Failed to retrieve {url}. Status code: {response.status_code}")
+                    self.errors += 1
+                    continue
+                if self.cache is not None:
+                    if response.source == "network":
+                        self.bytes += len(response.text)
+                    quotes, authors, next_url, author_urls, tag_urls = page_from_json(response.parsed)
+                else:
+                    self.bytes += len(response.content)
+                    with phase("parse") as span:
+                        quotes, authors, next_url, author_urls, tag_urls = parse_page(response.text, url)
+                        span.items = len(quotes)
+                # Counted once parsed: a page whose parse raises is an error, not a page
+                self.pages += 1
+                self._pages.append((url, quotes, authors))
+                self._enqueue(queue, next_url)
+                if self.follow_authors:
+                    for author_url in author_urls:
+                        self._enqueue(queue, author_url)
+                if self.follow_tags:
+                    for tag_url in tag_urls:
+                        self._enqueue(queue, tag_url)
+            except Exception as e:
+                # Anything from one page (transport, robots.txt refusal, parsing) must not stop the
+                # worker, or crawl() would wait on queue.join() forever
+                print(f"Failed to retrieve {url}: {e!r}")
+                self.errors += 1
+            finally:
+                queue.task_done()
+
+    async def crawl(self):
+        """Crawl until no unseen pages are left; returns the unique Quote records"""
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        queue = asyncio.Queue()
+        start = time.perf_counter()
+        # SCRAPER_HAR_MODE=record/replay swaps in a transport that saves or serves a HAR archive
+        transport = self.transport
+        if transport is None:
+            transport_class = har_transport()
+            transport = transport_class(http2=self.http2, limits=limits) if transport_class else None
+        async with httpx.AsyncClient(http2=self.http2, limits=limits, timeout=self.timeout,
+                                     follow_redirects=True, transport=transport) as client:
+            self._enqueue(queue, self.base_url)
+            workers = [asyncio.create_task(self._worker(client, queue)) for _ in range(self.concurrency)]
+            await queue.join()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        self._finish()
+        self.elapsed = time.perf_counter() - start
+        return self.quotes
+
+    def summary(self):
+        rate = self.pages / self.elapsed if self.elapsed else 0.0
+        retried = f", {self.retried} retries" if self.retried else ""
+        return (f"{self.pages} pages ({self.bytes / 1024:.0f} KiB, {self.errors} errors{retried}) in {self.elapsed:.2f}s "
+                f"= {rate:.1f} pages/s; {len(self.quotes)} quotes, {len(self.authors)} authors"
+                f"{' (HTTP/2 enabled)' if self.http2 else ''}")
+
+@traced_run("quotes_crawl", "quotes.toscrape.com")
+async def crawl_quotes(base_url="http://quotes.toscrape.com", concurrency=8, **options):
+    crawler = QuotesCrawler(base_url, concurrency=concurrency, **options)
+    await crawler.crawl()
+    print(crawler.summary())
+    return crawler
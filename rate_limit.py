@@ -0,0 +1,349 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+from har_archive import HAR_MODE_ENV
+from urls import site_of
+
+# Requests per second and burst size for hosts without their own limit
+DEFAULT_RATE = 4.0
+DEFAULT_BURST = 8
+
+# Per-domain (rate, burst); subdomains match too, None means unlimited (the local stand-in sites)
+SITE_LIMITS = {
+    "bloomberg.com": (0.5, 2),
+    "hktvmall.com": (2.0, 4),
+    "finance.yahoo.com": (1.0, 3),
+    "youtube.com": (1.0, 2),
+    "127.0.0.1": None,
+    "localhost": None,
+}
+
+# SCRAPER_RATE_LIMITS="bloomberg.com=0.2/1,hktvmall.com=5/10" overrides SITE_LIMITS
+RATE_LIMITS_ENV = "SCRAPER_RATE_LIMITS"
+# SCRAPER_ROBOTS=strict refuses URLs robots.txt disallows (default: warn), =off skips robots.txt
+ROBOTS_ENV = "SCRAPER_ROBOTS"
+
+ROBOTS_TTL = 6 * 3600
+# Robots rules are read for this user agent group
+ROBOTS_AGENT = "*"
+
+class RobotsDisallowed(PermissionError):
+    pass
+
+def parse_limits(value):
+    """"host=rate/burst,..." -> {host: (rate, burst)}; a rate of 0 means unlimited"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in (value or "").split(","))):
+        host, _, spec = item.partition("=")
+        rate, _, burst = spec.partition("/")
+        rate = float(rate)
+        limits[host.strip()] = (rate, int(burst or max(1, round(rate)))) if rate > 0 else None
+    return limits
+
+class TokenBucket:
+    """`rate` requests per second on average, up to `burst` back to back
+
+    reserve() takes a token and returns how long to wait before using it, so
+    the same bucket serves coroutines (asyncio.sleep) and threads
+    (time.sleep); callers queue up behind each other's reservations.
+
+    penalize() halves the rate and empties the bucket for `cooldown`
+    seconds; the rate then doubles back every `cooldown` seconds without a
+    new penalty until it is back to normal.
+    """
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+        self.penalties = 0
+        self.recover_at = None
+        self.cooldown = 0.0
+        self._lock = threading.Lock()
+
+    def configure(self, rate, burst):
+        with self._lock:
+            self._refill(self.clock())
+            self.base_rate = rate
+            self.rate = min(self.rate, rate) if self.recover_at else rate
+            self.burst = burst
+            self.tokens = min(self.tokens, burst)
+
+    def _refill(self, now):
+        if self.recover_at is not None and now >= self.recover_at:
+            self.rate = min(self.base_rate, self.rate * 2)
+            self.recover_at = now + self.cooldown if self.rate < self.base_rate else None
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take a token; seconds to wait before it may be used"""
+        with self._lock:
+            self._refill(self.clock())
+            self.tokens -= 1
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def penalize(self, cooldown=60.0, min_rate=0.05):
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self.penalties += 1
+            self.rate = max(min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0) - cooldown * self.rate
+            self.cooldown = cooldown
+            self.recover_at = now + cooldown
+
+class RobotsCache:
+    """robots.txt per host, fetched once and kept for `ttl` seconds
+
+    A missing robots.txt (404) or one that cannot be fetched allows
+    everything; 401/403 disallow everything, as urllib.robotparser does.
+    """
+
+    def __init__(self, ttl=ROBOTS_TTL, agent=ROBOTS_AGENT, timeout=10, clock=time.time):
+        self.ttl = ttl
+        self.agent = agent
+        self.timeout = timeout
+        self.clock = clock
+        self.entries = {}
+        self.fetches = 0
+        self._lock = threading.Lock()
+        self._host_locks = {}
+        self._pending = {}
+
+    @staticmethod
+    def robots_url(url):
+        parts = urlparse(url)
+        return f"{parts.scheme or 'https'}://{parts.netloc}/robots.txt"
+
+    def _fetch(self, robots_url):
+        parser = RobotFileParser(robots_url)
+        self.fetches += 1
+        try:
+            request = urllib.request.Request(robots_url, headers={"User-Agent": "Mozilla/5.0"})
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                parser.parse(response.read().decode("utf-8", errors="replace").splitlines())
+        except urllib.error.HTTPError as e:
+            if e.code in (401, 403):
+                parser.disallow_all = True
+            else:
+                parser.allow_all = True
+        except (OSError, ValueError) as e:
+            print(f"[rate_limit] Could not fetch {robots_url} ({e!r}); allowing everything")
+            parser.allow_all = True
+        # can_fetch() and crawl_delay() treat a parser never marked as read as empty
+        parser.modified()
+        parser.fetched = self.clock()
+        return parser
+
+    def _cached(self, robots_url):
+        entry = self.entries.get(robots_url)
+        if entry is not None and self.clock() - entry.fetched < self.ttl:
+            return entry
+        return None
+
+    def get_sync(self, url):
+        """Same as get() for threads; only callers for the same host wait on its fetch"""
+        robots_url = self.robots_url(url)
+        entry = self._cached(robots_url)
+        if entry is not None:
+            return entry
+        with self._lock:
+            host_lock = self._host_locks.setdefault(robots_url, threading.Lock())
+        with host_lock:
+            # Another thread may have fetched it while this one waited
+            entry = self._cached(robots_url)
+            if entry is None:
+                entry = self.entries[robots_url] = self._fetch(robots_url)
+        return entry
+
+    async def get(self, url):
+        """The RobotFileParser for `url`'s host; concurrent callers share one fetch"""
+        robots_url = self.robots_url(url)
+        entry = self._cached(robots_url)
+        if entry is not None:
+            return entry
+        pending = self._pending.get(robots_url)
+        if pending is None or pending.get_loop() is not asyncio.get_running_loop():
+            pending = self._pending[robots_url] = asyncio.ensure_future(asyncio.to_thread(self._fetch, robots_url))
+        try:
+            entry = await pending
+        finally:
+            self._pending.pop(robots_url, None)
+        self.entries[robots_url] = entry
+        return entry
+
+    def delay(self, entry):
+        """Minimum seconds between requests asked for by robots.txt (Crawl-delay or Request-rate), or None"""
+        delays = []
+        crawl_delay = entry.crawl_delay(self.agent)
+        if crawl_delay:
+            delays.append(float(crawl_delay))
+        request_rate = entry.request_rate(self.agent)
+        if request_rate and request_rate.requests:
+            delays.append(request_rate.seconds / request_rate.requests)
+        return max(delays) if delays else None
+
+class RateLimiter:
+    """Shared per-host request budget for every scraper in the process
+
+    Each host gets a TokenBucket sized from SITE_LIMITS (or the defaults),
+    slowed further to the Crawl-delay / Request-rate of its robots.txt.
+    Call `await limiter.acquire(url)` (or acquire_sync from threads) before
+    each navigation or HTTP request, and penalize(url) when the site answers
+    with a bot check or 429 so the whole process backs off that host.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, limits=None, robots=None, robots_mode="warn",
+                 clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.limits = dict(SITE_LIMITS if limits is None else limits)
+        self.robots = robots
+        self.robots_mode = robots_mode
+        self.clock = clock
+        self.buckets = {}
+        self.waits = {}
+        self.requests = {}
+        self._robots_seen = {}
+        self._warned = set()
+        self._lock = threading.Lock()
+
+    def limit_for(self, host):
+        """(rate, burst) configured for `host`, or None when it is unlimited"""
+        for domain, limit in sorted(self.limits.items(), key=lambda item: -len(item[0])):
+            if host == domain or host.endswith("." + domain):
+                return limit
+        return self.rate, self.burst
+
+    def _bucket(self, host, robots_entry):
+        with self._lock:
+            limit = self.limit_for(host)
+            if limit is None:
+                return None
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(*limit, clock=self.clock)
+            if robots_entry is not None and self._robots_seen.get(host) is not robots_entry:
+                # New or refreshed robots.txt: honour its delay on top of our own limit
+                self._robots_seen[host] = robots_entry
+                delay = self.robots.delay(robots_entry)
+                rate, burst = limit
+                if delay:
+                    rate, burst = min(rate, 1.0 / delay), 1
+                bucket.configure(rate, burst)
+            return bucket
+
+    def _check_robots(self, url, entry):
+        if entry is None or entry.can_fetch(self.robots.agent, url):
+            return
+        if self.robots_mode == "strict":
+            raise RobotsDisallowed(f"robots.txt disallows {url}")
+        if url not in self._warned:
+            self._warned.add(url)
+            print(f"[rate_limit] robots.txt disallows {url} (set {ROBOTS_ENV}=strict to skip such URLs)")
+
+    def _reserve(self, host, bucket):
+        delay = bucket.reserve()
+        with self._lock:
+            self.requests[host] = self.requests.get(host, 0) + 1
+            self.waits[host] = self.waits.get(host, 0.0) + delay
+        return delay
+
+    async def acquire(self, url):
+        """Wait until a request to `url` fits its host's budget"""
+        host = site_of(url)
+        entry = await self.robots.get(url) if self.robots is not None and self.limit_for(host) else None
+        self._check_robots(url, entry)
+        bucket = self._bucket(host, entry)
+        if bucket is not None:
+            delay = self._reserve(host, bucket)
+            if delay:
+                await asyncio.sleep(delay)
+
+    def acquire_sync(self, url):
+        """Same as acquire() for threads and synchronous scripts"""
+        host = site_of(url)
+        entry = self.robots.get_sync(url) if self.robots is not None and self.limit_for(host) else None
+        self._check_robots(url, entry)
+        bucket = self._bucket(host, entry)
+        if bucket is not None:
+            delay = self._reserve(host, bucket)
+            if delay:
+                time.sleep(delay)
+
+    def penalize(self, url, cooldown=60.0):
+        """The host showed a bot check (or 429): halve its rate and pause it for `cooldown` seconds"""
+        host = site_of(url)
+        bucket = self._bucket(host, None)
+        if bucket is not None:
+            bucket.penalize(cooldown)
+            print(f"[rate_limit] Backing off {host}: {bucket.rate:.2f} req/s, paused {cooldown:g}s")
+
+    def summary(self):
+        if not self.requests:
+            return "Rate limiter: no requests"
+        parts = []
+        for host, count in sorted(self.requests.items()):
+            bucket = self.buckets[host]
+            penalties = f", {bucket.penalties} penalties" if bucket.penalties else ""
+            parts.append(f"{host} {count} req, waited {self.waits[host]:.1f}s at {bucket.rate:.2f} req/s{penalties}")
+        return "Rate limiter: " + "; ".join(parts)
+
+_default_limiter = None
+
+def default_limiter():
+    """Process-wide RateLimiter configured from the environment, shared by every scraper"""
+    global _default_limiter
+    if _default_limiter is None:
+        limits = dict(SITE_LIMITS, **parse_limits(os.environ.get(RATE_LIMITS_ENV)))
+        robots_mode = os.environ.get(ROBOTS_ENV, "warn")
+        robots = RobotsCache() if robots_mode != "off" else None
+        _default_limiter = RateLimiter(limits=limits, robots=robots, robots_mode=robots_mode)
+    return _default_limiter
+
+def _replaying():
+    # A HAR replay never reaches the network, so there is nothing to be polite to
+    return os.environ.get(HAR_MODE_ENV) == "replay"
+
+async def throttle(url, limiter=None):
+    """`await throttle(url)` before page.goto / client.get -- waits until the host's budget allows it
+
+    Time spent waiting shows up in RateLimiter.summary() rather than as a
+    telemetry phase, since callers may already be inside a "fetch" span.
+    """
+    if _replaying():
+        return
+    await (limiter or default_limiter()).acquire(url)
+
+def throttle_sync(url, limiter=None):
+    """Same as throttle() for threads and synchronous scripts"""
+    if _replaying():
+        return
+    (limiter or default_limiter()).acquire_sync(url)
+
+def is_bot_check(title):
+    """Whether a page title is a bot-detection / captcha page"""
+    title = (title or "").lower()
+    return "robot" in title or "captcha" in title
+
+if __name__ == "__main__":
+    # python rate_limit.py URL ...  -> the limit, robots.txt delay and permission that apply to each URL
+    limiter = default_limiter()
+    for url in sys.argv[1:]:
+        host = site_of(url)
+        limit = limiter.limit_for(host)
+        entry = limiter.robots.get_sync(url) if limiter.robots is not None else None
+        delay = limiter.robots.delay(entry) if entry is not None else None
+        allowed = entry.can_fetch(limiter.robots.agent, url) if entry is not None else True
+        print(f"{url}: limit {'unlimited' if limit is None else f'{limit[0]} req/s, burst {limit[1]}'}, "
+              f"robots.txt delay {delay if delay else 'none'}, {'allowed' if allowed else 'DISALLOWED'}")
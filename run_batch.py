@@ -0,0 +1,58 @@
+import asyncio
+import time
+from fake_useragent import UserAgent
+from browser_pool import BrowserPool, STEALTH_ARGS, STEALTH_INIT_SCRIPT
+from Berkeley_PhD import scrape_Berkeley
+from Bloomberg_Originals import scrape_Bloomberg_Originals
+import Bloomberg_Latest
+import Bloomberg_Latest_News_pdf_exporter
+import Bloomber_Latest_News_Scraper_pdf_export_wizard_with_multiple_loadmore as Bloomberg_Load_More
+from Plaaywright_hktvmall import scrape_hktvmall
+from Crypto_yf import scrape_yf
+from rate_limit import default_limiter
+
+# Every Playwright scraper that can run against the shared pool
+SCRAPERS = {
+    "berkeley": scrape_Berkeley,
+    "bloomberg_originals": scrape_Bloomberg_Originals,
+    "bloomberg_latest": Bloomberg_Latest.scrape_Bloomberg_Latest,
+    "bloomberg_pdf": Bloomberg_Latest_News_pdf_exporter.scrape_Bloomberg_Latest,
+    "bloomberg_load_more_pdf": Bloomberg_Load_More.scrape_Bloomberg_Latest,
+    "hktvmall": scrape_hktvmall,
+    "crypto_yf": scrape_yf,
+}
+
+def create_pool(size=4, headless=True):
+    """Build the pool used by batch runs: one Chromium with the Bloomberg stealth settings"""
+    return BrowserPool(
+        size=size,
+        headless=headless,
+        launch_args=STEALTH_ARGS,
+        context_options={
+            'viewport': {'width': 1920, 'height': 1080},
+            'user_agent': UserAgent().chrome
+        },
+        init_script=STEALTH_INIT_SCRIPT
+    )
+
+async def run_one(name, scraper, pool):
+    start = time.perf_counter()
+    try:
+        await scraper(pool)
+    except Exception as e:
+        print(f"[{name}] failed: {e}")
+    elapsed = time.perf_counter() - start
+    print(f"[{name}] finished in {elapsed:.2f}s")
+    return name, elapsed
+
+async def run_batch(names=None, pool_size=4, headless=True):
+    """Run the selected scrapers as coroutines against one shared browser pool"""
+    names = names or list(SCRAPERS)
+    async with create_pool(size=pool_size, headless=headless) as pool:
+        results = await asyncio.gather(*(run_one(name, SCRAPERS[name], pool) for name in names))
+        print(f"Pool used {pool.contexts_created} contexts for {pool.checkouts} checkouts")
+    print(default_limiter().summary())
+    return dict(results)
+
+if __name__ == "__main__":
+    asyncio.run(run_batch())
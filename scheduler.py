@@ -0,0 +1,317 @@
+import argparse
+import asyncio
+import os
+import random
+import signal
+import time
+from collections import deque
+from rate_limit import default_limiter
+from telemetry import TELEMETRY_DIR
+
+# Seconds between runs of each registered scraper (the daemon's defaults)
+DEFAULT_INTERVALS = {
+    "bloomberg_latest": 15 * 60,
+    "bloomberg_originals": 6 * 3600,
+    "crypto_yf": 5 * 60,
+    "hktvmall": 3600,
+    "berkeley": 24 * 3600,
+    "quotes": 3600,
+}
+
+# Longest a single run may take before it is cancelled and counted as a failure
+DEFAULT_TIMEOUT = 30 * 60
+
+METRICS_FILE = "scheduler.prom"
+
+class MonotonicClock:
+    """Real time for the scheduler: now() in seconds, and an interruptible wait"""
+
+    def now(self):
+        return time.monotonic()
+
+    async def wait(self, event, timeout):
+        """Sleep for `timeout` seconds or until `event` is set"""
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+class FakeClock:
+    """Virtual time for tests: advance() moves it, and wait() jumps straight to its deadline
+
+    Jobs run for no virtual time unless they call advance() themselves.
+    """
+
+    def __init__(self, start=0.0):
+        self.time = start
+
+    def now(self):
+        return self.time
+
+    def advance(self, seconds):
+        self.time += seconds
+
+    async def wait(self, event, timeout):
+        # Let finished jobs and other tasks run first (a job under wait_for needs a few
+        # loop turns to complete); if nothing woke us, time passes
+        for _ in range(10):
+            await asyncio.sleep(0)
+            if event.is_set():
+                return
+        self.time += timeout
+
+class Job:
+    """A scraper coroutine function (called with the shared pool) and its schedule"""
+
+    def __init__(self, name, func, interval, jitter=0.1, timeout=DEFAULT_TIMEOUT):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        # Fraction of the interval each run may move earlier or later, so jobs drift apart
+        self.jitter = jitter
+        # A hung run would hold its slot (and block its own next run) forever; None means no limit
+        self.timeout = timeout
+
+        self.next_run = None
+        self.due = None
+        self.queued = False
+        self.running = False
+
+        self.runs = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.last_duration = None
+        self.last_status = None
+
+class Scheduler:
+    """Runs registered jobs at their own intervals against one warm browser pool
+
+    Due jobs wait in a FIFO queue for one of `concurrency` slots; a job that
+    is still queued or running is never queued again, so runs of the same job
+    cannot overlap (occurrences missed meanwhile are skipped, not bunched up).
+    Lag is the time between a job falling due and it starting.
+    """
+
+    def __init__(self, pool=None, concurrency=3, clock=None, rng=None):
+        self.pool = pool
+        self.concurrency = concurrency
+        self.clock = clock or MonotonicClock()
+        self.rng = rng or random.Random()
+        self.jobs = {}
+        self.queue = deque()
+        self.running = {}
+        self._wake = asyncio.Event()
+
+    def add(self, name, func, interval, jitter=0.1, first_run=None, timeout=DEFAULT_TIMEOUT):
+        """Register a job; its first run is `first_run` seconds from now (default: spread over the jitter)"""
+        job = Job(name, func, interval, jitter, timeout)
+        if first_run is None:
+            first_run = self.rng.uniform(0, jitter * interval)
+        job.next_run = self.clock.now() + first_run
+        self.jobs[name] = job
+        return job
+
+    def _next_after(self, job):
+        now = self.clock.now()
+        next_run = job.due + job.interval
+        if next_run <= now:
+            # The run overran one or more intervals: skip those occurrences
+            missed = int((now - job.due) // job.interval)
+            job.skipped += missed
+            next_run = job.due + (missed + 1) * job.interval
+        next_run += self.rng.uniform(-job.jitter, job.jitter) * job.interval
+        return max(next_run, now)
+
+    def _enqueue_due(self):
+        now = self.clock.now()
+        for job in sorted(self.jobs.values(), key=lambda job: job.next_run):
+            if job.next_run <= now and not job.queued and not job.running:
+                job.queued = True
+                job.due = job.next_run
+                self.queue.append(job)
+
+    def _start_ready(self):
+        while self.queue and len(self.running) < self.concurrency:
+            job = self.queue.popleft()
+            job.queued = False
+            job.running = True
+            job.last_lag = self.clock.now() - job.due
+            job.max_lag = max(job.max_lag, job.last_lag)
+            self.running[job.name] = asyncio.create_task(self._run(job))
+
+    async def _run(self, job):
+        start = self.clock.now()
+        try:
+            # Real seconds, not clock time: the limit is for runs stuck on the network or the browser
+            await asyncio.wait_for(job.func(self.pool), job.timeout)
+            job.last_status = "ok"
+        except asyncio.TimeoutError:
+            job.failures += 1
+            job.timeouts += 1
+            job.last_status = "timeout"
+            print(f"[scheduler] {job.name} timed out after {job.timeout:.0f}s")
+        except Exception as e:
+            job.failures += 1
+            job.last_status = "error"
+            print(f"[scheduler] {job.name} failed: {e!r}")
+        finally:
+            job.runs += 1
+            job.last_duration = self.clock.now() - start
+            job.running = False
+            job.next_run = self._next_after(job)
+            self.running.pop(job.name, None)
+            # A slot is free: let the loop start the next queued job right away
+            self._wake.set()
+
+    async def tick(self):
+        """Queue every job that is due and start as many as there are free slots"""
+        self._enqueue_due()
+        self._start_ready()
+
+    def next_wakeup(self):
+        """Seconds until the next job falls due (None when every job is queued or running)"""
+        waiting = [job.next_run for job in self.jobs.values() if not job.queued and not job.running]
+        if not waiting:
+            return None
+        return max(0.0, min(waiting) - self.clock.now())
+
+    def status(self):
+        now = self.clock.now()
+        return {
+            "queue_depth": len(self.queue),
+            "running": len(self.running),
+            # Lag of jobs still waiting for a slot keeps growing until they start
+            "max_queued_lag": max((now - job.due for job in self.queue), default=0.0),
+            "jobs": {
+                name: {
+                    "runs": job.runs,
+                    "failures": job.failures,
+                    "timeouts": job.timeouts,
+                    "skipped": job.skipped,
+                    "last_lag": job.last_lag,
+                    "max_lag": job.max_lag,
+                    "last_duration": job.last_duration,
+                    "next_run_in": job.next_run - now if not (job.queued or job.running) else 0.0,
+                    "state": "running" if job.running else "queued" if job.queued else "waiting",
+                }
+                for name, job in self.jobs.items()
+            },
+        }
+
+    def summary(self):
+        s = self.status()
+        states = ", ".join(f"{name}={job['state']}" for name, job in s["jobs"].items())
+        return (f"[scheduler] queue depth {s['queue_depth']}, running {s['running']}/{self.concurrency}, "
+                f"max queued lag {s['max_queued_lag']:.1f}s; {states}")
+
+    def write_metrics(self, directory=TELEMETRY_DIR):
+        """Queue depth, lag and run counts as a Prometheus textfile next to the scraper metrics"""
+        if not directory:
+            return
+        s = self.status()
+        lines = [
+            "# HELP scheduler_queue_depth Due jobs waiting for a free slot.",
+            "# TYPE scheduler_queue_depth gauge",
+            f"scheduler_queue_depth {s['queue_depth']}",
+            "# HELP scheduler_running_jobs Jobs currently running.",
+            "# TYPE scheduler_running_jobs gauge",
+            f"scheduler_running_jobs {s['running']}",
+            "# HELP scheduler_job_lag_seconds Delay between a job falling due and its last start.",
+            "# TYPE scheduler_job_lag_seconds gauge",
+        ]
+        lines += [f'scheduler_job_lag_seconds{{job="{name}"}} {job["last_lag"]:.3f}' for name, job in s["jobs"].items()]
+        lines += [
+            "# HELP scheduler_job_runs_total Finished runs per job.",
+            "# TYPE scheduler_job_runs_total counter",
+        ]
+        for name, job in s["jobs"].items():
+            lines.append(f'scheduler_job_runs_total{{job="{name}",status="ok"}} {job["runs"] - job["failures"]}')
+            lines.append(f'scheduler_job_runs_total{{job="{name}",status="error"}} {job["failures"]}')
+        lines += [
+            "# HELP scheduler_job_skipped_total Occurrences skipped because the previous run overran.",
+            "# TYPE scheduler_job_skipped_total counter",
+        ]
+        lines += [f'scheduler_job_skipped_total{{job="{name}"}} {job["skipped"]}' for name, job in s["jobs"].items()]
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, METRICS_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(path + ".tmp", path)
+
+    async def run_forever(self, stop=None, status_every=60.0):
+        """Schedule until `stop` (an asyncio.Event) is set, then wait for the running jobs"""
+        stop = stop or asyncio.Event()
+        last_status = None
+
+        async def watch_stop():
+            # A stop request ends the current wait early
+            await stop.wait()
+            self._wake.set()
+
+        watcher = asyncio.ensure_future(watch_stop())
+        while not stop.is_set():
+            await self.tick()
+            now = self.clock.now()
+            if last_status is None or now - last_status >= status_every:
+                print(self.summary())
+                print(default_limiter().summary())
+                self.write_metrics()
+                last_status = now
+            delay = self.next_wakeup()
+            delay = status_every if delay is None else min(delay, status_every)
+            self._wake.clear()
+            await self.clock.wait(self._wake, delay)
+        watcher.cancel()
+        if self.running:
+            print(f"[scheduler] stopping; waiting for {', '.join(self.running)}")
+            await asyncio.gather(*self.running.values(), return_exceptions=True)
+        self.write_metrics()
+
+def register_defaults(scheduler, names=None, interval_scale=1.0, quotes_url=None, timeout=DEFAULT_TIMEOUT):
+    """Register the daemon's scrapers (all of DEFAULT_INTERVALS unless `names` is given)"""
+    from run_batch import SCRAPERS
+    from quotes_crawler import crawl_quotes
+
+    async def quotes(pool):
+        # Plain HTTP crawler; it does not need the browser
+        if quotes_url:
+            await crawl_quotes(quotes_url)
+        else:
+            await crawl_quotes()
+
+    jobs = dict(SCRAPERS, quotes=quotes)
+    for name in names or DEFAULT_INTERVALS:
+        scheduler.add(name, jobs[name], DEFAULT_INTERVALS.get(name, 3600) * interval_scale, timeout=timeout)
+
+async def main(names, concurrency, pool_size, interval_scale, quotes_url, status_every, timeout):
+    from run_batch import create_pool
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass
+    # One Chromium for the lifetime of the daemon; every job borrows its contexts
+    async with create_pool(size=pool_size) as pool:
+        scheduler = Scheduler(pool, concurrency=concurrency)
+        register_defaults(scheduler, names, interval_scale, quotes_url, timeout)
+        print(f"[scheduler] {len(scheduler.jobs)} jobs, up to {concurrency} at a time; Ctrl+C to stop")
+        await scheduler.run_forever(stop, status_every)
+
+if __name__ == "__main__":
+    # HKTVMALL_BASE_URL / --quotes-url point the jobs at a local stand-in (python fixture_server.py)
+    parser = argparse.ArgumentParser(description="Run the scrapers on their own intervals with one warm browser")
+    parser.add_argument("--only", nargs="+", help="jobs to schedule (default: " + ", ".join(DEFAULT_INTERVALS) + ")")
+    parser.add_argument("--concurrency", type=int, default=3, help="jobs running at the same time")
+    parser.add_argument("--pool-size", type=int, default=4, help="reusable browser contexts")
+    parser.add_argument("--interval-scale", type=float, default=1.0, help="multiply every interval, e.g. 0.01 to try it out")
+    parser.add_argument("--quotes-url", help="base URL for the quotes crawler")
+    parser.add_argument("--status-every", type=float, default=60.0, help="seconds between status lines")
+    parser.add_argument("--job-timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds before a run is cancelled")
+    args = parser.parse_args()
+    asyncio.run(main(args.only, args.concurrency, args.pool_size, args.interval_scale, args.quotes_url,
+                     args.status_every, args.job_timeout))
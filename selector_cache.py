@@ -0,0 +1,123 @@
+import json
+import os
+import sys
+import threading
+import time
+
+# SCRAPER_SELECTOR_CACHE moves the shared cache file; set it empty to keep the cache in memory only
+CACHE_FILE = os.environ.get("SCRAPER_SELECTOR_CACHE", "selector_cache.json")
+
+class SelectorCache:
+    """Remembers, per site and page type, which container selector won discovery last time
+
+    Scrapers try the remembered selector first and only need the full
+    candidate list on a miss, which also drops the stale entry. Hits and
+    misses are counted per entry and kept in the same JSON file, so the hit
+    rate survives across runs (`python selector_cache.py` prints it).
+    """
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        if not self.path:
+            return
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(self.path + ".tmp", self.path)
+
+    @staticmethod
+    def _key(site, page_type):
+        return f"{site}|{page_type}"
+
+    def get(self, site, page_type):
+        """The remembered selector, or None"""
+        entry = self.entries.get(self._key(site, page_type))
+        return entry.get("selector") if entry else None
+
+    def ordered(self, site, page_type, candidates):
+        """`candidates` with the remembered selector (if any) first"""
+        remembered = self.get(site, page_type)
+        if not remembered:
+            return list(candidates)
+        return [remembered] + [c for c in candidates if c != remembered]
+
+    def record(self, site, page_type, selector):
+        """Record the outcome of a discovery: the winning selector, or None when nothing matched
+
+        A win by the remembered selector is a hit; anything else is a miss and
+        replaces (or, with None, drops) the remembered selector. Returns whether it was a hit.
+        """
+        key = self._key(site, page_type)
+        with self._lock:
+            entry = self.entries.setdefault(key, {"selector": None, "hits": 0, "misses": 0})
+            hit = entry["selector"] is not None and entry["selector"] == selector
+            if hit:
+                entry["hits"] += 1
+            else:
+                entry["misses"] += 1
+                entry["selector"] = selector
+            entry["updated"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+            self._save()
+        return hit
+
+    def reject(self, site, page_type, selector, hit=False):
+        """A discovered `selector` matched containers but yielded no items: forget it
+
+        Counts a miss (undoing the hit record() counted when `hit`), so the next
+        run goes back to the full candidate list. Returns whether it was remembered.
+        """
+        key = self._key(site, page_type)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or entry["selector"] != selector:
+                return False
+            if hit and entry["hits"]:
+                entry["hits"] -= 1
+            entry["misses"] += 1
+            entry["selector"] = None
+            entry["updated"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+            self._save()
+        return True
+
+    def stats(self):
+        """{"site|page_type": {"selector", "hits", "misses", "hit_rate"}}"""
+        stats = {}
+        for key, entry in sorted(self.entries.items()):
+            lookups = entry["hits"] + entry["misses"]
+            stats[key] = dict(entry, hit_rate=entry["hits"] / lookups if lookups else 0.0)
+        return stats
+
+    def summary(self):
+        hits = sum(entry["hits"] for entry in self.entries.values())
+        lookups = hits + sum(entry["misses"] for entry in self.entries.values())
+        rate = hits / lookups if lookups else 0.0
+        return f"Selector cache: {hits}/{lookups} hits ({rate:.0%}) across {len(self.entries)} site/page types"
+
+_default_cache = None
+
+def default_cache():
+    """Process-wide SelectorCache backed by CACHE_FILE, shared by every scraper"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SelectorCache()
+    return _default_cache
+
+if __name__ == "__main__":
+    # python selector_cache.py [selector_cache.json]  -> remembered selectors and hit rates
+    cache = SelectorCache(sys.argv[1] if len(sys.argv) > 1 else CACHE_FILE or "selector_cache.json")
+    for key, entry in cache.stats().items():
+        print(f"{key:<40} {entry['hit_rate']:>5.0%} ({entry['hits']} hits, {entry['misses']} misses)  "
+              f"{entry['selector']}")
+    print(cache.summary())
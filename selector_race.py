@@ -0,0 +1,84 @@
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from selector_cache import default_cache
+from urls import site_of
+
+# Counts (visible) matches for every candidate selector in one pass and only
+# resolves once at least one of them matches. Invalid selectors count as 0.
+RACE_JS = """
+({selectors, visibleOnly}) => {
+    const counts = selectors.map(selector => {
+        let nodes;
+        try {
+            nodes = document.querySelectorAll(selector);
+        } catch (e) {
+            return 0;
+        }
+        if (!visibleOnly) return nodes.length;
+        let visible = 0;
+        for (const node of nodes) {
+            if (node.getClientRects().length > 0) visible++;
+        }
+        return visible;
+    });
+    return counts.some(count => count > 0) ? counts : null;
+}
+"""
+
+# How long a lower-priority match waits for an earlier candidate to render too
+PRIORITY_GRACE_MS = 300
+
+async def _counts(page, selectors, timeout, visible_only):
+    """RACE_JS counts once any of `selectors` matches, or None on timeout"""
+    try:
+        handle = await page.wait_for_function(
+            RACE_JS,
+            arg={"selectors": list(selectors), "visibleOnly": visible_only},
+            timeout=timeout
+        )
+        return await handle.json_value()
+    except PlaywrightTimeoutError:
+        return None
+
+async def race_selectors(page, selectors, timeout=5000, visible_only=True, grace=PRIORITY_GRACE_MS):
+    """Wait on all candidate selectors at once and return (winner, match_counts)
+
+    The winner is the earliest selector in `selectors` that matches. When the
+    first match comes from a later candidate, the earlier ones get `grace` ms
+    more to render (a generic fallback often shows up a moment before the
+    specific container), so list order still expresses preference.
+    On timeout the winner is None; failure latency is one `timeout`, not one per selector.
+    """
+    selectors = list(selectors)
+    counts = await _counts(page, selectors, timeout, visible_only)
+    if counts is None:
+        return None, {selector: 0 for selector in selectors}
+
+    match_counts = dict(zip(selectors, counts))
+    winner = next(selector for selector in selectors if match_counts[selector] > 0)
+    preferred = selectors[:selectors.index(winner)]
+    if preferred and grace:
+        preferred_counts = await _counts(page, preferred, grace, visible_only)
+        if preferred_counts is not None:
+            match_counts.update(zip(preferred, preferred_counts))
+            winner = next(selector for selector in preferred if match_counts[selector] > 0)
+    return winner, match_counts
+
+async def discover_selector(page, selectors, page_type, cache=None, timeout=5000, visible_only=True):
+    """race_selectors() with the selector that won last time on this site and page type tried first
+
+    Returns (winner, match_counts, hit). The remembered selector leads the
+    same single in-page race, so a hit resolves as soon as it renders and a
+    miss already is the full discovery (no second wait). The outcome is
+    recorded in `cache` (default: the shared selector_cache.json).
+    """
+    cache = cache or default_cache()
+    site = site_of(page.url)
+    winner, match_counts = await race_selectors(page, cache.ordered(site, page_type, selectors), timeout, visible_only)
+    hit = cache.record(site, page_type, winner)
+    return winner, match_counts, hit
+
+def reject_selector(page, selector, page_type, hit=False, cache=None):
+    """Forget a discovered selector whose containers gave no items (see SelectorCache.reject)"""
+    cache = cache or default_cache()
+    if cache.reject(site_of(page.url), page_type, selector, hit):
+        print(f"Dropped cached selector {selector!r}: it matched but no items were extracted")
@@ -0,0 +1,201 @@
+import contextvars
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from har_archive import HarArchive, RecordingDriver, ReplayDriver, page_replayer
+from telemetry import phase
+
+# Where the resolved chromedriver path is remembered between runs
+DRIVER_CACHE_FILE = ".chromedriver.json"
+# How long a cached path is trusted before webdriver_manager is asked again
+DRIVER_CACHE_MAX_AGE = 7 * 24 * 3600
+
+def _read_driver_cache(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def chromedriver_path(cache_file=DRIVER_CACHE_FILE, max_age=DRIVER_CACHE_MAX_AGE, clock=time.time):
+    """Path to a chromedriver binary, looked up online at most once every `max_age` seconds
+
+    A recent cached path is used as is. Otherwise webdriver_manager checks for
+    (and downloads) the matching driver; when that fails, e.g. offline, the
+    stale cached path or a chromedriver on PATH is used instead. None means
+    neither exists and Selenium Manager has to resolve the driver itself.
+    """
+    cached = _read_driver_cache(cache_file)
+    cached_path = cached["path"] if cached and os.path.exists(cached.get("path", "")) else None
+    if cached_path and clock() - cached.get("checked_at", 0) < max_age:
+        return cached_path
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+        path = ChromeDriverManager().install()
+    except Exception as e:
+        fallback = cached_path or shutil.which("chromedriver")
+        print(f"chromedriver lookup failed ({e!r}); using {fallback or 'Selenium Manager'}")
+        return fallback
+    with open(cache_file, "w", encoding="utf-8") as f:
+        json.dump({"path": path, "checked_at": clock()}, f)
+    return path
+
+def chrome_options(headless=True, page_load_strategy="eager", block_images=True, extra_args=None):
+    """Chrome options for scraping: headless, no images, and get() returns once the DOM is ready"""
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless=new")
+    for arg in ["--disable-gpu", "--no-sandbox", "--disable-dev-shm-usage", "--window-size=1366,900"] + (extra_args or []):
+        options.add_argument(arg)
+    # "eager": driver.get() waits for DOMContentLoaded, not for every image and iframe
+    options.page_load_strategy = page_load_strategy
+    if block_images:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    return options
+
+class DriverPool:
+    """A bounded set of reusable headless Chrome drivers, shared by worker threads
+
+    Drivers are started lazily (at most `size`) and kept between checkouts, so
+    only the first search on each pays for a Chrome launch. A driver whose
+    work raised is quit rather than reused, and close() quits every driver the
+    pool started, including ones still checked out.
+    """
+
+    def __init__(self, size=4, headless=True, page_load_strategy="eager", driver_path=None, page_load_timeout=30,
+                 har=None):
+        self.size = size
+        self.options = chrome_options(headless=headless, page_load_strategy=page_load_strategy)
+        self.driver_path = driver_path
+        self.page_load_timeout = page_load_timeout
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []
+        # Every live driver, idle or checked out, so close() can quit them all
+        self._drivers = set()
+        self._closed = False
+        self._resolved = driver_path is not None
+        # HAR record/replay (har_archive.HarArchive); by default chosen by SCRAPER_HAR_MODE.
+        # Replay serves recorded pages without starting Chrome
+        self.har = har if har is not None else HarArchive.from_env()
+        self._replayer = page_replayer(self.har) if self.har is not None and self.har.mode == "replay" else None
+
+        # Simple counters so a run can report how much reuse it got
+        self.checkouts = 0
+        self.drivers_created = 0
+
+    def _launch(self):
+        if self._replayer is not None:
+            return ReplayDriver(self._replayer)
+        with self._lock:
+            if not self._resolved:
+                self.driver_path = chromedriver_path()
+                self._resolved = True
+        with phase("launch"):
+            service = Service(self.driver_path) if self.driver_path else Service()
+            driver = webdriver.Chrome(service=service, options=self.options)
+        driver.set_page_load_timeout(self.page_load_timeout)
+        if self.har is not None:
+            driver = RecordingDriver(driver, self.har.page_recorder())
+        return driver
+
+    def _new_driver(self):
+        driver = self._launch()
+        with self._lock:
+            self.drivers_created += 1
+            self._drivers.add(driver)
+        return driver
+
+    def checkout(self):
+        """Borrow a driver, waiting if all `size` drivers are in use"""
+        self._slots.acquire()
+        try:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                driver = self._new_driver()
+            # Counted once a driver is in hand, so failed launches are not checkouts
+            with self._lock:
+                self.checkouts += 1
+            return driver
+        except Exception:
+            self._slots.release()
+            raise
+
+    def checkin(self, driver, discard=False):
+        """Return a driver to the pool (quit it instead when `discard` or the pool is closed)"""
+        try:
+            with self._lock:
+                discard = discard or self._closed
+                # Drivers no longer in _drivers were already quit by close(); each is quit once
+                live = driver in self._drivers
+                if discard:
+                    self._drivers.discard(driver)
+                else:
+                    self._idle.append(driver)
+            if discard and live:
+                driver.quit()
+        except Exception:
+            pass
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self):
+        """`with pool.driver() as driver:` checkout/checkin helper; a driver that raised is not reused"""
+        driver = self.checkout()
+        discard = False
+        try:
+            yield driver
+        except BaseException:
+            discard = True
+            raise
+        finally:
+            self.checkin(driver, discard=discard)
+
+    def map(self, fn, items, on_error=None, before=None):
+        """[fn(driver, item) for item in items], run on up to `size` threads, results in input order
+
+        When fn raises, its driver is discarded; with `on_error`, on_error(item, exc)
+        becomes that item's result instead of the exception propagating.
+        `before(item)` runs before a driver is checked out, e.g. to wait for a rate limit.
+        """
+        def call(item):
+            try:
+                if before is not None:
+                    before(item)
+                with self.driver() as driver:
+                    return fn(driver, item)
+            except Exception as e:
+                if on_error is None:
+                    raise
+                return on_error(item, e)
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            # Each call gets a copy of the caller's context so its telemetry spans join the current run
+            futures = [executor.submit(contextvars.copy_context().run, call, item) for item in items]
+            return [future.result() for future in futures]
+
+    def close(self):
+        """Quit every driver the pool started; drivers checked in later are quit too"""
+        with self._lock:
+            self._closed = True
+            drivers, self._drivers, self._idle = self._drivers, set(), []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
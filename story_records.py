@@ -0,0 +1,48 @@
+from collections import namedtuple
+from datetime import datetime, timezone
+from harvester import parse_timestamp
+
+# One compact record per story container; title, timestamp and URL always stay together
+Story = namedtuple("Story", ["title", "time", "url", "epoch"])
+
+def to_epoch(value):
+    """Seconds since the epoch from an ISO-8601 string or a (milli)second number; None if unknown"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        # Feeds usually send milliseconds
+        return value / 1000 if value > 1e11 else float(value)
+    parsed = parse_timestamp(value)
+    return parsed.timestamp() if parsed else None
+
+def story_from_item(item):
+    """Build a Story from a harvested/feed dict ({title, time, url[, datetime]}); None without a title"""
+    title = item.get("title")
+    if not title:
+        return None
+    time_text = item.get("time")
+    epoch = to_epoch(item.get("datetime"))
+    if epoch is None:
+        epoch = to_epoch(time_text)
+    if time_text is not None and not isinstance(time_text, str):
+        # Feed timestamps are raw numbers; show them as readable UTC time
+        time_text = datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%d %H:%M UTC") if epoch is not None else str(time_text)
+    return Story(title, time_text, item.get("url"), epoch)
+
+def stories_from_items(items):
+    """Yield a Story for every item that has a title; a missing timestamp never shifts other stories"""
+    for item in items:
+        story = story_from_item(item)
+        if story is not None:
+            yield story
+
+def print_stories(stories):
+    """Print stories in the scrapers' usual format; returns how many were printed"""
+    count = 0
+    for count, story in enumerate(stories, 1):
+        print(f"{count}. Title: {story.title}")
+        print(f"   Time: {story.time or 'unknown'}")
+        if story.url:
+            print(f"   URL: {story.url}")
+        print("-" * 80)
+    return count
@@ -0,0 +1,382 @@
+import contextvars
+import functools
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Where spans (JSON lines) and the Prometheus textfile go; SCRAPER_TELEMETRY_DIR="" turns recording off
+TELEMETRY_DIR = os.environ.get("SCRAPER_TELEMETRY_DIR", "telemetry")
+SPANS_FILE = "spans.jsonl"
+PROM_FILE = "scraper.prom"
+STATE_FILE = "metrics_state.json"
+LOCK_FILE = ".lock"
+
+# Histogram buckets (seconds) for phase durations
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_current_run = contextvars.ContextVar("telemetry_run", default=None)
+_current_span = contextvars.ContextVar("telemetry_span", default=None)
+
+class Span:
+    """One timed phase; `bytes` and `items` may be filled in while it runs"""
+
+    def __init__(self, name, parent=None, bytes=None, items=None):
+        self.name = name
+        self.parent = parent
+        self.bytes = bytes
+        self.items = items
+        self.status = "ok"
+        self.error = None
+        self.started = time.time()
+        self.duration = None
+        self._start = time.perf_counter()
+
+    def finish(self, exc=None):
+        self.duration = time.perf_counter() - self._start
+        if exc is not None:
+            self.status = "error"
+            self.error = type(exc).__name__
+
+    def as_dict(self):
+        return {
+            "phase": self.name,
+            "parent": self.parent,
+            "started": round(self.started, 3),
+            "duration_s": round(self.duration, 6),
+            "bytes": self.bytes,
+            "items": self.items,
+            "status": self.status,
+            "error": self.error,
+        }
+
+class RunTelemetry:
+    """Spans of one scraper run, written out when the run finishes"""
+
+    def __init__(self, scraper, site, directory=TELEMETRY_DIR):
+        self.scraper = scraper
+        self.site = site
+        self.directory = directory
+        self.run_id = uuid.uuid4().hex[:12]
+        self.spans = []
+        # NetworkStats of every page a network policy was attached to during the run
+        self.network = []
+        self.status = "ok"
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+
+    @contextmanager
+    def span(self, name, bytes=None, items=None):
+        parent = _current_span.get()
+        span = Span(name, parent.name if parent else None, bytes, items)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.finish(e)
+            raise
+        else:
+            span.finish()
+        finally:
+            _current_span.reset(token)
+            self.spans.append(span)
+
+    def phase_totals(self):
+        """Seconds per top-level phase (nested spans are already inside their parent)"""
+        totals = {}
+        for span in self.spans:
+            if span.parent is None:
+                totals[span.name] = totals.get(span.name, 0.0) + span.duration
+        return totals
+
+    def network_totals(self):
+        """The run's NetworkStats summed over its pages (empty when no policy was attached)"""
+        totals = {}
+        for stats in self.network:
+            for key, value in stats.as_dict().items():
+                if isinstance(value, dict):
+                    merged = totals.setdefault(key, {})
+                    for reason, count in value.items():
+                        merged[reason] = merged.get(reason, 0) + count
+                else:
+                    totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def finish(self, exc=None):
+        self.duration = time.perf_counter() - self._start
+        if exc is not None:
+            self.status = "error"
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            # Scrapers in other processes may be finishing into the same directory
+            with _directory_lock(self.directory):
+                self._write_spans()
+                _update_prometheus(self)
+        totals = self.phase_totals()
+        if totals:
+            slowest = max(totals, key=totals.get)
+            print(f"[telemetry] {self.scraper}: {self.duration:.2f}s, slowest phase '{slowest}' "
+                  f"({totals[slowest]:.2f}s)")
+
+    def _write_spans(self):
+        base = {"run_id": self.run_id, "scraper": self.scraper, "site": self.site}
+        record = {**base, "type": "run", "started": round(self.started, 3),
+                  "duration_s": round(self.duration, 6), "status": self.status,
+                  "phases": {k: round(v, 6) for k, v in self.phase_totals().items()}}
+        network = self.network_totals()
+        if network:
+            record["network"] = network
+        with open(os.path.join(self.directory, SPANS_FILE), "a", encoding="utf-8") as f:
+            for span in self.spans:
+                f.write(json.dumps({**base, "type": "span", **span.as_dict()}) + "\n")
+            f.write(json.dumps(record) + "\n")
+
+def current_run():
+    return _current_run.get()
+
+@contextmanager
+def phase(name, bytes=None, items=None):
+    """`with phase("parse") as span:` -- times a phase of the current run (a no-op span outside a run)"""
+    run = _current_run.get()
+    if run is None:
+        span = Span(name, bytes=bytes, items=items)
+        yield span
+        span.finish()
+        return
+    with run.span(name, bytes, items) as span:
+        yield span
+
+async def timed(name, awaitable, size=None, count=None):
+    """`await timed("goto", page.goto(url))` -- awaits inside a span; size/count derive bytes/items from the result"""
+    with phase(name) as span:
+        result = await awaitable
+        if size is not None and result is not None:
+            span.bytes = size(result)
+        if count is not None and result is not None:
+            span.items = count(result)
+    return result
+
+def text_size(text):
+    return len(text.encode("utf-8")) if isinstance(text, str) else len(text)
+
+def traced_run(scraper, site):
+    """Decorator for an async scraper: everything it awaits is recorded as one run of `scraper`"""
+    def decorate(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if _current_run.get() is not None:
+                # Called from inside another traced run: its spans belong to the outer run
+                return await func(*args, **kwargs)
+            run = RunTelemetry(scraper, site)
+            token = _current_run.set(run)
+            try:
+                result = await func(*args, **kwargs)
+            except BaseException as e:
+                run.finish(e)
+                raise
+            else:
+                run.finish()
+                return result
+            finally:
+                _current_run.reset(token)
+        return wrapper
+    return decorate
+
+@contextmanager
+def traced_block(scraper, site):
+    """Same as traced_run for synchronous code"""
+    run = RunTelemetry(scraper, site)
+    token = _current_run.set(run)
+    try:
+        yield run
+    except BaseException as e:
+        run.finish(e)
+        raise
+    else:
+        run.finish()
+    finally:
+        _current_run.reset(token)
+
+# --- Prometheus textfile ----------------------------------------------------------
+
+@contextmanager
+def _directory_lock(directory):
+    """Exclusive lock (between processes too) on a telemetry directory, so the state
+    file is read, updated and replaced by one run at a time"""
+    with open(os.path.join(directory, LOCK_FILE), "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _load_state(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"phases": {}, "runs": {}}
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _update_prometheus(run):
+    """Fold this run into the cumulative state and rewrite the textfile (node_exporter textfile collector format)
+
+    Callers hold _directory_lock, so concurrent runs cannot lose each other's updates.
+    """
+    state_path = os.path.join(run.directory, STATE_FILE)
+    state = _load_state(state_path)
+
+    for span in run.spans:
+        key = f"{run.scraper}|{run.site}|{span.name}"
+        entry = state["phases"].setdefault(key, {"count": 0, "sum": 0.0, "buckets": [0] * len(BUCKETS),
+                                                 "errors": 0, "last": 0.0, "bytes": None, "items": None})
+        entry["count"] += 1
+        entry["sum"] += span.duration
+        entry["last"] = span.duration
+        for i, bound in enumerate(BUCKETS):
+            if span.duration <= bound:
+                entry["buckets"][i] += 1
+        if span.status == "error":
+            entry["errors"] += 1
+        if span.bytes is not None:
+            entry["bytes"] = span.bytes
+        if span.items is not None:
+            entry["items"] = span.items
+
+    run_key = f"{run.scraper}|{run.site}"
+    runs = state["runs"].setdefault(run_key, {"ok": 0, "error": 0, "last_duration": 0.0, "last_timestamp": 0.0})
+    runs[run.status] += 1
+    runs["last_duration"] = run.duration
+    runs["last_timestamp"] = run.started + run.duration
+    network = run.network_totals()
+    if network:
+        runs["network"] = {key: value for key, value in network.items() if not isinstance(value, dict)}
+
+    # Write-then-rename: a run killed half way leaves the previous state, never a truncated one
+    with open(state_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(state_path + ".tmp", state_path)
+
+    lines = [
+        "# HELP scraper_phase_duration_seconds Time spent in each scrape phase.",
+        "# TYPE scraper_phase_duration_seconds histogram",
+    ]
+    gauges = {"scraper_phase_last_duration_seconds": [], "scraper_phase_last_bytes": [],
+              "scraper_phase_last_items": [], "scraper_phase_errors_total": []}
+    for key, entry in sorted(state["phases"].items()):
+        scraper, site, name = key.split("|")
+        labels = f'scraper="{_escape(scraper)}",site="{_escape(site)}",phase="{_escape(name)}"'
+        for bound, count in zip(BUCKETS, entry["buckets"]):
+            lines.append(f'scraper_phase_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'scraper_phase_duration_seconds_bucket{{{labels},le="+Inf"}} {entry["count"]}')
+        lines.append(f"scraper_phase_duration_seconds_sum{{{labels}}} {entry['sum']:.6f}")
+        lines.append(f"scraper_phase_duration_seconds_count{{{labels}}} {entry['count']}")
+        gauges["scraper_phase_last_duration_seconds"].append(f"{{{labels}}} {entry['last']:.6f}")
+        gauges["scraper_phase_errors_total"].append(f"{{{labels}}} {entry['errors']}")
+        if entry["bytes"] is not None:
+            gauges["scraper_phase_last_bytes"].append(f"{{{labels}}} {entry['bytes']}")
+        if entry["items"] is not None:
+            gauges["scraper_phase_last_items"].append(f"{{{labels}}} {entry['items']}")
+
+    help_text = {
+        "scraper_phase_last_duration_seconds": ("gauge", "Duration of the phase in the most recent run."),
+        "scraper_phase_last_bytes": ("gauge", "Bytes handled by the phase in the most recent run."),
+        "scraper_phase_last_items": ("gauge", "Items produced by the phase in the most recent run."),
+        "scraper_phase_errors_total": ("counter", "Phases that ended with an exception."),
+    }
+    for metric, samples in gauges.items():
+        kind, text = help_text[metric]
+        lines += [f"# HELP {metric} {text}", f"# TYPE {metric} {kind}"]
+        lines += [metric + sample for sample in samples]
+
+    lines += ["# HELP scraper_runs_total Finished scraper runs by status.", "# TYPE scraper_runs_total counter"]
+    run_lines = []
+    for key, entry in sorted(state["runs"].items()):
+        scraper, site = key.split("|")
+        labels = f'scraper="{_escape(scraper)}",site="{_escape(site)}"'
+        for status in ("ok", "error"):
+            lines.append(f'scraper_runs_total{{{labels},status="{status}"}} {entry[status]}')
+        run_lines.append((labels, entry))
+    lines += ["# HELP scraper_run_last_duration_seconds Duration of the most recent run.",
+              "# TYPE scraper_run_last_duration_seconds gauge"]
+    lines += [f"scraper_run_last_duration_seconds{{{labels}}} {entry['last_duration']:.6f}" for labels, entry in run_lines]
+    lines += ["# HELP scraper_run_last_timestamp_seconds Unix time the most recent run finished.",
+              "# TYPE scraper_run_last_timestamp_seconds gauge"]
+    lines += [f"scraper_run_last_timestamp_seconds{{{labels}}} {entry['last_timestamp']:.3f}" for labels, entry in run_lines]
+    network_help = {
+        "requests_blocked": ("scraper_run_last_requests_blocked", "Requests a network policy blocked in the most recent run."),
+        "requests_allowed": ("scraper_run_last_requests_allowed", "Requests a network policy let through in the most recent run."),
+        "bytes_loaded": ("scraper_run_last_bytes_loaded", "Content-Length of the responses loaded in the most recent run."),
+        "bytes_saved_estimate": ("scraper_run_last_bytes_saved_estimate",
+                                 "Estimated bytes blocking saved in the most recent run (fixed per-type sizes, not measured)."),
+    }
+    for key, (metric, text) in network_help.items():
+        samples = [f"{metric}{{{labels}}} {entry['network'][key]}" for labels, entry in run_lines
+                   if key in entry.get("network", {})]
+        if samples:
+            lines += [f"# HELP {metric} {text}", f"# TYPE {metric} gauge"] + samples
+
+    # Write-then-rename so the collector never reads a half-written file
+    prom_path = os.path.join(run.directory, PROM_FILE)
+    with open(prom_path + ".tmp", "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(prom_path + ".tmp", prom_path)
+
+# --- Report ---------------------------------------------------------------------
+
+def load_runs(path):
+    """Run records (with their phase totals) from a spans.jsonl file, oldest first"""
+    runs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get("type") == "run":
+                runs.append(record)
+    return runs
+
+def report(path, history=10, factor=1.5):
+    """Per scraper: dominant phase of the last run and phases slower than `factor` x their recent median"""
+    by_scraper = {}
+    for record in load_runs(path):
+        by_scraper.setdefault(record["scraper"], []).append(record)
+    regressions = 0
+    for scraper, runs in sorted(by_scraper.items()):
+        last = runs[-1]
+        phases = last["phases"]
+        print(f"{scraper} ({last['site']}): last run {last['duration_s']:.2f}s, {last['status']}")
+        # Concurrent crawlers overlap their phases, so shares are of the summed phase time, not wall time
+        busy = sum(phases.values())
+        for name, seconds in sorted(phases.items(), key=lambda kv: -kv[1]):
+            share = seconds / busy if busy else 0
+            previous = [run["phases"][name] for run in runs[-history - 1:-1] if name in run["phases"]]
+            baseline = statistics.median(previous) if previous else None
+            flag = ""
+            if baseline and seconds > baseline * factor and seconds - baseline > 0.1:
+                flag = f"  REGRESSION (median of last {len(previous)}: {baseline:.2f}s)"
+                regressions += 1
+            print(f"  {name:<14} {seconds:>8.2f}s {share:>6.0%}{flag}")
+    return regressions
+
+if __name__ == "__main__":
+    # python telemetry.py [telemetry/spans.jsonl]  -> slowest phases per scraper and regressions
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(TELEMETRY_DIR or "telemetry", SPANS_FILE)
+    sys.exit(1 if report(path) else 0)
@@ -0,0 +1,63 @@
+import asyncio
+import os
+import sys
+import pytest
+
+# The scrapers are flat top-level modules; make them importable from the tests
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Fixture pages must not teach the shared selector_cache.json anything about the real sites
+os.environ.setdefault("SCRAPER_SELECTOR_CACHE", "")
+# ...nor write spans and metrics into the working tree
+os.environ.setdefault("SCRAPER_TELEMETRY_DIR", "")
+
+# Loopback hosts are not rate limited, so the mocked crawls run at full speed
+BASE_URL = "http://localhost"
+
+def mock_site(fail=None, pages=3, tag_pages=1):
+    """MockTransport serving a QuotesSite; `fail(request, attempt)` may return a Response or raise first"""
+    import httpx
+    from fixture_server import QuotesSite
+    site = QuotesSite(pages, tag_pages)
+    attempts = {}
+
+    def handle(request):
+        path = request.url.path
+        attempts[path] = attempts.get(path, 0) + 1
+        if fail is not None:
+            response = fail(request, attempts[path])
+            if response is not None:
+                return response
+        html = site.render(path)
+        if html is None:
+            return httpx.Response(404, text="Not found")
+        return httpx.Response(200, text=html, headers={"Content-Type": "text/html; charset=utf-8"})
+
+    return httpx.MockTransport(handle), attempts
+
+def crawl(crawler):
+    # A worker that dies would leave crawl() waiting forever; fail the test instead
+    return asyncio.run(asyncio.wait_for(crawler.crawl(), timeout=20))
+
+@pytest.fixture
+def fixture_path():
+    """fixture_path("quotes.html") -> absolute path of a recorded page under fixtures/"""
+    return lambda *parts: os.path.join(ROOT, "fixtures", *parts)
+
+@pytest.fixture
+def quotes_server():
+    """The quotes.toscrape stand-in from fixture_server on a free port; yields its base URL"""
+    from fixture_server import start_server
+    server, base_url = start_server()
+    yield base_url
+    server.shutdown()
+
+@pytest.fixture
+def validating_server():
+    """Stand-in server that sends ETag/Last-Modified and answers conditional requests with 304"""
+    from fixture_server import start_server
+    server, base_url = start_server(validators=True)
+    yield base_url
+    server.shutdown()
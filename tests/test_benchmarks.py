@@ -0,0 +1,52 @@
+import asyncio
+import os
+import pytest
+from benchmark_extraction import CASES, FIXTURE_DIR, scale_fixture
+from quotes_crawler import QuotesCrawler
+
+# The same cases as benchmark_extraction.py, timed by pytest-benchmark so runs can be
+# saved and compared: pytest tests/test_benchmarks.py --benchmark-autosave, then
+# --benchmark-compare --benchmark-compare-fail=mean:20% to fail on a regression
+pytest.importorskip("pytest_benchmark")
+
+SCALES = (1, 10)
+
+def load_case(name, factor):
+    fixture, item_css, loader = CASES[name]
+    try:
+        parse, extract = loader()
+    except ImportError as e:
+        pytest.skip(f"{name}: {e}")
+    with open(os.path.join(FIXTURE_DIR, fixture), "r", encoding="utf-8") as f:
+        html = scale_fixture(f.read(), item_css, factor)
+    return parse, extract, html
+
+@pytest.mark.parametrize("factor", SCALES)
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_parse(benchmark, name, factor):
+    parse, _, html = load_case(name, factor)
+    benchmark.group = f"parse {factor}x"
+    benchmark.extra_info["html_kib"] = round(len(html) / 1024, 1)
+    assert benchmark(parse, html) is not None
+
+@pytest.mark.parametrize("factor", SCALES)
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_extract(benchmark, name, factor):
+    parse, extract, html = load_case(name, factor)
+    soup = parse(html)
+    benchmark.group = f"extract {factor}x"
+    items = benchmark(extract, soup)
+    benchmark.extra_info["items"] = len(items)
+    assert len(items) > 0
+
+def test_quotes_crawl(benchmark, quotes_server):
+    def crawl():
+        crawler = QuotesCrawler(quotes_server, concurrency=8)
+        asyncio.run(crawler.crawl())
+        return crawler
+
+    benchmark.group = "crawl"
+    # A crawl is long enough that a few rounds give a stable mean
+    crawler = benchmark.pedantic(crawl, rounds=3, iterations=1)
+    benchmark.extra_info["pages"] = crawler.pages
+    assert crawler.errors == 0
@@ -0,0 +1,122 @@
+import asyncio
+import glob
+import json
+from types import SimpleNamespace
+from adaptive_scroll import scroll_until_stable
+from bloomberg_feed import (EMBEDDED_JSON_RE, FeedCapture, FeedHarvester, STORY_SPEC, load_saved_payloads,
+                            stories_from_embedded, stories_from_payload)
+from story_records import stories_from_items
+
+def read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def test_recorded_response_decodes_to_stories(fixture_path):
+    payloads = load_saved_payloads(sorted(glob.glob(fixture_path("bloomberg_feed", "*.json"))))
+    stories = stories_from_payload(payloads[0])
+    # Anything under /news/ counts (videos too); company pages do not
+    assert [s["title"] for s in stories] == [
+        "Fed Holds Rates Steady as Inflation Cools",
+        "Oil Slides on Surprise Stockpile Build",
+        "Markets Wrap",
+    ]
+    assert stories[0]["url"] == "https://www.bloomberg.com/news/articles/2024-05-01/fed-holds-rates-steady"
+    records = list(stories_from_items(stories))
+    assert records[1].time == "2024-05-01 18:00 UTC"
+    assert records[1].epoch == 1714586400
+
+def test_embedded_json_survives_class_churn(fixture_path):
+    html = read(fixture_path("bloomberg_latest_embedded.html"))
+    # The DOM spec no longer finds anything after the redesign...
+    assert STORY_SPEC.extract_html(html) == []
+    # ...but the embedded JSON still has every story (the broken script block is skipped)
+    stories = stories_from_embedded(html)
+    assert [s["url"] for s in stories] == [
+        "https://www.bloomberg.com/news/articles/2024-05-01/fed-holds-rates-steady",
+        "https://www.bloomberg.com/news/articles/2024-05-01/yen-weakens-past-158",
+    ]
+
+def test_capture_merges_embedded_and_responses_without_duplicates(fixture_path):
+    capture = FeedCapture()
+    capture.payloads = load_saved_payloads(sorted(glob.glob(fixture_path("bloomberg_feed", "*.json"))))
+    html = read(fixture_path("bloomberg_latest_embedded.html"))
+    stories = asyncio.run(capture.stories(html))
+    assert [s["title"] for s in stories] == [
+        "Fed Holds Rates Steady as Inflation Cools",
+        "Yen Weakens Past 158 Per Dollar",
+        "Oil Slides on Surprise Stockpile Build",
+        "Markets Wrap",
+        "Treasuries Rally After Jobs Data",
+        "Gold Holds Near Record",
+    ]
+
+class FakeResponse:
+    def __init__(self, url, body):
+        self.url = url
+        self.request = SimpleNamespace(resource_type="fetch")
+        self.headers = {"content-type": "application/json"}
+        self._body = body
+
+    async def json(self):
+        return self._body
+
+class FakeFeedPage:
+    """Embeds the first render's JSON; every scroll makes the feed answer with its next recorded page"""
+
+    def __init__(self, html, responses, capture):
+        self.scripts = [m.group(1) for m in EMBEDDED_JSON_RE.finditer(html)]
+        self.responses = list(responses)
+        self.capture = capture
+        self.harvester = None
+        self.height = 1000
+        self.harvested_before_scroll = []
+
+    async def eval_on_selector_all(self, selector, expression):
+        assert "__NEXT_DATA__" in selector
+        return self.scripts
+
+    async def evaluate(self, expression, arg=None):
+        if "scrollHeight" in expression and arg is None:
+            return self.height
+        if isinstance(arg, dict):
+            self.harvested_before_scroll.append(len(self.harvester.items))
+            if self.responses:
+                with open(self.responses.pop(0), "r", encoding="utf-8") as f:
+                    recorded = json.load(f)
+                self.capture._on_response(FakeResponse(recorded["url"], recorded["body"]))
+                self.height += 1000
+            return {"count": 0, "height": self.height}
+        return 0
+
+def test_feed_pages_are_merged_while_scrolling(fixture_path):
+    capture = FeedCapture()
+    page = FakeFeedPage(read(fixture_path("bloomberg_latest_embedded.html")),
+                        sorted(glob.glob(fixture_path("bloomberg_feed", "*.json"))), capture)
+    page.harvester = FeedHarvester(capture)
+
+    async def run():
+        return await scroll_until_stable(page, harvester=page.harvester, verbose=False)
+
+    report = asyncio.run(run())
+    # Only the embedded stories exist before the first scroll; each recorded feed page lands after one
+    assert page.harvested_before_scroll == [2, 4, 6]
+    assert [s["title"] for s in page.harvester.items] == [
+        "Fed Holds Rates Steady as Inflation Cools",
+        "Yen Weakens Past 158 Per Dollar",
+        "Oil Slides on Surprise Stockpile Build",
+        "Markets Wrap",
+        "Treasuries Rally After Jobs Data",
+        "Gold Holds Near Record",
+    ]
+    # The third scroll brought no new stories, so scrolling stopped there
+    assert len(report) == 3
+    assert page.harvester.done
+
+def test_feed_harvest_stops_at_max_items(fixture_path):
+    capture = FeedCapture()
+    page = FakeFeedPage(read(fixture_path("bloomberg_latest_embedded.html")),
+                        sorted(glob.glob(fixture_path("bloomberg_feed", "*.json"))), capture)
+    page.harvester = FeedHarvester(capture, max_items=3)
+    asyncio.run(scroll_until_stable(page, harvester=page.harvester, verbose=False))
+    assert len(page.harvester.items) == 3
+    assert page.harvested_before_scroll == [2]
@@ -0,0 +1,46 @@
+import asyncio
+import json
+import consent
+from consent import ConsentHandler
+from urls import site_of
+
+class FakePage:
+    """Page whose overlay matches the candidate selectors listed in `buttons`"""
+
+    def __init__(self, url, buttons):
+        self.url = url
+        self.buttons = buttons
+        self.offered = None
+
+    async def evaluate(self, script, candidates):
+        self.offered = candidates
+        for index, candidate in enumerate(candidates):
+            if candidate in self.buttons:
+                return index
+        return -1
+
+def dismiss(handler, page):
+    return asyncio.run(handler.dismiss(page))
+
+def test_www_and_bare_host_share_one_memory_entry(tmp_path, monkeypatch):
+    async def settled(page, quiet_ms, max_ms):
+        pass
+
+    monkeypatch.setattr(consent, "wait_for_dom_quiet", settled)
+    path = tmp_path / "consent_memory.json"
+    handler = ConsentHandler(selectors=["#accept", "#agree"], memory_path=str(path))
+    agree = consent._to_candidate("#agree")
+    assert dismiss(handler, FakePage("https://www.example.com/news", [agree])) == "#agree"
+    assert json.loads(path.read_text(encoding="utf-8")) == {"example.com": "#agree"}
+
+    # The bare host tries the remembered selector first
+    page = FakePage("https://example.com/", [agree])
+    assert dismiss(handler, page) == "#agree"
+    assert page.offered[0] == agree
+    assert handler.memory == {"example.com": "#agree"}
+
+def test_site_of_drops_only_a_leading_www():
+    assert site_of("https://www.Bloomberg.com/latest") == "bloomberg.com"
+    assert site_of("https://bloomberg.com/") == "bloomberg.com"
+    assert site_of("https://finance.yahoo.com/") == "finance.yahoo.com"
+    assert site_of("https://wwwx.example.com/") == "wwwx.example.com"
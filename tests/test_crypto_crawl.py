@@ -0,0 +1,87 @@
+import asyncio
+import pyarrow.parquet as pq
+import pytest
+import crypto_crawl
+from crypto_crawl import FrameSink, crawl_crypto, parse_table_html, to_frame
+
+@pytest.fixture
+def table(fixture_path):
+    with open(fixture_path("crypto_table.html"), "r", encoding="utf-8") as f:
+        return parse_table_html(f.read())
+
+def test_parses_recorded_table(table):
+    header, rows = table
+    assert header[:3] == ["Symbol", "Name", "Price"]
+    frame = to_frame(header, rows)
+    btc = frame[frame["Symbol"] == "BTC-USD"].iloc[0]
+    assert btc["Name"] == "Bitcoin USD"
+    assert btc["Price"] == pytest.approx(27466.55)
+    assert btc["Change"] == pytest.approx(-443.95)
+    assert btc["Change %"] == pytest.approx(-1.62)
+    assert btc["Market Cap"] == pytest.approx(57.122e12)
+    assert btc["Volume"] == pytest.approx(31.715e9)
+    assert btc["52 Wk Change %"] == pytest.approx(-5.72)
+
+def test_column_types_do_not_depend_on_page_contents(table):
+    header, rows = table
+    # A page where every Volume cell is missing and a price is unparseable
+    odd = [list(row) for row in rows[:2]]
+    for row in odd:
+        row[header.index("Volume")] = "N/A"
+    odd[0][header.index("Price")] = "--"
+    first, second = to_frame(header, rows), to_frame(header, odd)
+    assert dict(first.dtypes) == dict(second.dtypes)
+    assert str(second["Volume"].dtype) == "float64"
+    assert str(second["Symbol"].dtype) == "string"
+
+def test_parquet_pages_append_with_one_schema(table, tmp_path):
+    header, rows = table
+    odd = [list(row) for row in rows[:1]]
+    odd[0][header.index("Volume")] = "N/A"
+    path = str(tmp_path / "crypto.parquet")
+    sink = FrameSink(path)
+    sink.write(to_frame(header, rows))
+    sink.write(to_frame(header, odd))
+    sink.close()
+    data = pq.read_table(path).to_pandas()
+    assert len(data) == len(rows) + 1
+    assert data["Volume"].isna().sum() == 1
+
+def fake_pages(monkeypatch, table, pages, total, failing=()):
+    """fetch_table_page over `pages` pages of the recorded table; starts in `failing` time out"""
+    header, rows = table
+
+    async def fetch_table_page(pool, start, count=crypto_crawl.PAGE_SIZE):
+        if start in failing:
+            raise TimeoutError(f"goto timed out at start={start}")
+        page = start // count
+        return header, (rows[:count] if page < pages else []), total
+
+    monkeypatch.setattr(crypto_crawl, "fetch_table_page", fetch_table_page)
+    return header, rows
+
+@pytest.mark.parametrize("known_total", [True, False])
+def test_a_failing_page_does_not_lose_the_crawl(table, tmp_path, monkeypatch, known_total):
+    count = 5
+    fake_pages(monkeypatch, table, pages=4, total=4 * count if known_total else None, failing={2 * count})
+    path = str(tmp_path / "crypto.parquet")
+    written = asyncio.run(crawl_crypto(pool=object(), output=path, concurrency=2, count=count))
+    # Three of four pages arrived, and the Parquet file was finished with its footer
+    assert written == 3 * count
+    assert len(pq.read_table(path)) == 3 * count
+
+def test_sink_is_closed_when_the_crawl_raises(table, monkeypatch):
+    fake_pages(monkeypatch, table, pages=1, total=None, failing={0})
+    closed = []
+
+    class Sink:
+        rows = 0
+        def write(self, frame):
+            pass
+        def close(self):
+            closed.append(True)
+
+    monkeypatch.setattr(crypto_crawl, "open_sink", lambda output: Sink())
+    with pytest.raises(TimeoutError):
+        asyncio.run(crawl_crypto(pool=object(), output="unused.csv", count=5))
+    assert closed == [True]
@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+import crypto_crawl
+from crypto_crawl import parse_table_html, to_frame
+from crypto_store import CryptoStore
+
+@pytest.fixture
+def table(fixture_path):
+    with open(fixture_path("crypto_table.html"), "r", encoding="utf-8") as f:
+        return parse_table_html(f.read())
+
+@pytest.fixture
+def store():
+    with CryptoStore(":memory:") as store:
+        yield store
+
+def with_price(header, rows, symbol, price):
+    changed = [list(row) for row in rows]
+    for row in changed:
+        if row[0] == symbol:
+            row[header.index("Price")] = price
+    return changed
+
+def test_second_poll_writes_only_changed_rows(store, table):
+    header, rows = table
+    assert store.write(to_frame(header, rows), ts=100) == (len(rows), 0)
+    moved = with_price(header, rows, "BTC-USD", "27,500.00")
+    assert store.write(to_frame(header, moved), ts=200) == (1, len(rows) - 1)
+    assert [symbol for symbol, _, _ in store.changes(start=150)] == ["BTC-USD"]
+
+def test_unchanged_poll_writes_nothing(store, table):
+    header, rows = table
+    store.write(to_frame(header, rows), ts=100)
+    assert store.write(to_frame(header, rows), ts=200) == (0, len(rows))
+    # Missing values hash the same every poll
+    assert store.write([{"Symbol": "X", "Price": float("nan")}], ts=300) == (1, 0)
+    assert store.write([{"Symbol": "X", "Price": None}], ts=400) == (0, 1)
+    assert len(list(store.changes())) == len(rows) + 1
+
+def test_latest_per_symbol(store, table):
+    header, rows = table
+    store.write(to_frame(header, rows), ts=100)
+    store.write(to_frame(header, with_price(header, rows, "BTC-USD", "27,500.00")), ts=200)
+    latest = store.latest()
+    assert len(latest) == len(rows)
+    ts, btc = latest["BTC-USD"]
+    assert ts == 200 and btc["Price"] == pytest.approx(27500.0)
+    assert latest["ETH-USD"][0] == 100
+    assert store.latest(["BTC-USD"]).keys() == {"BTC-USD"}
+
+def test_history_and_as_of_range_scans(store):
+    for ts, price in [(100, 1.0), (200, 2.0), (300, 2.0), (400, 3.0)]:
+        store.write([{"Symbol": "BTC-USD", "Price": price}, {"Symbol": "ETH-USD", "Price": 10.0}], ts=ts)
+    # The unchanged poll at 300 left no row
+    assert [(ts, row["Price"]) for ts, row in store.history("BTC-USD")] == [(100, 1.0), (200, 2.0), (400, 3.0)]
+    assert [ts for ts, _ in store.history("BTC-USD", start=150, end=400)] == [200, 400]
+    assert list(store.history("DOGE-USD")) == []
+    then = store.as_of(350)
+    assert then["BTC-USD"] == (200, {"Symbol": "BTC-USD", "Price": 2.0})
+    assert then["ETH-USD"][0] == 100
+    assert store.as_of(50) == {}
+
+def test_full_crawl_to_a_db_output_stores_a_change_only_snapshot(table, tmp_path, monkeypatch):
+    import Crypto_yf
+    header, rows = table
+    polls = [rows, rows, with_price(header, rows, "ETH-USD", "1,900.00")]
+
+    async def fetch_table_page(pool, start, count=crypto_crawl.PAGE_SIZE):
+        page = polls[0][start:start + count]
+        return header, page, len(polls[0])
+
+    monkeypatch.setattr(crypto_crawl, "fetch_table_page", fetch_table_page)
+    path = str(tmp_path / "history.db")
+    for _ in range(3):
+        # `python Crypto_yf.py all history.db`: each poll is one snapshot in the store
+        asyncio.run(Crypto_yf.scrape_yf_all(pool=object(), output=path))
+        polls.pop(0)
+
+    with CryptoStore(path) as store:
+        changes = list(store.changes())
+        stamps = sorted({ts for _, ts, _ in changes})
+        assert len(changes) == len(rows) + 1
+        assert len(stamps) == 2
+        assert [symbol for symbol, ts, _ in changes if ts == stamps[1]] == ["ETH-USD"]
@@ -0,0 +1,147 @@
+import asyncio
+import pytest
+from bs4 import BeautifulSoup
+from field_extraction import ExtractionSpec, compile_selector
+from bloomberg_feed import BASE_URL, STORY_SPEC
+from hktvmall import LAYOUTS
+
+BERKELEY_FIELDS = {
+    "title": ("div.program-grid--title div a p", None),
+    "url": ("div.program-grid--title div a", "href"),
+}
+HKTVMALL = {layout.name: layout.spec for layout in LAYOUTS}
+
+# fixture -> (spec, base URL): every spec a scraper runs in-page, on the page it was written for
+CASES = {
+    "bloomberg_latest.html": (STORY_SPEC, BASE_URL),
+    "berkeley_programs.html": (ExtractionSpec("div.program-grid", BERKELEY_FIELDS), "https://grad.berkeley.edu/"),
+    "hktvmall_search.html": (HKTVMALL["product-brief-wrapper"], "https://www.hktvmall.com/"),
+    "hktvmall_search_bare.html": (HKTVMALL["info-wrapper"], "https://www.hktvmall.com/"),
+    "hktvmall_search_linked.html": (HKTVMALL["linked-info-wrapper"], "https://www.hktvmall.com/"),
+}
+
+def read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def extract_like_browser(spec, html, base_url):
+    """EXTRACT_JS step for step over lexbor, the HTML5 parser and CSS engine selectolax wraps:
+    querySelectorAll/querySelector for css/css_first, getAttribute, textContent for text(deep=True)"""
+    lexbor = pytest.importorskip("selectolax.lexbor")
+    raw_items = []
+    for node in lexbor.LexborHTMLParser(html).css(spec.container):
+        raw = {}
+        for name, (selector, attribute) in spec.fields.items():
+            target = node.css_first(selector) if selector else node
+            if target is None:
+                raw[name] = None
+            elif attribute:
+                raw[name] = target.attributes.get(attribute)
+            else:
+                raw[name] = target.text(deep=True)
+        raw_items.append(raw)
+    return [spec._finish(raw, base_url) for raw in raw_items]
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_offline_extraction_matches_a_browser_dom(fixture_path, name):
+    spec, base_url = CASES[name]
+    html = read(fixture_path(name))
+    expected = extract_like_browser(spec, html, base_url)
+    assert expected
+    assert spec.extract_html(html, base_url) == expected
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_in_page_extraction_matches_offline(fixture_path, name):
+    async_api = pytest.importorskip("playwright.async_api")
+    spec, base_url = CASES[name]
+    html = read(fixture_path(name))
+
+    async def run():
+        async with async_api.async_playwright() as playwright:
+            try:
+                browser = await playwright.chromium.launch()
+            except async_api.Error as e:
+                pytest.skip(f"Chromium is not available: {e}")
+            try:
+                page = await browser.new_page()
+                # Serve the fixture from its own site, so page.url resolves links like the live scraper
+                await page.route(base_url, lambda route: route.fulfill(body=html, content_type="text/html"))
+                await page.goto(base_url)
+                return await spec.extract(page), await spec.extract(page, mark="data-seen"), \
+                    await spec.extract(page, mark="data-seen")
+            finally:
+                await browser.close()
+
+    in_page, marked, remarked = asyncio.run(run())
+    assert in_page == spec.extract_html(html, base_url)
+    # Marking only changes which containers a later call sees
+    assert marked == in_page and remarked == []
+
+SNIPPET = """
+<ul>
+  <li class="item"><a class="x" href="/one">One</a><span data-id="1">first</span></li>
+  <li class="item other"><a href="two">Two</a><span>second</span></li>
+  <li><a class="x" href="https://elsewhere.test/three">Three</a></li>
+</ul>
+"""
+
+def soup():
+    return BeautifulSoup(SNIPPET, "html.parser")
+
+@pytest.mark.parametrize("selector, many, expected", [
+    ("li", False, "One first"),
+    ("li.item", True, ["One first", "Two second"]),
+    ("a.x", True, ["One", "Three"]),
+    ("span[data-id]", True, ["first"]),
+    (".other", False, "Two second"),
+    ("[data-id]", False, "first"),
+    # Not a single step: falls back to soupsieve
+    ("li.item > a", True, ["One", "Two"]),
+    ("li:nth-of-type(3) a", False, "Three"),
+])
+def test_compile_selector_matches_soupsieve(selector, many, expected):
+    find = compile_selector(selector, many=many)
+    text = lambda node: " ".join(node.get_text(" ").split())
+    found = find(soup())
+    assert ([text(node) for node in found] if many else text(found)) == expected
+    select = soup().select(selector) if many else soup().select_one(selector)
+    assert ([text(node) for node in select] if many else text(select)) == expected
+
+def test_compile_selector_returns_none_or_empty_when_nothing_matches():
+    assert compile_selector("p.missing")(soup()) is None
+    assert compile_selector("p.missing", many=True)(soup()) == []
+    assert compile_selector("ul p.missing")(soup()) is None
+
+def test_field_rules():
+    spec = ExtractionSpec("li.item", {
+        "title": ("a", None),
+        "url": ("a", "href"),
+        "id": ("span", "data-id"),
+        "classes": ("", "class"),
+        "missing": ("p", None),
+        "text": ("", None),
+    })
+    items = spec.extract_html(SNIPPET, "https://site.test/list/")
+    # Text is the element's textContent, so adjacent elements run together like in the browser
+    assert items == [
+        {"title": "One", "url": "https://site.test/one", "id": "1", "classes": "item",
+         "missing": None, "text": "Onefirst"},
+        # Relative links resolve against the page; missing attributes stay None
+        {"title": "Two", "url": "https://site.test/list/two", "id": None, "classes": "item other",
+         "missing": None, "text": "Twosecond"},
+    ]
+
+def test_urls_are_left_alone_without_a_base_and_absolute_ones_kept():
+    spec = ExtractionSpec("a.x", {"url": ("", "href")})
+    assert spec.extract_html(SNIPPET) == [{"url": "/one"}, {"url": "https://elsewhere.test/three"}]
+    assert spec.extract_html(SNIPPET, "https://site.test/") == [
+        {"url": "https://site.test/one"}, {"url": "https://elsewhere.test/three"}]
+
+def test_text_is_whitespace_normalised():
+    spec = ExtractionSpec("p", {"text": ("", None)})
+    assert spec.extract_html("<p>\n  Fed   holds\n\t<b>rates</b>  </p>") == [{"text": "Fed holds rates"}]
+
+def test_with_container_keeps_the_fields():
+    spec = STORY_SPEC.with_container("article")
+    assert spec.container == "article"
+    assert spec.fields == STORY_SPEC.fields
@@ -0,0 +1,101 @@
+import gc
+import json
+import weakref
+import pytest
+import requests
+import har_archive
+from har_archive import HarArchive, HarWriter, RecordingDriver, har_session, read_har
+from quotes_crawler import QuotesCrawler
+from conftest import crawl
+
+def test_replay_miss_is_a_transport_error_and_the_crawl_finishes(quotes_server, tmp_path, monkeypatch):
+    monkeypatch.setenv("SCRAPER_HAR_DIR", str(tmp_path))
+    monkeypatch.setenv("SCRAPER_HAR_MODE", "record")
+    recorder = QuotesCrawler(quotes_server, concurrency=4, follow_tags=False, http2=False)
+    recorded = crawl(recorder)
+    assert recorder.errors == 0
+
+    # Tag pages were never recorded: replaying them must fail per page, not kill the workers
+    monkeypatch.setenv("SCRAPER_HAR_MODE", "replay")
+    replayer = QuotesCrawler(quotes_server, concurrency=4, follow_tags=True, http2=False, retry_delay=0)
+    replayed = crawl(replayer)
+    assert replayer.errors > 0
+    main = lambda quotes: sorted((q.text, q.author) for q in quotes if "Main page" in q.text)
+    assert main(replayed) == main(recorded)
+
+def test_requests_replay_miss_raises_connection_error(tmp_path):
+    HarWriter(str(tmp_path / "http-1.har")).close()
+    session = har_session(HarArchive(str(tmp_path), "replay"))
+    with pytest.raises(requests.ConnectionError):
+        session.get("http://localhost/not-recorded")
+
+def test_writer_appends_entries_and_unclosed_files_stay_readable(tmp_path):
+    path = str(tmp_path / "http-1.har")
+    writer = HarWriter(path)
+    for i in range(3):
+        writer.add("GET", f"http://localhost/{i}", {}, 200, "OK", {"Content-Type": "text/plain"},
+                   str(i).encode(), 1.0)
+    # As a crashed run would leave it
+    assert [e["request"]["url"] for e in read_har(path)["log"]["entries"]] == [
+        f"http://localhost/{i}" for i in range(3)]
+    writer.close()
+    with open(path, encoding="utf-8") as f:
+        assert len(json.load(f)["log"]["entries"]) == 3
+
+def test_closed_writers_are_not_kept_for_exit(tmp_path):
+    closed = HarWriter(str(tmp_path / "http-1.har"))
+    closed.add("GET", "http://localhost/", {}, 200, "OK", {}, b"x", 1.0)
+    closed.close()
+    assert closed not in har_archive._open_writers
+    # A writer nobody closes is still collectable, rather than pinned by an exit hook
+    dropped = weakref.ref(HarWriter(str(tmp_path / "http-2.har")))
+    gc.collect()
+    assert dropped() is None
+
+def test_writers_left_open_are_closed_at_exit(tmp_path):
+    path = str(tmp_path / "http-1.har")
+    writer = HarWriter(path)
+    writer.add("GET", "http://localhost/", {}, 200, "OK", {}, b"x", 1.0)
+    har_archive._close_writers()
+    assert writer not in har_archive._open_writers
+    with open(path, encoding="utf-8") as f:
+        assert len(json.load(f)["log"]["entries"]) == 1
+
+class FakeBrowser:
+    """A live WebDriver as far as the Selenium scraper is concerned: `pages` maps URL -> rendered HTML"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.page_source = ""
+        self.quit_calls = 0
+
+    def get(self, url):
+        self.page_source = self.pages[url]
+
+    def quit(self):
+        self.quit_calls += 1
+
+def test_selenium_pages_are_recorded_and_replayed_without_a_browser(fixture_path, tmp_path, monkeypatch):
+    import Selenium_hktvmall
+    from hktvmall import product_names, search_url
+    from html_parsing import make_soup
+    from selenium_pool import DriverPool
+
+    with open(fixture_path("hktvmall_search.html"), encoding="utf-8") as f:
+        html = f.read()
+    url = search_url("iphone")
+    browser = FakeBrowser({url: html})
+    driver = RecordingDriver(browser, HarArchive(str(tmp_path), "record").page_recorder())
+    driver.get(url)
+    assert driver.page_source == html
+    driver.quit()
+    assert browser.quit_calls == 1
+
+    monkeypatch.setattr(Selenium_hktvmall, "throttle_sync", lambda url: None)
+    pool = DriverPool(size=2, har=HarArchive(str(tmp_path), "replay"))
+    results = Selenium_hktvmall.scrape_hktvmall(["iphone", "not-recorded"], pool=pool)
+    pool.close()
+    assert results["iphone"] == product_names(make_soup(html))
+    assert results["iphone"]
+    # Replay is offline: a page that was never recorded fails like a dead connection
+    assert results["not-recorded"] == []
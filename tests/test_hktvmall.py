@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+import pytest
+from urllib.parse import urlparse
+from hktvmall import DOM_PAGE_TYPE, HTML_PAGE_TYPE, PRODUCT_TARGET, product_records, search_layouts
+from html_parsing import available_backends, make_soup
+from selector_cache import default_cache
+
+FIXTURES = {
+    "hktvmall_search.html": "product-brief-wrapper",
+    "hktvmall_search_bare.html": "info-wrapper",
+    "hktvmall_search_linked.html": "linked-info-wrapper",
+}
+
+def records(fixture_path, name, site, backend=None, target=PRODUCT_TARGET):
+    with open(fixture_path(name), "r", encoding="utf-8") as f:
+        html = f.read()
+    return product_records(make_soup(html, target, backend), "iphone", f"http://{site}")
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("name", sorted(FIXTURES))
+def test_strained_parse_matches_full_parse(fixture_path, name, backend):
+    site = f"{name}-{backend}.test"
+    strained = records(fixture_path, name, site, backend)
+    assert len(strained) == 20
+    assert all(p.name and p.price and p.sku for p in strained)
+    assert all(p.url.startswith(f"http://{site}/hktv/en/main/") for p in strained)
+    # A second site key, so the full parse probes for its layout on its own
+    full = records(fixture_path, name, "full." + site, target=None)
+    assert [p._replace(url=urlparse(p.url).path) for p in strained] == [
+        p._replace(url=urlparse(p.url).path) for p in full]
+    assert search_layouts().chosen[site].name == FIXTURES[name]
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("name", sorted(FIXTURES))
+def test_strainer_drops_non_product_links(fixture_path, name, backend):
+    with open(fixture_path(name), "r", encoding="utf-8") as f:
+        html = f.read()
+    soup = make_soup(html, PRODUCT_TARGET, backend)
+    links = soup.find_all("a")
+    # Every kept link is a product link; the page's navigation links are gone
+    assert links and all("/p/" in link["href"] for link in links)
+    assert "nav-link" in html and soup.find("a", class_="nav-link") is None
+    assert len(links) <= 20
+
+def test_offline_layouts_are_cached_apart_from_in_browser_ones(fixture_path):
+    records(fixture_path, "hktvmall_search_linked.html", "linked.test")
+    assert default_cache().get("linked.test", HTML_PAGE_TYPE) == "a:has(> div.info-wrapper)"
+    assert default_cache().get("linked.test", DOM_PAGE_TYPE) is None
+    assert search_layouts(DOM_PAGE_TYPE) is not search_layouts(HTML_PAGE_TYPE)
+
+def test_import_does_not_load_the_selector_cache():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = "import hktvmall, selector_cache; assert selector_cache._default_cache is None"
+    subprocess.run([sys.executable, "-c", code], cwd=root, check=True)
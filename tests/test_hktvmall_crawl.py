@@ -0,0 +1,104 @@
+import asyncio
+from contextlib import asynccontextmanager
+import pytest
+import requests
+from bs4 import BeautifulSoup
+from consent import DISMISS_JS
+from fixture_server import HktvmallSearch, start_server
+from hktvmall import product_records
+from html_parsing import make_soup
+from hktvmall_crawl import crawl_hktvmall
+from layout_strategy import PROBE_JS
+
+class FakePage:
+    """Just enough of a Playwright page for HktvmallCrawler, backed by plain HTTP and bs4"""
+
+    def __init__(self):
+        self.url = "about:blank"
+        self.soup = None
+
+    async def route(self, pattern, handler):
+        pass
+
+    def on(self, event, handler):
+        pass
+
+    async def title(self):
+        return "HKTVmall"
+
+    async def goto(self, url):
+        self.url = url
+        html = await asyncio.to_thread(lambda: requests.get(url, timeout=10).text)
+        self.soup = BeautifulSoup(html, "html.parser")
+
+    async def wait_for_selector(self, selector, timeout=None):
+        if not self.soup.select(selector):
+            raise TimeoutError(selector)
+
+    async def evaluate(self, js, candidates):
+        if js == PROBE_JS:
+            return next((i for i, probe in enumerate(candidates) if self.soup.select_one(probe)), -1)
+        assert js == DISMISS_JS
+        return -1
+
+    async def eval_on_selector_all(self, selector, js, arg):
+        items = []
+        for node in self.soup.select(selector):
+            item = {}
+            for name, (field, attribute) in arg["fields"].items():
+                target = node.select_one(field) if field else node
+                if target is None:
+                    item[name] = None
+                elif attribute:
+                    item[name] = target.get(attribute)
+                else:
+                    item[name] = target.get_text()
+            items.append(item)
+        return items
+
+class FakePool:
+    def __init__(self):
+        self.open = 0
+        self.most_open = 0
+
+    @asynccontextmanager
+    async def page(self):
+        self.open += 1
+        self.most_open = max(self.most_open, self.open)
+        try:
+            yield FakePage()
+        finally:
+            self.open -= 1
+
+def products_on_page(number):
+    """Product records of one stand-in result page, extracted offline"""
+    return product_records(make_soup(HktvmallSearch().render(f"page={number}")), "")
+
+@pytest.fixture
+def search_server():
+    server, base_url = start_server(latency=0.02, search_pages=3)
+    yield base_url
+    server.shutdown()
+
+def test_keywords_are_paginated_concurrently(search_server, tmp_path):
+    per_keyword = sum(len(products_on_page(n)) for n in range(3))
+    pool = FakePool()
+    output = tmp_path / "products.csv"
+    crawler, products = asyncio.run(asyncio.wait_for(crawl_hktvmall(
+        ["iphone", "ipad", "airpods"], pool, str(output), base_url=search_server, concurrency=4), timeout=30))
+
+    assert crawler.errors == 0
+    # Two windows of two pages per keyword: pages 0-2 have cards, the empty page 3 ends the keyword
+    assert crawler.pages == 3 * 4
+    assert len(products) == 3 * per_keyword
+    for keyword in ("iphone", "ipad", "airpods"):
+        skus = [p.sku for p in products if p.keyword == keyword]
+        assert len(skus) == per_keyword == len(set(skus))
+    assert 1 < pool.most_open <= 4
+    assert len(output.read_text(encoding="utf-8").splitlines()) == len(products) + 1
+
+def test_max_pages_stops_each_keyword(search_server):
+    crawler, products = asyncio.run(asyncio.wait_for(crawl_hktvmall(
+        ["iphone", "ipad"], FakePool(), base_url=search_server, max_pages=1), timeout=30))
+    assert crawler.pages == 2
+    assert len(products) == 2 * len(products_on_page(0))
@@ -0,0 +1,76 @@
+import pytest
+import html_parsing
+from html_parsing import ParseTarget, _AnyStrainer, make_soup
+from Beautifulsoup_quotes import QUOTE_TARGET, extract_quotes
+from crypto_crawl import TABLE_TARGET, table_rows
+from field_extraction import ExtractionSpec
+
+BERKELEY_SPEC = ExtractionSpec("div.program-grid", {
+    "title": ("div.program-grid--title div a p", None),
+    "url": ("div.program-grid--title div a", "href"),
+})
+
+# fixture -> (target, extraction run on the parsed soup)
+CASES = {
+    "quotes.html": (QUOTE_TARGET, extract_quotes),
+    "crypto_table.html": (TABLE_TARGET, table_rows),
+    "berkeley_programs.html": (ParseTarget("div", "program-grid"),
+                               lambda soup: BERKELEY_SPEC.extract_html(soup, "https://grad.berkeley.edu")),
+}
+
+# Every backend is tested where it is installed; lexbor and lxml are optional, so missing ones skip
+BACKEND_MODULES = {"lexbor": "selectolax.lexbor", "lxml": "lxml", "html.parser": None}
+
+@pytest.fixture(params=sorted(BACKEND_MODULES))
+def backend(request):
+    if BACKEND_MODULES[request.param]:
+        pytest.importorskip(BACKEND_MODULES[request.param])
+    return request.param
+
+def top_level(soup):
+    """Outermost kept elements (lexbor fragments are re-parsed by lxml, which adds <html><body>)"""
+    return [tag for tag in soup.find_all(True) if tag.parent.name in ("[document]", "html", "body")
+            and tag.name not in ("html", "body")]
+
+def read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_strained_parse_matches_unstrained(fixture_path, name, backend):
+    target, extract = CASES[name]
+    html = read(fixture_path(name))
+    expected = extract(make_soup(html, backend="html.parser"))
+    assert expected
+    assert extract(make_soup(html, target, backend)) == expected
+
+def test_strainer_drops_everything_outside_the_target(fixture_path, backend):
+    soup = make_soup(read(fixture_path("quotes.html")), QUOTE_TARGET, backend)
+    assert soup.find("div", class_="quote")
+    assert soup.find("title") is None and soup.find("footer") is None
+    assert {tag.name for tag in top_level(soup)} == {"div"}
+
+def test_lexbor_keeps_nested_matches_once(backend):
+    html = '<div class="quote">outer <div class="quote">inner</div></div><div class="quote">next</div>'
+    soup = make_soup(html, QUOTE_TARGET, backend)
+    assert [" ".join(div.get_text().split()) for div in top_level(soup)] == ["outer inner", "next"]
+
+def test_wrappers_keep_either_rule(backend):
+    target = ParseTarget("div", "card", wrappers="a")
+    html = ('<nav><p>menu</p></nav><a href="/x"><span>linked</span></a>'
+            '<div class="card">card</div><div class="other">other</div>')
+    soup = make_soup(html, target, backend)
+    assert [tag.name for tag in top_level(soup)] == ["a", "div"]
+    assert soup.a.span.get_text() == "linked"
+    assert soup.find("div", class_="other") is None
+
+def test_any_strainer_is_guarded_by_the_bs4_version(monkeypatch):
+    assert html_parsing.ANY_STRAINER_SUPPORTED
+    assert isinstance(ParseTarget("div", "card", wrappers="a").strainer, _AnyStrainer)
+    # On a bs4 whose strainer internals are unknown, the target falls back to a full parse
+    monkeypatch.setattr(html_parsing, "ANY_STRAINER_SUPPORTED", False)
+    with pytest.warns(RuntimeWarning):
+        target = ParseTarget("div", "card", wrappers="a")
+    assert target.strainer is None
+    soup = make_soup('<p>kept</p><div class="card">card</div>', target, "html.parser")
+    assert soup.p.get_text() == "kept" and soup.find("div", class_="card")
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import os
+import httpx
+import pytest
+import requests
+from http_cache import HttpCache
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+def counting(parse):
+    calls = []
+
+    def wrapped(text):
+        calls.append(text)
+        return parse(text)
+
+    wrapped.cache_key = "counting"
+    return wrapped, calls
+
+def test_revalidates_with_validators_and_skips_parsing(tmp_path, validating_server):
+    url = validating_server + "/page/1/"
+    parse, calls = counting(len)
+    with HttpCache(str(tmp_path)) as cache, requests.Session() as session:
+        first = cache.get(url, session=session, parse=parse)
+        assert first.source == "network"
+        assert cache.conditional_headers(url).keys() == {"If-None-Match", "If-Modified-Since"}
+
+        second = cache.get(url, session=session, parse=parse)
+        assert second.source == "revalidated"
+        assert second.parsed == first.parsed
+        assert second.text == first.text
+        # The 304 reused the stored parse result
+        assert len(calls) == 1
+        assert (cache.misses, cache.revalidated, cache.hits) == (1, 1, 0)
+
+def test_max_age_serves_fresh_entries_without_a_request(tmp_path):
+    from fixture_server import start_server
+    server, base_url = start_server(validators=True, max_age=60)
+    clock = Clock()
+    try:
+        with HttpCache(str(tmp_path), clock=clock) as cache:
+            url = base_url + "/page/2/"
+            assert cache.get(url).source == "network"
+            clock.now += 30
+            assert cache.get(url).source == "cache"
+            clock.now += 60
+            assert cache.get(url).source == "revalidated"
+            assert (cache.misses, cache.hits, cache.revalidated) == (1, 1, 1)
+    finally:
+        server.shutdown()
+
+def test_304_without_cache_control_keeps_no_cache(tmp_path):
+    def handle(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, text="<p>hi</p>",
+                              headers={"ETag": '"v1"', "Cache-Control": "no-cache, max-age=600"})
+
+    async def fetch_three(cache):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handle)) as client:
+            return [(await cache.aget(client, "http://localhost/a")).source for _ in range(3)]
+
+    with HttpCache(str(tmp_path)) as cache:
+        # no-cache survives the bare 304s, so every use is revalidated, never served unchecked
+        assert asyncio.run(fetch_three(cache)) == ["network", "revalidated", "revalidated"]
+
+def test_304_with_cache_control_replaces_directives(tmp_path):
+    clock = Clock()
+
+    def handle(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"Cache-Control": "max-age=600"})
+        return httpx.Response(200, text="<p>hi</p>", headers={"ETag": '"v1"', "Cache-Control": "no-cache"})
+
+    async def fetch(cache):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handle)) as client:
+            sources = [(await cache.aget(client, "http://localhost/a")).source for _ in range(2)]
+            clock.now += 10
+            sources.append((await cache.aget(client, "http://localhost/a")).source)
+            return sources
+
+    with HttpCache(str(tmp_path), clock=clock) as cache:
+        assert asyncio.run(fetch(cache)) == ["network", "revalidated", "cache"]
+
+def test_lru_eviction_drops_the_least_recently_used_entry(tmp_path, validating_server):
+    page = lambda n: f"{validating_server}/page/{n}/"
+    # Room for two ~35 KB pages
+    with HttpCache(str(tmp_path), max_bytes=80_000) as cache:
+        cache.get(page(1))
+        cache.get(page(2))
+        assert cache.get(page(1)).source == "revalidated"
+        cache.get(page(3))
+        assert cache.evictions == 1
+        assert cache.conditional_headers(page(2)) == {}
+        assert cache.conditional_headers(page(1)) and cache.conditional_headers(page(3))
+        assert cache.stats()["size"] <= 80_000
+
+def test_parse_results_need_a_version_key(tmp_path):
+    with HttpCache(str(tmp_path)) as cache:
+        with pytest.raises(ValueError):
+            cache.get("http://localhost/a", parse=len)
+
+def test_stale_parse_results_are_not_reused_after_parser_change(tmp_path, validating_server):
+    url = validating_server + "/page/1/"
+    with HttpCache(str(tmp_path)) as cache:
+        assert cache.get(url, parse=lambda text: "old", parse_key="quotes:v1").parsed == "old"
+        response = cache.get(url, parse=lambda text: "new", parse_key="quotes:v2")
+        assert response.source == "revalidated"
+        assert response.parsed == "new"
+
+def test_parse_results_are_stored_as_json(tmp_path, validating_server):
+    url = validating_server + "/page/1/"
+    parse = lambda text: {"pair": ("a", 1)}
+    with HttpCache(str(tmp_path)) as cache:
+        first = cache.get(url, parse=parse, parse_key="pairs:v1")
+        (parsed_file,) = [name for name in os.listdir(str(tmp_path)) if name.endswith(".parsed")]
+        with open(os.path.join(str(tmp_path), parsed_file), "r", encoding="utf-8") as f:
+            assert json.load(f) == {"pair": ["a", 1]}
+        # Parsed now or read back, callers see the same JSON shape
+        assert first.parsed == {"pair": ["a", 1]}
+        assert cache.get(url, parse=parse, parse_key="pairs:v1").parsed == first.parsed
+
+def stored_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith((".body", ".parsed")))
+
+def test_304_with_no_store_drops_the_entry(tmp_path):
+    def handle(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"Cache-Control": "no-store"})
+        return httpx.Response(200, text="<p>hi</p>", headers={"ETag": '"v1"'})
+
+    async def fetch(cache):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handle)) as client:
+            return [await cache.aget(client, "http://localhost/a", parse=len, parse_key="len")
+                    for _ in range(3)]
+
+    with HttpCache(str(tmp_path)) as cache:
+        responses = asyncio.run(fetch(cache))
+        # The 304 is still answered from the stored body, but nothing is revalidated after it
+        assert [r.source for r in responses] == ["network", "revalidated", "network"]
+        assert responses[1].text == "<p>hi</p>" and responses[1].parsed == len("<p>hi</p>")
+        assert cache.conditional_headers("http://localhost/a") == {"If-None-Match": '"v1"'}
+        assert cache.stats()["entries"] == 1
+
+def test_200_without_validators_drops_the_old_entry(tmp_path):
+    answers = [{"ETag": '"v1"'}, {}]
+
+    def handle(request):
+        return httpx.Response(200, text="<p>hi</p>", headers=answers.pop(0))
+
+    async def fetch(cache):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handle)) as client:
+            first = await cache.aget(client, "http://localhost/a", parse=len, parse_key="len")
+            files = stored_files(str(tmp_path))
+            # The page changed: the conditional request gets a full 200, this time without validators
+            second = await cache.aget(client, "http://localhost/a", parse=len, parse_key="len")
+            return first, files, second
+
+    with HttpCache(str(tmp_path)) as cache:
+        first, files, second = asyncio.run(fetch(cache))
+        assert len(files) == 2
+        assert second.source == "network"
+        # Neither the body nor the parse result of the first response is left to be revalidated
+        assert stored_files(str(tmp_path)) == []
+        assert cache.conditional_headers("http://localhost/a") == {}
+        assert cache.stats()["entries"] == 0
@@ -0,0 +1,83 @@
+import asyncio
+import json
+import telemetry
+from network_policy import ESTIMATED_BYTES_BY_TYPE, NetworkPolicy
+from telemetry import RunTelemetry
+
+class FakeRequest:
+    def __init__(self, url, resource_type):
+        self.url = url
+        self.resource_type = resource_type
+
+class FakeRoute:
+    def __init__(self, url, resource_type):
+        self.request = FakeRequest(url, resource_type)
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = "aborted"
+
+    async def fallback(self):
+        self.outcome = "fallback"
+
+class FakePage:
+    def __init__(self):
+        self.handler = None
+        self.listeners = {}
+
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+    def on(self, event, callback):
+        self.listeners[event] = callback
+
+REQUESTS = [
+    ("https://www.example.com/", "document"),
+    ("https://www.example.com/app.js", "script"),
+    ("https://www.example.com/logo.png", "image"),
+    ("https://stats.g.doubleclick.net/ad.js", "script"),
+    ("https://cdn.example.com/font.woff2", "font"),
+]
+
+def browse(policy, page):
+    async def run():
+        stats = await policy.attach(page, "https://www.example.com/", report=False)
+        routes = [FakeRoute(url, kind) for url, kind in REQUESTS]
+        for route in routes:
+            await page.handler(route)
+        return stats, routes
+    return asyncio.run(run())
+
+def test_blocked_counts_lead_and_the_saving_is_labelled_an_estimate():
+    stats, routes = browse(NetworkPolicy(), FakePage())
+    assert [route.outcome for route in routes] == ["fallback", "fallback", "aborted", "aborted", "aborted"]
+    assert stats.requests_blocked == 3 and stats.requests_allowed == 2
+    summary = stats.summary()
+    assert summary.startswith("Network: 3 requests blocked [deny-list=1, type:font=1, type:image=1]")
+    assert "estimated" in summary and "not measured" in summary
+
+def test_network_stats_are_written_with_the_run(tmp_path):
+    run = RunTelemetry("example", "example.com", directory=str(tmp_path))
+    token = telemetry._current_run.set(run)
+    try:
+        for _ in range(2):
+            browse(NetworkPolicy(), FakePage())
+    finally:
+        telemetry._current_run.reset(token)
+    run.finish()
+
+    record = telemetry.load_runs(str(tmp_path / telemetry.SPANS_FILE))[-1]
+    assert record["network"] == {
+        "requests_blocked": 6, "requests_allowed": 4, "bytes_loaded": 0,
+        "blocked_by_reason": {"type:image": 2, "deny-list": 2, "type:font": 2},
+        "bytes_saved_estimate": 2 * sum(ESTIMATED_BYTES_BY_TYPE[kind] for kind in ("image", "script", "font")),
+    }
+    with open(tmp_path / telemetry.PROM_FILE, encoding="utf-8") as f:
+        prom = f.read()
+    assert 'scraper_run_last_requests_blocked{scraper="example",site="example.com"} 6' in prom
+    assert "scraper_run_last_bytes_saved_estimate" in prom and "not measured" in prom
+
+def test_runs_without_a_policy_have_no_network_record(tmp_path):
+    run = RunTelemetry("example", "example.com", directory=str(tmp_path))
+    run.finish()
+    assert "network" not in telemetry.load_runs(str(tmp_path / telemetry.SPANS_FILE))[-1]
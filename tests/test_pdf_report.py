@@ -0,0 +1,112 @@
+import os
+import pytest
+from pypdf import PdfReader
+from reportlab.platypus import Spacer
+import pdf_report
+from pdf_report import StreamingReportWriter, daily_report_path, stories_since_update, write_pdf_report
+from story_records import Story
+
+def test_writes_numbered_stories(tmp_path):
+    path = str(tmp_path / "report.pdf")
+    stories = [Story(f"Story {i}", "2024-05-01 18:00 UTC", None, None) for i in range(1, 61)]
+    assert write_pdf_report(stories, path) == 60
+    text = "".join(page.extract_text() for page in PdfReader(path).pages)
+    assert "60. Story 60" in text
+
+def test_appending_continues_numbering(tmp_path):
+    path = str(tmp_path / "report.pdf")
+    write_pdf_report([Story("First", None, None, None)], path)
+    assert write_pdf_report([Story("Second", None, None, None)], path, append=True) == 1
+    reader = PdfReader(path)
+    assert reader.metadata["/Subject"] == "stories=2"
+    assert "2. Second" in "".join(page.extract_text() for page in reader.pages)
+
+def test_title_longer_than_a_page_is_split_across_pages(tmp_path):
+    path = str(tmp_path / "report.pdf")
+    title = " ".join(["word"] * 4000)
+    assert write_pdf_report([Story(title, None, None, None), Story("After", None, None, None)], path) == 2
+    pages = PdfReader(path).pages
+    assert len(pages) > 2
+    # Every page carries text: no blank pages were emitted while the title did not fit
+    assert all(page.extract_text().strip() for page in pages)
+    assert "2. After" in pages[-1].extract_text()
+
+def test_unsplittable_item_taller_than_a_page_raises(tmp_path):
+    writer = StreamingReportWriter(str(tmp_path / "report.pdf"))
+    with pytest.raises(ValueError):
+        writer._draw([Spacer(1, 2000)])
+
+def test_chunked_report_matches_single_chunk(tmp_path):
+    stories = [Story(f"Story {i}", "2024-05-01 18:00 UTC", None, None) for i in range(1, 61)]
+    whole = str(tmp_path / "whole.pdf")
+    chunked = str(tmp_path / "chunked.pdf")
+    write_pdf_report(stories, whole)
+    with StreamingReportWriter(chunked, chunk_pages=1) as writer:
+        writer.write_all(stories)
+        assert len(writer.parts) > 2
+    # Every part was merged into the report and removed
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["chunked.pdf", "whole.pdf"]
+    reader = PdfReader(chunked, strict=True)
+    assert reader.metadata["/Subject"] == "stories=60"
+    assert reader.metadata["/Title"] == "Bloomberg Latest News Report"
+    texts = [page.extract_text() for page in reader.pages]
+    assert texts == [page.extract_text() for page in PdfReader(whole).pages]
+
+def test_appending_to_a_chunked_report(tmp_path):
+    path = str(tmp_path / "report.pdf")
+    with StreamingReportWriter(path, chunk_pages=1) as writer:
+        writer.write_all(Story(f"Story {i}", None, None, None) for i in range(1, 41))
+    pages = len(PdfReader(path).pages)
+    with StreamingReportWriter(path, append=True, chunk_pages=1) as writer:
+        writer.write_all(Story(f"Later {i}", None, None, None) for i in range(1, 41))
+    reader = PdfReader(path, strict=True)
+    assert reader.metadata["/Subject"] == "stories=80"
+    assert len(reader.pages) > pages
+    text = "".join(page.extract_text() for page in reader.pages)
+    assert "40. Story 40" in text and "80. Later 40" in text
+    assert text.index("40. Story 40") < text.index("41. Later 1")
+
+def failing_stories(count):
+    for i in range(1, count + 1):
+        yield Story(f"Story {i}", None, None, None)
+    raise RuntimeError("scrape failed")
+
+@pytest.mark.parametrize("append", [False, True])
+def test_a_failed_run_leaves_the_report_untouched(tmp_path, append):
+    path = tmp_path / "report.pdf"
+    write_pdf_report([Story("Earlier", None, None, None)], str(path))
+    before = path.read_bytes()
+    with pytest.raises(RuntimeError):
+        with StreamingReportWriter(str(path), append=append, chunk_pages=1) as writer:
+            writer.write_all(failing_stories(40))
+    assert path.read_bytes() == before
+    assert [p.name for p in tmp_path.iterdir()] == ["report.pdf"]
+
+def test_a_failed_incremental_update_is_cut_off(tmp_path, monkeypatch):
+    path = tmp_path / "report.pdf"
+    write_pdf_report([Story("Earlier", None, None, None)], str(path))
+    before = path.read_bytes()
+    real_copy = pdf_report._copy_object
+    copied = []
+
+    def copy_then_fail(value, renumber, parent):
+        copied.append(value)
+        if len(copied) > 3:
+            raise OSError("disk full")
+        return real_copy(value, renumber, parent)
+
+    monkeypatch.setattr(pdf_report, "_copy_object", copy_then_fail)
+    with pytest.raises(OSError):
+        write_pdf_report([Story("Later", None, None, None)], str(path), append=True)
+    assert path.read_bytes() == before
+    assert [p.name for p in tmp_path.iterdir()] == ["report.pdf"]
+
+def test_daily_report_only_gets_stories_newer_than_its_last_update(tmp_path):
+    path = str(tmp_path / daily_report_path())
+    old, new = Story("Old", None, None, 1_000.0), Story("New", None, None, 3_000.0)
+    undated = Story("Undated", None, None, None)
+    # The first run of the day writes everything
+    assert stories_since_update([old, new, undated], path) == [old, new, undated]
+    write_pdf_report([old, undated], path)
+    os.utime(path, (2_000, 2_000))
+    assert stories_since_update([old, new, undated], path) == [new]
@@ -0,0 +1,91 @@
+import httpx
+import quotes_crawler
+from quotes_crawler import QuotesCrawler
+from conftest import BASE_URL, crawl, mock_site
+
+def test_crawls_pagination_authors_and_tags_against_stand_in_server(quotes_server):
+    crawler = QuotesCrawler(quotes_server, concurrency=4)
+    quotes = crawl(crawler)
+    assert crawler.errors == 0
+    # 10 listing pages of 10 quotes; tag pages repeat quotes but add their own texts
+    main = [q for q in quotes if "Main page" in q.text]
+    assert len(main) == 100
+    assert len({(q.text, q.author) for q in quotes}) == len(quotes)
+    assert {a.name for a in crawler.authors} >= {"Albert Einstein", "Jane Austen"}
+    assert len(crawler.authors) == len({a.url for a in crawler.authors})
+
+def test_every_url_is_fetched_once():
+    transport, attempts = mock_site()
+    crawler = QuotesCrawler(BASE_URL, transport=transport, http2=False)
+    crawl(crawler)
+    assert attempts
+    assert set(attempts.values()) == {1}
+    assert crawler.pages == len(attempts)
+
+def test_max_pages_limits_the_crawl():
+    transport, attempts = mock_site()
+    crawler = QuotesCrawler(BASE_URL, transport=transport, http2=False, max_pages=2)
+    crawl(crawler)
+    assert crawler.pages == 2
+
+def test_transient_errors_are_retried():
+    def fail(request, attempt):
+        if request.url.path == "/page/2/" and attempt == 1:
+            raise httpx.ConnectError("connection reset", request=request)
+        if request.url.path == "/page/3/" and attempt < 3:
+            return httpx.Response(500, text="busy")
+
+    transport, attempts = mock_site(fail)
+    crawler = QuotesCrawler(BASE_URL, transport=transport, http2=False, retry_delay=0, follow_authors=False,
+                            follow_tags=False)
+    quotes = crawl(crawler)
+    assert crawler.errors == 0
+    assert crawler.retried == 3
+    assert attempts["/page/3/"] == 3
+    assert len(quotes) == 30
+
+def test_pages_that_keep_failing_are_counted_and_the_crawl_finishes():
+    def fail(request, attempt):
+        if request.url.path == "/page/2/":
+            raise httpx.ConnectError("refused", request=request)
+
+    transport, attempts = mock_site(fail)
+    crawler = QuotesCrawler(BASE_URL, transport=transport, http2=False, retry_delay=0, retries=1,
+                            follow_authors=False, follow_tags=False)
+    crawl(crawler)
+    # Page 2 never loads, so its Next link is never seen either
+    assert attempts["/page/2/"] == 2
+    assert crawler.errors == 1
+    assert crawler.pages == 1
+
+def test_parse_errors_are_counted(monkeypatch):
+    real_parse = quotes_crawler.parse_page
+
+    def parse_page(html, url):
+        if "/author/" in url:
+            raise ValueError("unexpected markup")
+        return real_parse(html, url)
+
+    monkeypatch.setattr(quotes_crawler, "parse_page", parse_page)
+    transport, _ = mock_site(pages=2)
+    crawler = QuotesCrawler(BASE_URL, transport=transport, http2=False, follow_tags=False)
+    quotes = crawl(crawler)
+    assert len(quotes) == 20
+    assert crawler.authors == []
+    # Only the two listing pages parsed; every author page is an error and nothing else
+    assert crawler.pages == 2
+    assert crawler.errors == len(crawler.seen_urls) - 2
+    assert crawler.errors > 0
+
+def test_unexpected_worker_errors_do_not_hang_the_crawl(monkeypatch):
+    transport, _ = mock_site(pages=2)
+    crawler = QuotesCrawler(BASE_URL, transport=transport, http2=False, follow_authors=False, follow_tags=False)
+
+    async def refuse(url, limiter=None):
+        if url.endswith("/page/2/"):
+            raise PermissionError("robots.txt disallows " + url)
+
+    monkeypatch.setattr(quotes_crawler, "throttle", refuse)
+    crawl(crawler)
+    assert crawler.errors == 1
+    assert crawler.pages == 1
@@ -0,0 +1,136 @@
+import threading
+import time
+from urllib.robotparser import RobotFileParser
+import pytest
+import rate_limit
+from quotes_crawler import QuotesCrawler
+from rate_limit import RateLimiter, RobotsCache, RobotsDisallowed, TokenBucket
+from conftest import BASE_URL, crawl, mock_site
+
+class FakeRobots(RobotsCache):
+    """RobotsCache serving robots.txt text per host instead of fetching it; `delays` slows chosen hosts"""
+
+    def __init__(self, rules, delays=None):
+        super().__init__()
+        self.rules = rules
+        self.delays = delays or {}
+
+    def _fetch(self, robots_url):
+        self.fetches += 1
+        time.sleep(self.delays.get(robots_url, 0))
+        parser = RobotFileParser(robots_url)
+        parser.parse(self.rules.get(robots_url, "").splitlines())
+        parser.modified()
+        parser.fetched = self.clock()
+        return parser
+
+def limiter(rules, mode="strict", delays=None):
+    # No per-host limits: localhost gets a (fast) budget, so its robots.txt is consulted
+    return RateLimiter(rate=1000.0, burst=1000, limits={}, robots=FakeRobots(rules, delays), robots_mode=mode)
+
+def test_strict_mode_refuses_disallowed_urls():
+    strict = limiter({"http://localhost/robots.txt": "User-agent: *\nDisallow: /private/"})
+    strict.acquire_sync("http://localhost/page/1/")
+    with pytest.raises(RobotsDisallowed):
+        strict.acquire_sync("http://localhost/private/1/")
+    warn = limiter({"http://localhost/robots.txt": "User-agent: *\nDisallow: /private/"}, mode="warn")
+    warn.acquire_sync("http://localhost/private/1/")
+    assert warn.robots.fetches == 1
+
+def test_strict_mode_refusals_are_counted_and_the_crawl_finishes(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_default_limiter",
+                        limiter({"http://localhost/robots.txt": "User-agent: *\nDisallow: /page/2/"}))
+    transport, attempts = mock_site(pages=3)
+    crawler = QuotesCrawler(BASE_URL, transport=transport, http2=False, follow_authors=False, follow_tags=False)
+    crawl(crawler)
+    # Page 2 is refused before any request, so page 3 is never discovered
+    assert crawler.errors == 1
+    assert crawler.pages == 1
+    assert "/page/2/" not in attempts
+
+def test_slow_robots_fetch_does_not_block_other_hosts():
+    slow_url = "http://slow.example/robots.txt"
+    robots = limiter({}, delays={slow_url: 1.0}).robots
+    thread = threading.Thread(target=robots.get_sync, args=("http://slow.example/a",))
+    thread.start()
+    time.sleep(0.1)
+    start = time.perf_counter()
+    robots.get_sync("http://fast.example/a")
+    assert time.perf_counter() - start < 0.5
+    thread.join()
+
+def test_concurrent_lookups_for_one_host_share_a_fetch():
+    robots = limiter({}, delays={"http://example.com/robots.txt": 0.2}).robots
+    threads = [threading.Thread(target=robots.get_sync, args=(f"http://example.com/{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert robots.fetches == 1
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def bucket(rate=2.0, burst=3):
+    clock = FakeClock()
+    return TokenBucket(rate, burst, clock=clock), clock
+
+def test_burst_is_free_then_requests_queue_at_the_rate():
+    tokens, _ = bucket(rate=2.0, burst=3)
+    # Callers queue behind each other's reservations, half a second apart
+    assert [tokens.reserve() for _ in range(6)] == [0.0, 0.0, 0.0, 0.5, 1.0, 1.5]
+
+def test_tokens_refill_at_the_rate_up_to_the_burst():
+    tokens, clock = bucket(rate=2.0, burst=3)
+    for _ in range(3):
+        tokens.reserve()
+    clock.now = 1.0
+    assert [tokens.reserve() for _ in range(3)] == [0.0, 0.0, 0.5]
+    # A long idle spell never banks more than `burst` tokens
+    clock.now = 100.0
+    assert [tokens.reserve() for _ in range(4)] == [0.0, 0.0, 0.0, 0.5]
+
+def test_penalize_halves_the_rate_and_empties_the_bucket_for_the_cooldown():
+    tokens, _ = bucket(rate=2.0, burst=3)
+    tokens.penalize(cooldown=10.0)
+    assert tokens.rate == 1.0 and tokens.penalties == 1
+    # Nothing goes out until the cooldown has passed
+    assert tokens.reserve() == pytest.approx(11.0)
+    # A second penalty halves again, down to min_rate at most
+    tokens.penalize(cooldown=10.0, min_rate=0.6)
+    assert tokens.rate == 0.6
+
+def test_rate_doubles_back_every_cooldown_until_normal():
+    tokens, clock = bucket(rate=2.0, burst=3)
+    tokens.penalize(cooldown=10.0)
+    tokens.penalize(cooldown=10.0)
+    assert tokens.rate == 0.5
+    clock.now = 5.0
+    tokens.reserve()
+    assert tokens.rate == 0.5
+    clock.now = 10.0
+    tokens.reserve()
+    assert tokens.rate == 1.0
+    clock.now = 20.0
+    tokens.reserve()
+    assert tokens.rate == 2.0 and tokens.recover_at is None
+    # Back to normal: no further doubling past the configured rate
+    clock.now = 40.0
+    tokens.reserve()
+    assert tokens.rate == 2.0
+
+def test_configure_keeps_a_penalty_in_force():
+    tokens, clock = bucket(rate=2.0, burst=3)
+    tokens.penalize(cooldown=10.0)
+    tokens.configure(4.0, 5)
+    assert tokens.rate == 1.0 and tokens.base_rate == 4.0
+    clock.now = 10.0
+    tokens.reserve()
+    assert tokens.rate == 2.0
+    clock.now = 20.0
+    tokens.reserve()
+    assert tokens.rate == 4.0
@@ -0,0 +1,135 @@
+import asyncio
+import random
+from scheduler import FakeClock, Scheduler
+
+def make_scheduler(concurrency=3, seed=1):
+    clock = FakeClock()
+    return Scheduler(concurrency=concurrency, clock=clock, rng=random.Random(seed)), clock
+
+def run_until(scheduler, clock, end):
+    """run_forever() in virtual time until the clock reaches `end`"""
+    async def main():
+        stop = asyncio.Event()
+
+        async def stopper():
+            while clock.now() < end:
+                await asyncio.sleep(0)
+            stop.set()
+
+        task = asyncio.ensure_future(stopper())
+        await scheduler.run_forever(stop, status_every=end)
+        await task
+
+    asyncio.run(asyncio.wait_for(main(), timeout=10))
+
+async def settle():
+    # Started jobs run under wait_for, which takes a few loop turns to reach the job itself
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+def recorder(clock, starts, duration=0):
+    async def job(pool):
+        starts.append(clock.now())
+        clock.advance(duration)
+    return job
+
+def test_runs_every_interval_without_jitter():
+    scheduler, clock = make_scheduler()
+    starts = []
+    scheduler.add("job", recorder(clock, starts), interval=100, jitter=0, first_run=0)
+    run_until(scheduler, clock, 1000)
+    assert starts[:10] == [n * 100.0 for n in range(10)]
+
+def test_jitter_moves_runs_within_its_fraction_of_the_interval():
+    scheduler, clock = make_scheduler()
+    starts = []
+    scheduler.add("job", recorder(clock, starts), interval=100, jitter=0.1, first_run=0)
+    run_until(scheduler, clock, 2000)
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert len(gaps) >= 15
+    # Each run is placed relative to its own due time, so gaps stay within two jitters of the interval
+    assert all(80 <= gap <= 120 for gap in gaps)
+    assert len(set(gaps)) > 1
+
+def test_overrunning_job_skips_missed_occurrences_instead_of_overlapping():
+    scheduler, clock = make_scheduler()
+    starts = []
+    active = []
+
+    async def slow(pool):
+        active.append(1)
+        assert len(active) == 1
+        starts.append(clock.now())
+        clock.advance(250)
+        await asyncio.sleep(0)
+        active.pop()
+
+    job = scheduler.add("slow", slow, interval=100, jitter=0, first_run=0)
+    run_until(scheduler, clock, 1000)
+    assert starts[:4] == [0.0, 300.0, 600.0, 900.0]
+    assert job.skipped >= 2 * (len(starts) - 1)
+
+def test_concurrency_caps_running_jobs_and_queues_the_rest():
+    async def main():
+        scheduler, clock = make_scheduler(concurrency=2)
+        release = asyncio.Event()
+        started = []
+
+        def blocking(name):
+            async def job(pool):
+                started.append(name)
+                await release.wait()
+            return job
+
+        for name in "abcde":
+            scheduler.add(name, blocking(name), interval=100, jitter=0, first_run=0)
+        await scheduler.tick()
+        await settle()
+        assert started == ["a", "b"]
+        assert scheduler.status()["queue_depth"] == 3
+
+        # Due again while queued or running: never queued a second time
+        clock.advance(150)
+        await scheduler.tick()
+        assert scheduler.status()["queue_depth"] == 3
+
+        release.set()
+        await asyncio.gather(*scheduler.running.values())
+        await scheduler.tick()
+        await settle()
+        assert started == ["a", "b", "c", "d"]
+        await asyncio.gather(*scheduler.running.values())
+        await scheduler.tick()
+        await asyncio.gather(*scheduler.running.values())
+        assert started == list("abcde")
+        assert max(job.max_lag for job in scheduler.jobs.values()) == 150
+
+    asyncio.run(asyncio.wait_for(main(), timeout=10))
+
+def test_hung_job_times_out_and_frees_its_slot():
+    async def main():
+        scheduler, clock = make_scheduler(concurrency=1)
+
+        async def hang(pool):
+            await asyncio.Event().wait()
+
+        job = scheduler.add("hang", hang, interval=100, jitter=0, first_run=0, timeout=0.05)
+        await scheduler.tick()
+        await asyncio.gather(*scheduler.running.values())
+        assert (job.runs, job.failures, job.timeouts, job.last_status) == (1, 1, 1, "timeout")
+        assert not scheduler.running
+        assert job.next_run == 100
+
+    asyncio.run(asyncio.wait_for(main(), timeout=10))
+
+def test_failing_job_is_counted_and_rescheduled():
+    scheduler, clock = make_scheduler()
+
+    async def broken(pool):
+        raise RuntimeError("site down")
+
+    job = scheduler.add("broken", broken, interval=100, jitter=0, first_run=0)
+    run_until(scheduler, clock, 350)
+    assert job.runs == job.failures >= 3
+    assert job.last_status == "error"
+    assert job.timeouts == 0
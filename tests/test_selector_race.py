@@ -0,0 +1,85 @@
+import asyncio
+import time
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from selector_cache import SelectorCache
+from selector_race import discover_selector, race_selectors, reject_selector
+
+class FakePage:
+    """A page where each selector starts matching `count` nodes `at` seconds after it was created"""
+
+    url = "https://news.test/latest"
+
+    def __init__(self, appear):
+        self.appear = appear
+        self.start = time.monotonic()
+
+    def counts(self, selectors):
+        now = time.monotonic() - self.start
+        counts = [self.appear[s][1] if s in self.appear and now >= self.appear[s][0] else 0 for s in selectors]
+        return counts if any(counts) else None
+
+    async def wait_for_function(self, js, arg, timeout):
+        deadline = time.monotonic() + timeout / 1000
+        while True:
+            counts = self.counts(arg["selectors"])
+            if counts is not None:
+                return FakeHandle(counts)
+            if time.monotonic() >= deadline:
+                raise PlaywrightTimeoutError("timeout")
+            await asyncio.sleep(0.005)
+
+class FakeHandle:
+    def __init__(self, value):
+        self.value = value
+
+    async def json_value(self):
+        return self.value
+
+SELECTORS = ["div.story", "article", "[class*='story']"]
+
+def race(appear, **options):
+    return asyncio.run(race_selectors(FakePage(appear), SELECTORS, **options))
+
+def test_earlier_candidate_within_grace_wins():
+    # The generic fallback renders first; the specific container follows 50 ms later
+    winner, counts = race({"[class*='story']": (0, 30), "div.story": (0.05, 12)}, grace=300)
+    assert winner == "div.story"
+    assert counts["div.story"] == 12
+
+def test_fallback_wins_when_nothing_better_renders():
+    start = time.monotonic()
+    winner, _ = race({"[class*='story']": (0, 30)}, grace=100)
+    assert winner == "[class*='story']"
+    assert time.monotonic() - start < 1
+
+def test_first_candidate_resolves_without_grace_wait():
+    start = time.monotonic()
+    winner, _ = race({"div.story": (0, 12), "article": (0.05, 3)}, grace=2000)
+    assert winner == "div.story"
+    assert time.monotonic() - start < 1
+
+def test_timeout_returns_no_winner():
+    winner, counts = race({}, timeout=50)
+    assert winner is None
+    assert set(counts.values()) == {0}
+
+def test_rejected_selector_is_forgotten_and_counted_as_miss():
+    cache = SelectorCache(path="")
+    page = FakePage({"article": (0, 5)})
+    winner, _, hit = asyncio.run(discover_selector(page, SELECTORS, "latest", cache=cache))
+    assert (winner, hit) == ("article", False)
+    winner, _, hit = asyncio.run(discover_selector(page, SELECTORS, "latest", cache=cache))
+    assert (winner, hit) == ("article", True)
+
+    # The articles turned out to hold no stories
+    reject_selector(page, winner, "latest", hit, cache=cache)
+    entry = cache.stats()["news.test|latest"]
+    assert entry["selector"] is None
+    assert (entry["hits"], entry["misses"]) == (0, 2)
+    assert cache.ordered("news.test", "latest", SELECTORS) == SELECTORS
+
+def test_reject_ignores_a_selector_that_is_not_remembered():
+    cache = SelectorCache(path="")
+    cache.record("news.test", "latest", "div.story")
+    assert not cache.reject("news.test", "latest", "article")
+    assert cache.get("news.test", "latest") == "div.story"
@@ -0,0 +1,100 @@
+import pytest
+from selenium_pool import DriverPool
+
+class FakeDriver:
+    def __init__(self, number):
+        self.number = number
+        self.quit_calls = 0
+
+    def quit(self):
+        self.quit_calls += 1
+
+class FakePool(DriverPool):
+    """DriverPool that hands out FakeDrivers instead of launching Chrome"""
+
+    def _launch(self):
+        return FakeDriver(self.drivers_created)
+
+def test_drivers_are_reused():
+    with FakePool(size=2) as pool:
+        assert pool.map(lambda driver, item: item * 2, range(6)) == [0, 2, 4, 6, 8, 10]
+    assert pool.checkouts == 6
+    assert pool.drivers_created <= 2
+
+def test_a_driver_that_raised_is_quit_and_replaced():
+    pool = FakePool(size=1)
+    used = []
+
+    def search(driver, item):
+        used.append(driver)
+        if item == "bad":
+            raise RuntimeError("page crashed")
+        return item
+
+    results = pool.map(search, ["ok", "bad", "ok"], on_error=lambda item, e: f"failed: {e}")
+    assert results == ["ok", "failed: page crashed", "ok"]
+    assert used[1].quit_calls == 1
+    assert used[2] is not used[1]
+    assert pool.drivers_created == 2
+    pool.close()
+
+def test_errors_propagate_without_on_error():
+    pool = FakePool(size=1)
+    with pytest.raises(ZeroDivisionError):
+        pool.map(lambda driver, item: 1 / item, [1, 0])
+    pool.close()
+
+def test_close_quits_checked_out_drivers():
+    pool = FakePool(size=2)
+    idle = pool.checkout()
+    busy = pool.checkout()
+    pool.checkin(idle)
+    pool.close()
+    assert idle.quit_calls == 1
+    assert busy.quit_calls == 1
+    # Handing it back after close neither pools it again nor quits it a second time
+    pool.checkin(busy)
+    assert pool._idle == []
+    assert busy.quit_calls == 1
+
+def test_driver_checked_out_after_close_is_quit_once_on_checkin():
+    pool = FakePool(size=1)
+    pool.close()
+    late = pool.checkout()
+    pool.checkin(late)
+    assert late.quit_calls == 1
+    assert pool._idle == []
+
+def test_failed_launches_are_not_checkouts():
+    class FlakyPool(FakePool):
+        def _launch(self):
+            if self.drivers_created == 0 and not getattr(self, "failed", False):
+                self.failed = True
+                raise RuntimeError("chrome did not start")
+            return super()._launch()
+
+    pool = FlakyPool(size=1)
+    with pytest.raises(RuntimeError):
+        pool.checkout()
+    assert pool.checkouts == 0
+    # The slot was given back, so the next checkout does not block
+    driver = pool.checkout()
+    assert pool.checkouts == 1 and pool.drivers_created == 1
+    pool.checkin(driver)
+    pool.close()
+
+def test_before_runs_while_no_driver_is_checked_out():
+    pool = FakePool(size=1)
+    checked_out = []
+    pool.map(lambda driver, item: item, ["a", "b"], before=lambda item: checked_out.append(len(pool._drivers) - len(pool._idle)))
+    assert checked_out == [0, 0]
+    pool.close()
+
+def test_no_keywords_starts_no_drivers(monkeypatch):
+    import Selenium_hktvmall
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("a pool was started for no keywords")
+
+    monkeypatch.setattr(Selenium_hktvmall, "DriverPool", no_pool)
+    assert Selenium_hktvmall.scrape_hktvmall([]) == {}
@@ -0,0 +1,51 @@
+import pytest
+from story_records import Story, print_stories, stories_from_items, to_epoch
+
+@pytest.mark.parametrize("value, expected", [
+    ("2024-05-01T18:00:00Z", 1714586400.0),
+    ("2024-05-01T18:00:00.000Z", 1714586400.0),
+    # An explicit offset is honoured, a naive time is taken as UTC
+    ("2024-05-02T02:00:00+08:00", 1714586400.0),
+    ("2024-05-01T18:00:00", 1714586400.0),
+    # Feed numbers: milliseconds or seconds
+    (1714586400000, 1714586400.0),
+    (1714586400, 1714586400.0),
+    (0, 0.0),
+])
+def test_to_epoch(value, expected):
+    assert to_epoch(value) == expected
+
+@pytest.mark.parametrize("value", [None, "", "10:46 AM", "yesterday", "2024-13-45T99:00:00Z"])
+def test_to_epoch_unknown_times(value):
+    assert to_epoch(value) is None
+
+def test_missing_fields_do_not_shift_other_records():
+    items = [
+        {"title": "First", "time": "11:21 AM", "datetime": "2024-05-14T11:21:00.000Z", "url": "/a"},
+        # No timestamp at all
+        {"title": "Second", "url": "/b"},
+        # No title: dropped on its own, taking nothing else with it
+        {"time": "10:01 AM", "datetime": "2024-05-14T10:01:00.000Z", "url": "/c"},
+        {"title": "Third", "time": "not a time", "datetime": "garbage", "url": None},
+        {"title": "Fourth", "time": "09:15 AM", "datetime": "2024-05-14T09:15:00.000Z", "url": "/d"},
+    ]
+    stories = list(stories_from_items(items))
+    assert [(s.title, s.time, s.url) for s in stories] == [
+        ("First", "11:21 AM", "/a"),
+        ("Second", None, "/b"),
+        ("Third", "not a time", None),
+        ("Fourth", "09:15 AM", "/d"),
+    ]
+    assert [s.epoch for s in stories] == [1715685660.0, None, None, 1715678100.0]
+
+def test_numeric_feed_times_are_shown_as_utc():
+    (story,) = stories_from_items([{"title": "Oil", "time": 1714586400000, "url": "/oil"}])
+    assert story == Story("Oil", "2024-05-01 18:00 UTC", "/oil", 1714586400.0)
+
+def test_print_stories(capsys):
+    count = print_stories([Story("First", None, "/a", None), Story("Second", "09:15 AM", None, None)])
+    out = capsys.readouterr().out
+    assert count == 2
+    assert "1. Title: First\n   Time: unknown\n   URL: /a\n" in out
+    assert "2. Title: Second\n   Time: 09:15 AM\n" in out and "URL: None" not in out
+    assert print_stories([]) == 0
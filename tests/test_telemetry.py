@@ -0,0 +1,127 @@
+import asyncio
+import json
+import threading
+import pytest
+import telemetry
+from telemetry import RunTelemetry, current_run, load_runs, phase, report, traced_run
+
+def read_records(directory):
+    with open(directory / telemetry.SPANS_FILE, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def read_metrics(directory):
+    with open(directory / telemetry.PROM_FILE, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+def finished_run(directory, scraper="quotes", fail=False):
+    run = RunTelemetry(scraper, "example.com", directory=str(directory))
+    with run.span("fetch", bytes=2048, items=3):
+        with run.span("parse", items=3):
+            pass
+    if fail:
+        with pytest.raises(ValueError):
+            with run.span("export"):
+                raise ValueError("disk full")
+    run.finish(ValueError() if fail else None)
+    return run
+
+def test_span_and_run_records(tmp_path):
+    run = finished_run(tmp_path, fail=True)
+    spans = [r for r in read_records(tmp_path) if r["type"] == "span"]
+    # Spans are recorded as they finish, inner first
+    assert [(s["phase"], s["parent"]) for s in spans] == [("parse", "fetch"), ("fetch", None), ("export", None)]
+    fetch = spans[1]
+    assert fetch["bytes"] == 2048 and fetch["items"] == 3 and fetch["status"] == "ok"
+    assert spans[2]["status"] == "error" and spans[2]["error"] == "ValueError"
+    assert all(s["run_id"] == run.run_id and s["scraper"] == "quotes" for s in spans)
+    record = load_runs(str(tmp_path / telemetry.SPANS_FILE))[-1]
+    assert record["status"] == "error"
+    # Only top-level phases are totalled; parse is inside fetch
+    assert set(record["phases"]) == {"fetch", "export"}
+
+def test_prometheus_metrics_accumulate_across_runs(tmp_path):
+    finished_run(tmp_path)
+    finished_run(tmp_path, fail=True)
+    lines = read_metrics(tmp_path)
+    labels = 'scraper="quotes",site="example.com",phase="fetch"'
+    assert f"scraper_phase_duration_seconds_count{{{labels}}} 2" in lines
+    assert f'scraper_phase_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in lines
+    assert f"scraper_phase_last_bytes{{{labels}}} 2048" in lines
+    assert f"scraper_phase_last_items{{{labels}}} 3" in lines
+    export = 'scraper="quotes",site="example.com",phase="export"'
+    assert f"scraper_phase_errors_total{{{export}}} 1" in lines
+    run_labels = 'scraper="quotes",site="example.com"'
+    assert f'scraper_runs_total{{{run_labels},status="ok"}} 1' in lines
+    assert f'scraper_runs_total{{{run_labels},status="error"}} 1' in lines
+    assert "# TYPE scraper_phase_duration_seconds histogram" in lines
+
+def test_concurrent_runs_do_not_lose_updates(tmp_path):
+    def finish_runs():
+        for _ in range(5):
+            finished_run(tmp_path)
+
+    threads = [threading.Thread(target=finish_runs) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert 'scraper_runs_total{scraper="quotes",site="example.com",status="ok"} 40' in read_metrics(tmp_path)
+    assert len(load_runs(str(tmp_path / telemetry.SPANS_FILE))) == 40
+    assert not (tmp_path / (telemetry.STATE_FILE + ".tmp")).exists()
+
+def test_nested_traced_runs_record_into_the_outer_run():
+    @traced_run("inner", "example.com")
+    async def inner():
+        with phase("parse"):
+            pass
+        return current_run()
+
+    @traced_run("outer", "example.com")
+    async def outer():
+        with phase("fetch"):
+            pass
+        return current_run(), await inner()
+
+    outer_run, inner_run = asyncio.run(outer())
+    assert inner_run is outer_run
+    assert outer_run.scraper == "outer"
+    assert [span.name for span in outer_run.spans] == ["fetch", "parse"]
+    assert current_run() is None
+
+def test_failed_traced_run_is_recorded_as_an_error():
+    runs = []
+
+    @traced_run("broken", "example.com")
+    async def broken():
+        runs.append(current_run())
+        raise RuntimeError("no table")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(broken())
+    assert runs[0].status == "error" and runs[0].duration is not None
+
+def test_phase_outside_a_run_is_a_no_op_span():
+    with phase("parse", items=2) as span:
+        pass
+    assert span.items == 2 and span.duration is not None
+
+def write_runs(path, fetch_seconds):
+    with open(path, "w", encoding="utf-8") as f:
+        for seconds in fetch_seconds:
+            f.write(json.dumps({"type": "run", "scraper": "quotes", "site": "example.com", "status": "ok",
+                                "duration_s": seconds + 0.5, "phases": {"fetch": seconds, "parse": 0.5}}) + "\n")
+
+@pytest.mark.parametrize("history, last, flagged", [
+    ([1.0, 1.1, 0.9], 2.0, 1),
+    # Within 1.5x of the median
+    ([1.0, 1.1, 0.9], 1.4, 0),
+    # 5x slower, but only by a few milliseconds
+    ([0.01, 0.01, 0.01], 0.05, 0),
+    # Nothing to compare the first run with
+    ([], 9.0, 0),
+])
+def test_report_flags_phases_slower_than_their_recent_median(tmp_path, capsys, history, last, flagged):
+    path = str(tmp_path / telemetry.SPANS_FILE)
+    write_runs(path, history + [last])
+    assert report(path) == flagged
+    assert ("REGRESSION" in capsys.readouterr().out) == bool(flagged)
@@ -0,0 +1,7 @@
+from urllib.parse import urlparse
+
+def site_of(url):
+    """Site key for a URL (its host, without a leading "www."): what rate limits, robots rules,
+    cached selectors and consent choices are kept per"""
+    host = urlparse(url).hostname or url or ""
+    return host[4:] if host.startswith("www.") else host